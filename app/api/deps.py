@@ -9,13 +9,19 @@ from arq.connections import ArqRedis
 
 from app.core import security
 from app.core.config import settings
+from app.db.redis import get_redis_client
+from app.db.replica import mark_recent_write, read_router, read_your_writes_key
 from app.db.session import AsyncSessionLocal
 from app.models import User
 from app.repositories.user_repo import UserRepository
 from app.repositories.job_repo import JobRepository
+from app.repositories.review_repo import ReviewRepository
+from app.repositories.review_stats_repo import ReviewStatsRepository
 from app.schemas.auth import TokenPayload
 from app.services.user_service import UserService
 from app.services.job_service import JobService
+from app.services.embedding_service import get_embedding_provider
+from app.services.review_search_service import ReviewSearchService
 from app.domain.types import TokenType
 
 logger = logging.getLogger(__name__)
@@ -23,8 +29,23 @@ logger = logging.getLogger(__name__)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_PREFIX}/auth/login")
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
+        if read_router.enabled:
+            # remember that this caller wrote, so its next reads are not served a stale replica
+            key = read_your_writes_key(request)
+            if key:
+                session.info["after_commit"] = [lambda: mark_recent_write(get_redis_client(), key)]
+        yield session
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only endpoints: the read replica when DB_READ_URL is set and it is fresh
+    enough for this caller, otherwise the primary (see app.db.replica.ReadRouter).
+    """
+    session_factory = await read_router.sessionmaker_for(read_your_writes_key(request))
+    async with session_factory() as session:
         yield session
 
 
@@ -36,6 +57,18 @@ def get_job_repo(db: AsyncSession = Depends(get_db)) -> JobRepository:
     return JobRepository(db)
 
 
+def get_read_job_repo(db: AsyncSession = Depends(get_read_db)) -> JobRepository:
+    return JobRepository(db)
+
+
+def get_review_repo(db: AsyncSession = Depends(get_read_db)) -> ReviewRepository:
+    return ReviewRepository(db)
+
+
+def get_review_stats_repo(db: AsyncSession = Depends(get_read_db)) -> ReviewStatsRepository:
+    return ReviewStatsRepository(db)
+
+
 def get_user_service(
     user_repo: UserRepository = Depends(get_user_repo),
 ) -> UserService:
@@ -54,6 +87,12 @@ def get_job_service(
     return JobService(job_repo, arq_pool)
 
 
+def get_review_search_service(
+    review_repo: ReviewRepository = Depends(get_review_repo),
+) -> ReviewSearchService:
+    return ReviewSearchService(review_repo, get_embedding_provider())
+
+
 async def get_current_user(
     user_repo: UserRepository = Depends(get_user_repo),
     token: str = Depends(oauth2_scheme),
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 
 from . import (
+    admin,
     auth, 
     jobs,
     places,
@@ -22,4 +23,5 @@ router.include_router(source_config.router, prefix="/source-configs", tags=["Sou
 router.include_router(products.router, prefix="/products", tags=["Products"])
 router.include_router(reviews.router, prefix="/reviews", tags=["Reviews"])
 router.include_router(places.router, prefix="/places", tags=["Places"])
-router.include_router(ws.router, prefix="/ws", tags=["WebSockets"])
\ No newline at end of file
+router.include_router(ws.router, prefix="/ws", tags=["WebSockets"])
+router.include_router(admin.router, prefix="/admin", tags=["Admin"])
\ No newline at end of file
@@ -0,0 +1,49 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from typing import Any, Dict
+
+from app.api.deps import get_current_active_user, get_arq_pool
+from app.models import User
+from app.domain.types import Role
+from app.workers.telemetry import collect_worker_telemetry, render_prometheus
+from arq.connections import ArqRedis
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+def _require_platform_admin(current_user: User) -> None:
+    # queues are shared by every organization, so corporate admins are not allowed here
+    if current_user.role not in [Role.ADMIN, Role.SUPERADMIN]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Insufficient permissions"
+        )
+
+
+@router.get("/telemetry", response_model=Dict[str, Any])
+async def get_worker_telemetry(
+    current_user: User = Depends(get_current_active_user),
+    arq_pool: ArqRedis = Depends(get_arq_pool),
+) -> Dict[str, Any]:
+    """
+    Per queue and per task: depth, oldest queued age, in-progress count, completion and failure
+    rates, and p50/p95 run time. Meant for deciding how many workers each queue needs.
+    """
+    _require_platform_admin(current_user)
+    return await collect_worker_telemetry(arq_pool)
+
+
+@router.get("/metrics")
+async def get_worker_metrics(
+    current_user: User = Depends(get_current_active_user),
+    arq_pool: ArqRedis = Depends(get_arq_pool),
+) -> Response:
+    """Same data in the Prometheus text format. Requires the `monitoring` extra."""
+    _require_platform_admin(current_user)
+    telemetry = await collect_worker_telemetry(arq_pool)
+    try:
+        body, content_type = render_prometheus(telemetry)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+    return Response(content=body, media_type=content_type)
@@ -21,7 +21,7 @@ auth_service = AuthService()
 
 @router.get("/organizations", response_model=List[OrganizationListResponse])
 async def get_available_organizations(
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
 ) -> List[OrganizationListResponse]:
     """
     Get all available organizations for user registration.
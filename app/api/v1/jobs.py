@@ -1,47 +1,77 @@
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 
-from app.api.deps import get_current_active_user, get_job_service, get_job_repo, get_arq_pool
-from app.models import User
+from app.api.deps import get_current_active_user, get_db, get_read_job_repo, get_arq_pool
+from app.models import Job, User
 from app.services.job_service import JobService 
+from app.services.job_coalescing import job_coalescer
 from app.repositories.job_repo import JobRepository
-from app.schemas.jobs import JobCreateRequest, JobResponse
-from app.domain.types import JobType
+from app.schemas.jobs import JobCreateRequest, JobResponse, JobListResponse
+from app.domain.types import JobType, JobStatus, JobPriority, Role
 from arq.connections import ArqRedis
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_session
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+
+def _is_owner_or_org_admin(job: Job, user: User) -> bool:
+    """The job's owner, or an admin of its organization (jobs may be shared through coalescing)."""
+    is_org_admin = (
+        user.role in [Role.ADMIN, Role.CORPORATE_ADMIN, Role.SUPERADMIN]
+        and job.organization_id == user.organization_id
+    )
+    return job.user_id == user.id or is_org_admin
+
+
+async def _attached_to(job: Job, user: User) -> bool:
+    """Whether the user attached to this job through coalescing (see JobCoalescer.record_attachment)."""
+    if job.organization_id != user.organization_id:
+        return False
+    try:
+        return await job_coalescer.is_attached(job.id, user.id)
+    except Exception as e:
+        logger.warning(f"Could not check attachment of user {user.id} to job {job.id}: {e}")
+        return False
+
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def create_job(
     job: JobCreateRequest,
     job_type: JobType = JobType.REVIEW_SCRAPING,
+    priority: Optional[JobPriority] = Query(default=None, description="high: interactive queue, low: bulk queue"),
     current_user: User = Depends(get_current_active_user),
     arq_pool: ArqRedis = Depends(get_arq_pool),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_db)
 ):
     """Create and start a new job with specified type"""
     job_repo = JobRepository(session)
     job_service = JobService(job_repo, arq_pool)
     
     sources_data = [s.model_dump() for s in job.sources]
-    job_id = await job_service.create_and_start_job(
+    job_id, attached_to = await job_service.create_or_attach_job(
         user_id=current_user.id,
         organization_id=current_user.organization_id,
         sources_data=sources_data,
-        job_type=job_type
+        job_type=job_type,
+        config={"priority": priority.value} if priority else None,
     )
     
-    return {"job_id": job_id, "status": "started", "job_type": job_type.value}
+    # identical scrapes already in flight: the caller follows those jobs and their event channels.
+    # job_id is None when every source is attached, but not all to the same job
+    attached = bool(attached_to) and (job_id is None or job_id in attached_to.values())
+    return {
+        "job_id": job_id,
+        "status": "attached" if attached else "started",
+        "job_type": job_type.value,
+        "source_jobs": {source.value: owner for source, owner in attached_to.items()},
+    }
 
 @router.get("/{job_id}", response_model=JobResponse)
 async def get_job(
     job_id: str,
     current_user: User = Depends(get_current_active_user),
-    job_repo: JobRepository = Depends(get_job_repo)
+    job_repo: JobRepository = Depends(get_read_job_repo)
 ) -> JobResponse:
     """
     Retrieves the details of a specific job by its ID.
@@ -53,7 +83,8 @@ async def get_job(
             detail=f"Job with ID {job_id} not found"
         )
     
-    if job.user_id != current_user.id:
+    # a job shared through coalescing is also readable by the users who attached to it
+    if not _is_owner_or_org_admin(job, current_user) and not await _attached_to(job, current_user):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You are not authorized to access this job"
@@ -61,15 +92,63 @@ async def get_job(
     
     return JobResponse.model_validate(job)
 
-@router.get("/", response_model=List[JobResponse])
+@router.post("/{job_id}/cancel", response_model=dict)
+async def cancel_job(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+    arq_pool: ArqRedis = Depends(get_arq_pool),
+    session: AsyncSession = Depends(get_db)
+):
+    """
+    Cancels a pending or running job. Queued tasks are dropped, running ones stop within about a
+    second and keep the reviews they had already stored.
+    """
+    job_repo = JobRepository(session)
+    job = await job_repo.get_job_by_id(job_id=job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job with ID {job_id} not found"
+        )
+
+    if not _is_owner_or_org_admin(job, current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not authorized to cancel this job"
+        )
+
+    job_service = JobService(job_repo, arq_pool)
+    return await job_service.cancel_job(job_id)
+
+@router.get("/", response_model=Union[JobListResponse, List[JobResponse]])
 async def list_jobs(
     current_user: User = Depends(get_current_active_user),
-    job_repo: JobRepository = Depends(get_job_repo),
+    job_repo: JobRepository = Depends(get_read_job_repo),
     limit: int = Query(default=50, ge=1, le=100),
-    offset: int = Query(default=0, ge=0)
-) -> List[JobResponse]:
+    offset: int = Query(default=0, ge=0),
+    keyset: bool = Query(default=False, description="Page by (created_at, id); returns a cursor-paginated page"),
+    cursor: Optional[str] = Query(default=None, description="Opaque cursor returned as next_cursor by the previous keyset page"),
+    status_filter: Optional[JobStatus] = Query(default=None, alias="status"),
+    job_type: Optional[JobType] = Query(default=None),
+) -> Union[JobListResponse, List[JobResponse]]:
     """
-    Retrieves a list of jobs for the current user, with pagination.
+    Retrieves a list of jobs for the current user, with offset pagination.
+    With `keyset=true` (or a `cursor`), pages by (created_at, id) instead and returns the jobs with a next_cursor.
     """
-    jobs = await job_repo.get_jobs_by_user_id(user_id=current_user.id, limit=limit, offset=offset)
-    return [JobResponse.model_validate(job) for job in jobs]
\ No newline at end of file
+    if not (keyset or cursor):
+        jobs = await job_repo.get_jobs_by_user_id(
+            user_id=current_user.id, limit=limit, offset=offset, status=status_filter, job_type=job_type
+        )
+        return [JobResponse.model_validate(job) for job in jobs]
+
+    try:
+        jobs, next_cursor = await job_repo.get_jobs_page_by_user_id(
+            user_id=current_user.id, limit=limit, cursor=cursor, status=status_filter, job_type=job_type
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return JobListResponse(
+        items=[JobResponse.model_validate(job) for job in jobs],
+        next_cursor=next_cursor,
+    )
@@ -1,6 +1,75 @@
-from fastapi import APIRouter
+import logging
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 
+from app.api.deps import get_current_active_user, get_review_search_service, get_review_stats_repo
+from app.models import User
+from app.domain.types import SourceType
+from app.repositories.review_stats_repo import ReviewStatsRepository
+from app.schemas.reviews import (
+    ReviewSearchRequest,
+    ReviewSearchResponse,
+    ReviewStatsBucket,
+    ReviewStatsResponse,
+    StatsDimension,
+)
+from app.services.review_search_service import ReviewSearchService
+
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# TODO: Implement review management endpoints
-# Placeholder router for reviews module
+@router.post("/search", response_model=ReviewSearchResponse)
+async def search_reviews(
+    search: ReviewSearchRequest,
+    current_user: User = Depends(get_current_active_user),
+    search_service: ReviewSearchService = Depends(get_review_search_service),
+) -> ReviewSearchResponse:
+    """
+    Semantic search: returns the reviews of the caller's organization closest in meaning to `query`.
+    """
+    if not current_user.organization_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User does not belong to an organization"
+        )
+    return await search_service.search(current_user.organization_id, search)
+
+@router.get("/stats", response_model=ReviewStatsResponse)
+async def get_review_stats(
+    group_by: List[StatsDimension] = Query(default=["brand", "source", "country", "month"]),
+    brand_name: Optional[str] = Query(default=None),
+    source: Optional[List[SourceType]] = Query(default=None),
+    country: Optional[str] = Query(default=None),
+    date_from: Optional[date] = Query(default=None, description="Inclusive"),
+    date_to: Optional[date] = Query(default=None, description="Exclusive"),
+    current_user: User = Depends(get_current_active_user),
+    stats_repo: ReviewStatsRepository = Depends(get_review_stats_repo),
+) -> ReviewStatsResponse:
+    """
+    Review counts, average rating and rating histogram for the caller's organization,
+    grouped by any of brand, source, country, day and month. Served from the pre-aggregated
+    daily stats table only.
+    """
+    if not current_user.organization_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User does not belong to an organization"
+        )
+    if date_from and date_to and date_from >= date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from must be earlier than date_to"
+        )
+
+    group_by = list(dict.fromkeys(group_by))
+    rows = await stats_repo.get_stats(
+        organization_id=current_user.organization_id,
+        group_by=group_by,
+        brand_name=brand_name,
+        sources=source,
+        country=country,
+        date_from=date_from,
+        date_to=date_to,
+    )
+    return ReviewStatsResponse(group_by=group_by, items=[ReviewStatsBucket.from_row(row) for row in rows])
@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from app.api import deps
 from app.schemas.user import (
     UserResponse, UserProfileResponse, UserListResponse, 
-    UserUpdate, UserCreate
+    UserUpdate, UserCreate, UserSearchPageResponse
 )
 from app.schemas.organization import OrganizationResponse
 from app.services.user_service import UserService
@@ -81,18 +81,21 @@ async def update_current_user(
             detail=str(e)
         )
 
-@router.get("/", response_model=List[UserListResponse])
+@router.get("/", response_model=Union[UserSearchPageResponse, List[UserListResponse]])
 async def list_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     query: Optional[str] = Query(None, description="Search by name or email"),
+    ranked: bool = Query(False, description="Order `query` matches by similarity; returns a cursor-paginated page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor by the previous ranked page"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     organization_id: Optional[int] = Query(None, description="Filter by organization"),
     current_user: User = Depends(deps.get_current_user),
-    db: AsyncSession = Depends(deps.get_db),
-) -> List[UserListResponse]:
+    db: AsyncSession = Depends(deps.get_read_db),
+) -> Union[UserSearchPageResponse, List[UserListResponse]]:
     """
     List users with filtering and pagination. Requires admin role.
+    With `ranked=true`, `query` matches are ordered by trigram similarity and paginated with `cursor`.
     """
     if current_user.role not in [Role.ADMIN, Role.CORPORATE_ADMIN, Role.SUPERADMIN]:
         raise HTTPException(
@@ -107,13 +110,34 @@ async def list_users(
     if current_user.role == Role.CORPORATE_ADMIN:
         organization_id = current_user.organization_id
     
-    users = await user_service.search_users(
-        organization_id=organization_id,
-        query=query,
-        is_active=is_active,
-        skip=skip,
-        limit=limit
-    )
+    try:
+        if ranked or cursor:
+            if not query:
+                raise ValueError("Ranked search requires a query")
+            users, next_cursor = await user_service.search_users_ranked(
+                query=query,
+                organization_id=organization_id,
+                is_active=is_active,
+                limit=limit,
+                cursor=cursor
+            )
+            return UserSearchPageResponse(
+                items=[UserListResponse.model_validate(user) for user in users],
+                next_cursor=next_cursor,
+            )
+
+        users = await user_service.search_users(
+            organization_id=organization_id,
+            query=query,
+            is_active=is_active,
+            skip=skip,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     return users
 
 @router.get("/{user_id}", response_model=UserProfileResponse)
@@ -353,7 +377,7 @@ async def get_organization_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user: User = Depends(deps.get_current_user),
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
 ):
     """Get users by organization. Requires admin role or same organization."""
     user_repo = UserRepository(db)
@@ -0,0 +1,72 @@
+import hashlib
+import math
+from typing import Iterable
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings: membership tests never miss an added item and report
+    false positives at roughly `error_rate` while at most `capacity` items have been added.
+    Serialises to raw bytes so it can be stored as a single Redis value.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001, bits: int | None = None, hashes: int | None = None):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # optimal sizes: m = -n ln p / (ln 2)^2, k = m/n ln 2
+        self.size = bits or max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = hashes or max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        # Kirsch-Mitzenmacher: k positions from two independent 64-bit hashes
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> bool:
+        """Adds an item; returns False if it was (probably) already present."""
+        added = False
+        for position in self._positions(item):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def saturated(self) -> bool:
+        return self.count > self.capacity
+
+    def union(self, other: "BloomFilter") -> None:
+        """Merges another filter of the same shape into this one, in place."""
+        if (other.size, other.hashes) != (self.size, self.hashes):
+            raise ValueError("Cannot merge Bloom filters of different shapes")
+        self.bits = bytearray(a | b for a, b in zip(self.bits, other.bits))
+        self.count = self.estimate_count()
+
+    def estimate_count(self) -> int:
+        """Distinct items estimated from the share of set bits (Swamidass & Baldi)."""
+        set_bits = sum(byte.bit_count() for byte in self.bits)
+        if set_bits >= self.size:
+            return self.capacity * 10
+        return round(-self.size / self.hashes * math.log(1 - set_bits / self.size))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, capacity: int, error_rate: float, bits: int, hashes: int, count: int = 0) -> "BloomFilter":
+        bloom = cls(capacity, error_rate, bits=bits, hashes=hashes)
+        if len(data) != len(bloom.bits):
+            raise ValueError("Bloom filter payload does not match its declared size")
+        bloom.bits = bytearray(data)
+        bloom.count = count
+        return bloom
@@ -0,0 +1,49 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.instrumentation import log_query_stats, track_queries
+
+
+class QueryTimingMiddleware:
+    """
+    Counts the database statements of each HTTP request and reports them as a `Server-Timing`
+    header (`db` with the query count and time, `app` with the total until headers are sent) and
+    as log fields. Statements run after the response started, e.g. in dependency teardown, are
+    only in the log line.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        with track_queries() as stats:
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    if settings.SERVER_TIMING_ENABLED:
+                        total_ms = (time.perf_counter() - started) * 1000
+                        value = f'db;dur={stats.duration_ms};desc="{stats.count} queries", app;dur={total_ms:.2f}'
+                        message.setdefault("headers", [])
+                        message["headers"] = list(message["headers"]) + [(b"server-timing", value.encode("latin-1"))]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                log_query_stats(
+                    "request",
+                    stats,
+                    method=scope["method"],
+                    path=scope["path"],
+                    status=status_code,
+                    duration_ms=round((time.perf_counter() - started) * 1000, 2),
+                )
@@ -0,0 +1,46 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple, Type, Union
+
+# an expected value type for each position of a cursor; a tuple allows any of its types
+CursorTypes = Sequence[Union[Type, Tuple[Type, ...]]]
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encodes the keyset values of the last row of a page into an opaque, url-safe cursor.
+    Datetimes are serialized as ISO strings and restored by decode_cursor.
+    """
+    payload = [
+        {"t": "dt", "v": value.isoformat()} if isinstance(value, datetime) else {"t": "raw", "v": value}
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, expected_len: int, types: Optional[CursorTypes] = None) -> List[Any]:
+    """
+    Decodes a cursor produced by encode_cursor.
+    Raises ValueError if the cursor is malformed, has an unexpected number of values or, when `types`
+    is given, a value of the wrong type (cursors are client input and reach SQL comparisons).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = [
+            datetime.fromisoformat(item["v"]) if item["t"] == "dt" else item["v"]
+            for item in payload
+        ]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+    if len(values) != expected_len:
+        raise ValueError("Invalid pagination cursor")
+    if types is not None:
+        for value, expected in zip(values, types):
+            # bool is an int subclass, but never a valid keyset value
+            if isinstance(value, bool) or not isinstance(value, expected):
+                raise ValueError("Invalid pagination cursor")
+    return values
@@ -0,0 +1,46 @@
+import hashlib
+import re
+from collections import Counter
+from typing import List, Optional
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+SIMHASH_BITS = 64
+# 4 bands of 16 bits: by pigeonhole, two fingerprints within Hamming distance 3
+# always share at least one band exactly, so band lookups find every such pair
+SIMHASH_BANDS = 4
+SIMHASH_BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+SIMHASH_BAND_MASK = (1 << SIMHASH_BAND_BITS) - 1
+
+
+def simhash64(text: Optional[str], min_tokens: int = 5) -> Optional[int]:
+    """
+    64-bit SimHash of a text over lowercase word unigrams and bigrams, returned as a signed
+    integer so it fits a PostgreSQL BIGINT. Texts with fewer than `min_tokens` words return None:
+    short reviews ("Great!") collide too easily to be treated as near-duplicates.
+    """
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    if len(tokens) < min_tokens:
+        return None
+
+    features = Counter(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+    weights = [0] * SIMHASH_BITS
+    for feature, count in features.items():
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if digest >> bit & 1 else -count
+
+    fingerprint = sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+    return fingerprint - (1 << SIMHASH_BITS) if fingerprint >= 1 << (SIMHASH_BITS - 1) else fingerprint
+
+
+def simhash_bands(fingerprint: int) -> List[int]:
+    """
+    Splits a fingerprint into its band values, lowest bits first. Matches the SQL expression
+    `(simhash >> (16 * band)) & 65535` used to persist bands, including for negative values.
+    """
+    return [(fingerprint >> (band * SIMHASH_BAND_BITS)) & SIMHASH_BAND_MASK for band in range(SIMHASH_BANDS)]
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return ((a ^ b) & ((1 << SIMHASH_BITS) - 1)).bit_count()
@@ -1,4 +1,7 @@
 from sqlalchemy.orm import DeclarativeBase
 
+# PostgreSQL's wire protocol caps a single statement at 32767 bind parameters
+PG_MAX_BIND_PARAMS = 32767
+
 class Base(DeclarativeBase):
     pass 
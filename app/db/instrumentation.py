@@ -0,0 +1,129 @@
+import functools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_START_TIMES_KEY = "query_start_times"
+
+
+class QueryStats:
+    """
+    Statements executed and cumulative time spent waiting on the database within one scope
+    (an HTTP request, an ARQ task, a test block).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    @property
+    def duration_ms(self) -> float:
+        return round(self.duration * 1000, 2)
+
+    def as_log_fields(self) -> Dict[str, Any]:
+        return {"db_queries": self.count, "db_ms": self.duration_ms}
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Counts the statements executed by the current task (and code it awaits) until the block exits.
+    Scopes nest: when an inner scope closes, its numbers are added to the enclosing one, so a test
+    wrapping an HTTP call sees the queries the request middleware measured.
+    """
+    stats = QueryStats()
+    parent = _current_stats.get()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        if parent is not None:
+            parent.count += stats.count
+            parent.duration += stats.duration
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START_TIMES_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info[_START_TIMES_KEY].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += time.perf_counter() - started
+
+
+def _handle_error(exception_context):
+    # a failed statement never reaches after_cursor_execute; drop its start time but still count it
+    conn = exception_context.connection
+    start_times = conn.info.get(_START_TIMES_KEY) if conn is not None else None
+    if start_times:
+        started = start_times.pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.duration += time.perf_counter() - started
+
+
+def install_query_instrumentation() -> None:
+    """
+    Registers the cursor hooks on every Engine (sync engines behind AsyncEngine included).
+    Statements run outside a track_queries scope cost one context variable lookup. Idempotent.
+    """
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+def log_query_stats(scope: str, stats: QueryStats, **fields: Any) -> None:
+    """
+    Logs one line per request/task with the query numbers, also attached as `extra` fields.
+    Scopes that exceed DB_QUERY_WARN_COUNT statements are logged as warnings.
+    """
+    fields.update(stats.as_log_fields())
+    level = logging.WARNING if stats.count > settings.DB_QUERY_WARN_COUNT else logging.INFO
+    described = " ".join(f"{key}={value}" for key, value in fields.items())
+    logger.log(level, f"{scope} {described}", extra=fields)
+
+
+def instrument_task(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Wraps an ARQ task so the statements it runs are counted and logged when it finishes.
+    Keeps the task's name, which ARQ uses to route jobs.
+    """
+    @functools.wraps(func)
+    async def wrapper(ctx: Dict[str, Any], *args: Any, **kwargs: Any) -> Any:
+        with track_queries() as stats:
+            started = time.perf_counter()
+            try:
+                return await func(ctx, *args, **kwargs)
+            finally:
+                log_query_stats(
+                    "task",
+                    stats,
+                    task=func.__name__,
+                    job_id=ctx.get("job_id") if isinstance(ctx, dict) else None,
+                    duration_ms=round((time.perf_counter() - started) * 1000, 2),
+                )
+
+    return wrapper
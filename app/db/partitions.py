@@ -0,0 +1,236 @@
+"""
+Native partitioning of `reviews`.
+
+The table is partitioned by HASH (organization_id) into REVIEWS_HASH_PARTITIONS partitions, so every
+org-scoped query prunes to a single partition and its (much smaller) indexes. With
+REVIEWS_MONTHLY_PARTITIONS each hash partition is further partitioned by RANGE (review_date), one
+partition per calendar month (UTC) plus a DEFAULT partition; month partitions are created on demand by
+ingest and ahead of time by the maintenance cron. review_date is then part of every unique key, so ingest
+deduplicates per (source, external_id, review_date).
+"""
+import json
+import logging
+from datetime import date, datetime, timezone
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+REVIEWS_TABLE = "reviews"
+
+# Month partitions known to exist in this process, so ingest only issues DDL for new months
+_known_months: Set[date] = set()
+
+
+def hash_partition_name(remainder: int) -> str:
+    return f"{REVIEWS_TABLE}_p{remainder:02d}"
+
+
+def month_partition_name(remainder: int, month: date) -> str:
+    return f"{hash_partition_name(remainder)}_{month:%Y%m}"
+
+
+def default_partition_name(remainder: int) -> str:
+    return f"{hash_partition_name(remainder)}_default"
+
+
+def organization_embedding_index_name(partition: str, organization_id: int) -> str:
+    return f"{partition}_embedding_hnsw_org_{organization_id}"
+
+
+def organization_embedding_index_ddl(partition: str, organization_id: int, concurrently: bool = False) -> str:
+    """
+    CREATE INDEX for an organization's partial HNSW index on one leaf partition.
+    """
+    # imported here: app.models.review imports this module
+    from app.models.review import HNSW_EF_CONSTRUCTION, HNSW_M
+
+    organization_id = int(organization_id)
+    return (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS "
+        f"{organization_embedding_index_name(partition, organization_id)} ON {partition} "
+        f"USING hnsw (embedding vector_cosine_ops) "
+        f"WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION}) "
+        f"WHERE organization_id = {organization_id}"
+    )
+
+
+def month_start(value: date | datetime) -> date:
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc) if value.tzinfo else value
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def review_partition_ddl() -> List[str]:
+    """
+    DDL creating the hash partitions (and their DEFAULT month partition) under `reviews`.
+    Executed right after CREATE TABLE reviews, see app.models.review.
+    """
+    modulus = settings.REVIEWS_HASH_PARTITIONS
+    statements = []
+    for remainder in range(modulus):
+        name = hash_partition_name(remainder)
+        sub_partitioning = " PARTITION BY RANGE (review_date)" if settings.REVIEWS_MONTHLY_PARTITIONS else ""
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {REVIEWS_TABLE} "
+            f"FOR VALUES WITH (MODULUS {modulus}, REMAINDER {remainder}){sub_partitioning}"
+        )
+        if settings.REVIEWS_MONTHLY_PARTITIONS:
+            statements.append(f"CREATE TABLE IF NOT EXISTS {default_partition_name(remainder)} PARTITION OF {name} DEFAULT")
+    return statements
+
+
+def pending_review_months(values: Iterable[date | datetime | None]) -> Set[date]:
+    """
+    Months among `values` whose partitions this process has not created or seen yet.
+    Always empty unless REVIEWS_MONTHLY_PARTITIONS is enabled.
+    """
+    if not settings.REVIEWS_MONTHLY_PARTITIONS:
+        return set()
+    return {month_start(value) for value in values if value is not None} - _known_months
+
+
+def record_review_months(months: Iterable[date | datetime]) -> None:
+    """
+    Remembers that the partitions of `months` exist, so `pending_review_months` skips them from now on.
+    Call it only once the transaction that ran `ensure_review_month_partitions` has committed: a rolled
+    back CREATE TABLE must not be cached as done.
+    """
+    _known_months.update(month_start(month) for month in months)
+
+
+async def ensure_review_month_partitions(conn: AsyncConnection, months: Iterable[date | datetime]) -> List[str]:
+    """
+    Creates the month partitions covering `months` under every hash partition, if missing.
+    No-op unless REVIEWS_MONTHLY_PARTITIONS is enabled. Runs the DDL on `conn` behind a transaction-level
+    advisory lock so concurrent writers never race on the same CREATE TABLE; callers should use a short
+    transaction of its own, and pass `months` to `record_review_months` once it commits. Returns the names
+    of the partitions created.
+    """
+    missing = sorted(pending_review_months(months))
+    if not missing:
+        return []
+
+    await conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": f"{REVIEWS_TABLE}_partitions"})
+    created = []
+    for month in missing:
+        for remainder in range(settings.REVIEWS_HASH_PARTITIONS):
+            name = month_partition_name(remainder, month)
+            exists = (await conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})).scalar_one()
+            if exists:
+                continue
+            await _create_month_partition(conn, remainder, month)
+            created.append(name)
+
+    if created:
+        logger.info(f"Created {len(created)} review month partitions for {', '.join(f'{m:%Y-%m}' for m in missing)}")
+    return created
+
+
+async def _create_month_partition(conn: AsyncConnection, remainder: int, month: date) -> None:
+    """
+    Creates one month partition under a hash partition, with the per-organization HNSW indexes its
+    sibling partitions have.
+
+    Postgres refuses to create a month while the DEFAULT partition holds rows of it. Those rows (ingest
+    outran partition creation) are moved: the DEFAULT partition is detached, the month created and filled
+    from it, and the DEFAULT attached again. The hash partition is locked exclusively meanwhile.
+    """
+    parent, default = hash_partition_name(remainder), default_partition_name(remainder)
+    name = month_partition_name(remainder, month)
+    lower, upper = f"{month.isoformat()} 00:00:00+00", f"{add_months(month, 1).isoformat()} 00:00:00+00"
+    in_month = f"review_date >= '{lower}' AND review_date < '{upper}'"
+    create = f"CREATE TABLE {name} PARTITION OF {parent} FOR VALUES FROM ('{lower}') TO ('{upper}')"
+
+    stranded = (await conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_month})"))).scalar_one()
+    if stranded:
+        await conn.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {default}"))
+        await conn.execute(text(create))
+        moved = await conn.execute(text(
+            f"WITH moved AS (DELETE FROM {default} WHERE {in_month} RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+        ))
+        await conn.execute(text(f"ALTER TABLE {parent} ATTACH PARTITION {default} DEFAULT"))
+        logger.warning(f"Moved {moved.rowcount} reviews from {default} into the new partition {name}")
+    else:
+        await conn.execute(text(create))
+
+    # nothing else can write to the partition before this transaction commits, so no CONCURRENTLY
+    for organization_id in await _indexed_organizations(conn, parent):
+        await conn.execute(text(organization_embedding_index_ddl(name, organization_id)))
+
+
+async def _indexed_organizations(conn: AsyncConnection, parent: str) -> List[int]:
+    """
+    Organizations with a partial HNSW index on any leaf of a hash partition (always including its DEFAULT).
+    """
+    result = await conn.execute(
+        text(
+            "SELECT DISTINCT CAST(substring(indexname FROM '_embedding_hnsw_org_([0-9]+)$') AS bigint) "
+            "FROM pg_indexes WHERE schemaname = current_schema() "
+            "AND starts_with(tablename, :prefix) AND indexname ~ '_embedding_hnsw_org_[0-9]+$'"
+        ),
+        {"prefix": f"{parent}_"},
+    )
+    return sorted(row[0] for row in result)
+
+
+async def create_future_review_partitions(conn: AsyncConnection, months_ahead: Optional[int] = None) -> List[str]:
+    """
+    Pre-creates the partitions of `future_review_months(months_ahead)`.
+    """
+    return await ensure_review_month_partitions(conn, future_review_months(months_ahead))
+
+
+def future_review_months(months_ahead: Optional[int] = None) -> List[date]:
+    """
+    The current month and the `months_ahead` (default REVIEWS_PARTITION_MONTHS_AHEAD) months after it.
+    """
+    months_ahead = settings.REVIEWS_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    current = month_start(datetime.now(timezone.utc))
+    return [add_months(current, i) for i in range(months_ahead + 1)]
+
+
+async def organization_partitions(conn: AsyncConnection, organization_id: int) -> List[str]:
+    """
+    Leaf partitions that can hold rows of an organization: its hash partition, or that partition's
+    month partitions when sub-partitioning is enabled.
+    """
+    remainder = (await conn.execute(
+        text(
+            "SELECT r FROM generate_series(0, :modulus - 1) AS r "
+            "WHERE satisfies_hash_partition(CAST(:table AS regclass), :modulus, r, CAST(:organization_id AS bigint))"
+        ),
+        {"modulus": settings.REVIEWS_HASH_PARTITIONS, "table": REVIEWS_TABLE, "organization_id": organization_id},
+    )).scalar_one()
+    result = await conn.execute(
+        text("SELECT relid::regclass::text FROM pg_partition_tree(CAST(:name AS regclass)) WHERE isleaf"),
+        {"name": hash_partition_name(remainder)},
+    )
+    return [row[0] for row in result]
+
+
+async def scanned_relations(conn: AsyncConnection, sql: str, params: Optional[dict] = None) -> Set[str]:
+    """
+    Relations a query's plan reads, from EXPLAIN (FORMAT JSON). Used to verify partition pruning.
+    """
+    plan = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params or {})).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    relations: Set[str] = set()
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if "Relation Name" in node:
+            relations.add(node["Relation Name"])
+        nodes.extend(node.get("Plans", []))
+    return relations
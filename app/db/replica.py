@@ -0,0 +1,121 @@
+import hashlib
+import logging
+import time
+from typing import Optional
+
+import redis.asyncio as redis
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.redis import get_redis_client
+from app.db.session import AsyncSessionLocal, ReadSessionLocal, engine, read_engine
+
+logger = logging.getLogger(__name__)
+
+# Seconds the server is behind its primary: 0 on a primary or on a standby that has replayed
+# everything it received; otherwise the age of the last replayed transaction
+REPLICA_LAG_SQL = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+READ_YOUR_WRITES_KEY_PREFIX = "db:recent_write:"
+
+
+class ReplicaLagMonitor:
+    """
+    Measures replication lag of the read engine at most once per `check_interval` seconds and
+    reports whether it is fresh enough to serve reads. A failed measurement counts as stale, so an
+    unreachable replica sends traffic to the primary until the next successful check.
+    """
+
+    def __init__(self, engine: AsyncEngine, max_lag: float, check_interval: float):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag: Optional[float] = None
+        self._checked_at: Optional[float] = None
+
+    async def is_fresh(self) -> bool:
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.check_interval:
+            # claimed before awaiting, so concurrent requests reuse the previous value instead of piling up checks
+            self._checked_at = now
+            try:
+                async with self.engine.connect() as conn:
+                    self.lag = float((await conn.execute(REPLICA_LAG_SQL)).scalar_one())
+            except Exception as e:
+                logger.warning(f"Could not measure read replica lag: {e}")
+                self.lag = None
+        return self.lag is not None and self.lag <= self.max_lag
+
+
+def read_your_writes_key(request: Request) -> Optional[str]:
+    """
+    Identifies the caller across requests by a hash of its bearer token. Returns None for anonymous
+    requests: an address is shared behind NAT and proxies, so those get no read-your-writes routing.
+    """
+    identity = request.headers.get("authorization")
+    if not identity:
+        return None
+    return READ_YOUR_WRITES_KEY_PREFIX + hashlib.sha256(identity.encode("utf-8")).hexdigest()[:32]
+
+
+async def mark_recent_write(redis_client: redis.Redis, key: str) -> None:
+    try:
+        await redis_client.set(key, "1", px=int(settings.DB_READ_YOUR_WRITES_SECONDS * 1000))
+    except Exception as e:
+        logger.warning(f"Could not record recent write for read-your-writes routing: {e}")
+
+
+async def has_recent_write(redis_client: redis.Redis, key: str) -> bool:
+    try:
+        return bool(await redis_client.exists(key))
+    except Exception as e:
+        # without the marker we cannot rule out a recent write, so stay on the primary
+        logger.warning(f"Could not check recent writes, reading from the primary: {e}")
+        return True
+
+
+class ReadRouter:
+    """
+    Chooses the session factory for read-only work. Reads go to `replica` unless none is
+    configured, the monitor reports it as lagging, or the caller committed through the primary in
+    the last DB_READ_YOUR_WRITES_SECONDS (e.g. fetching a job right after creating it).
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker[AsyncSession],
+        replica: Optional[async_sessionmaker[AsyncSession]] = None,
+        monitor: Optional[ReplicaLagMonitor] = None,
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.monitor = monitor
+
+    @property
+    def enabled(self) -> bool:
+        return self.replica is not None
+
+    async def sessionmaker_for(
+        self, key: Optional[str], redis_client: Optional[redis.Redis] = None
+    ) -> async_sessionmaker[AsyncSession]:
+        if self.replica is None:
+            return self.primary
+        if key and await has_recent_write(redis_client or get_redis_client(), key):
+            return self.primary
+        if self.monitor and not await self.monitor.is_fresh():
+            return self.primary
+        return self.replica
+
+
+read_router = ReadRouter(
+    AsyncSessionLocal,
+    ReadSessionLocal,
+    ReplicaLagMonitor(read_engine, settings.DB_READ_MAX_LAG_SECONDS, settings.DB_READ_LAG_CHECK_SECONDS),
+) if read_engine is not engine else ReadRouter(AsyncSessionLocal)
@@ -1,6 +1,23 @@
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.core.config import settings
+from app.db.instrumentation import install_query_instrumentation
+
+# Per-request / per-task statement counts and DB time (see app.db.instrumentation)
+install_query_instrumentation()
+
+
+class PrimarySession(AsyncSession):
+    """
+    AsyncSession that awaits the callbacks listed in `info["after_commit"]` once a commit succeeds.
+    The API uses it to record writes for read-your-writes routing (see app.db.replica).
+    """
+
+    async def commit(self) -> None:
+        await super().commit()
+        for callback in self.info.get("after_commit", ()):
+            await callback()
+
 
 engine = create_async_engine(
     settings.DB_URL,
@@ -8,8 +25,17 @@ engine = create_async_engine(
     future=True
 )
 
-AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=PrimarySession)
+
+# Read-only traffic goes to the replica when one is configured; without one both names point to the primary
+read_engine = create_async_engine(
+    settings.DB_READ_URL,
+    pool_pre_ping=True,
+    future=True
+) if settings.DB_READ_URL else engine
+
+ReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False, class_=AsyncSession)
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
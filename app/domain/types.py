@@ -32,6 +32,7 @@ class JobSourceStatus(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
     SKIPPED = "skipped"
+    CANCELLED = "cancelled"
 
 class WebSocketEventType(str, Enum):
     """Event types for WebSocket communications"""
@@ -39,6 +40,7 @@ class WebSocketEventType(str, Enum):
     TASK_STARTED = "task_started"
     PROGRESS = "progress"
     TASK_COMPLETED = "task_completed"
+    TASK_CANCELLED = "task_cancelled"
     SOURCE_STARTED = "source_started"  # When a specific source starts (e.g., Trustpilot)
     SOURCE_COMPLETED = "source_completed"  # When a specific source completes
     JOB_COMPLETED = "job_completed"  # When entire job is done
@@ -68,6 +70,14 @@ class JobType(str, Enum):
     NOTIFICATION_BATCH = "notification_batch"    # Send bulk notifications
     BACKUP_RESTORE = "backup_restore"            # System maintenance tasks
     ARCHETYPE_GENERATION = "archetype_generation"
+    EMBEDDING_GENERATION = "embedding_generation"  # Backfill Review.embedding
+    REVIEW_REPARSE = "review_reparse"            # Re-run scrapers over cached pages, no network
+
+class JobPriority(str, Enum):
+    """Moves a job off its type's default queue (see app.workers.queue)"""
+    HIGH = "high"      # interactive queue
+    NORMAL = "normal"  # the job type's own queue
+    LOW = "low"        # bulk queue
 
 class JobTargetType(str, Enum):
     """Types of entities that jobs can target"""
@@ -7,8 +7,10 @@ from arq import create_pool
 from app.core.config import settings
 from app.core.logging import setup_logging
 from app.core.exceptions import add_exception_handlers
+from app.core.middleware import QueryTimingMiddleware
 from app.db.redis import get_redis_client
 from app.db.session import engine
+from app.services.job_event_log import job_event_log
 
 from app.api.v1 import router as api_v1_router
 
@@ -35,6 +37,7 @@ async def lifespan(app: FastAPI):
     yield
     
     logger.info("Shutting down...")
+    await job_event_log.close()
     if app.state.arq_worker:
         await app.state.arq_worker.aclose()
         logger.info("ARQ worker closed.")
@@ -63,6 +66,7 @@ app.add_middleware(
     allow_headers=settings.CORS_ALLOW_HEADERS,
 )
 
+app.add_middleware(QueryTimingMiddleware)
 
 add_exception_handlers(app)
 
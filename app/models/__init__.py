@@ -10,6 +10,7 @@ from .source_config import SourceConfig
 from .token import RefreshToken
 from .twofa import TwoFactorCode
 from .product import DiscoveredProduct
-from .review import Review
+from .review import Review, ReviewFingerprintBand
+from .review_stats import ReviewDailyStats
 from .places import DiscoveredPlaces
 from .email_verification import EmailVerification
\ No newline at end of file
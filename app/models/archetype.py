@@ -1,11 +1,15 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, Text, Integer, BigInteger, Boolean
+from sqlalchemy import ForeignKey, Text, Integer, BigInteger, Boolean, Index, text
 from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
 from app.db.base import Base
 
 class Archetype(Base):
     __tablename__ = "archetypes"
+    __table_args__ = (
+        # Active set of a target (organization or competitor): listings and replacement on regeneration
+        Index("ix_archetypes_active_target", "organization_id", "competitor_id", postgresql_where=text("is_active")),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     organization_id: Mapped[int] = mapped_column(ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
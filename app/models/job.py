@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, Text, Enum as PgEnum, Integer
+from sqlalchemy import ForeignKey, Text, Enum as PgEnum, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from datetime import datetime
 from sqlalchemy import DateTime
@@ -42,6 +42,17 @@ class Job(Base):
     reviews: Mapped[list["Review"]] = relationship(back_populates="job", cascade="all, delete-orphan")
     archetypes: Mapped[list["Archetype"]] = relationship(back_populates="job", cascade="all, delete-orphan")
 
+# Keyset pagination indexes for job listings: ORDER BY created_at DESC, id DESC scoped by user.
+Index("ix_jobs_user_created_id", Job.user_id, Job.created_at.desc(), Job.id.desc())
+Index("ix_jobs_user_type_created_id", Job.user_id, Job.job_type, Job.created_at.desc(), Job.id.desc())
+Index(
+    "ix_jobs_user_active_created_id",
+    Job.user_id,
+    Job.created_at.desc(),
+    Job.id.desc(),
+    postgresql_where=Job.status.in_([JobStatus.PENDING, JobStatus.RUNNING]),
+)
+
 class JobSource(Base):
     __tablename__ = "job_sources"
 
@@ -66,3 +77,6 @@ class JobEvent(Base):
     data: Mapped[dict] = mapped_column(JSONB, default=dict)
 
     job: Mapped["Job"] = relationship(back_populates="events")
+
+# Per-job timeline reads and compaction
+Index("ix_job_events_job_at", JobEvent.job_id, JobEvent.at, JobEvent.id)
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import BigInteger, ForeignKey, Text, String, DateTime, Float, Integer
+from sqlalchemy import BigInteger, ForeignKey, Text, String, DateTime, Float, Integer, Index, text
 from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
 from typing import Optional
@@ -7,6 +7,15 @@ from app.db.base import Base
 
 class DiscoveredProduct(Base):
     __tablename__ = "discovered_products"
+    __table_args__ = (
+        # Conflict targets of ProductRepository.bulk_upsert_products: products are keyed by ASIN,
+        # or by a hash of their identifiers when the provider returned none
+        Index("uq_discovered_products_org_asin", "organization_id", "asin", unique=True, postgresql_where=text("asin IS NOT NULL")),
+        Index(
+            "uq_discovered_products_org_identifier_hash", "organization_id", "identifier_hash",
+            unique=True, postgresql_where=text("asin IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     organization_id: Mapped[int] = mapped_column(ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
@@ -16,6 +25,8 @@ class DiscoveredProduct(Base):
     amazon_url: Mapped[Optional[str]] = mapped_column(Text)
     druni_url: Mapped[Optional[str]] = mapped_column(Text)
     identifiers: Mapped[list] = mapped_column(JSONB, default=list)
+    # sha256 of the product's identifiers (or title and URLs), set for products without an ASIN
+    identifier_hash: Mapped[Optional[str]] = mapped_column(Text)
     rating: Mapped[float] = mapped_column(Float, nullable=False)
     num_reviews: Mapped[int] = mapped_column(Integer, nullable=False)
     extra: Mapped[dict] = mapped_column(JSONB, default=dict)
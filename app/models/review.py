@@ -1,16 +1,49 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import BigInteger, ForeignKey, Integer, Text, DateTime, Enum as PgEnum
+from sqlalchemy import BigInteger, Boolean, ForeignKey, ForeignKeyConstraint, Integer, SmallInteger, Text, DateTime, Enum as PgEnum, Index, PrimaryKeyConstraint, UniqueConstraint, event, func, literal_column, text
 from sqlalchemy.dialects.postgresql import JSONB
 from pgvector.sqlalchemy import Vector
+from app.core.config import settings
 from app.db.base import Base
+from app.db.partitions import review_partition_ddl
 from app.domain.types import SourceType
 
+# Dimensionality of Review.embedding; providers must return vectors of this size
+EMBEDDING_DIMENSIONS = 1536
+
+# HNSW build parameters shared by the global and per-organization embedding indexes
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 64
+
+# Postgres requires every primary/unique key of a partitioned table to contain its partition keys
+REVIEW_PARTITION_KEY = ("organization_id", "review_date") if settings.REVIEWS_MONTHLY_PARTITIONS else ("organization_id",)
+# Conflict target for idempotent bulk ingest (ON CONFLICT ... DO NOTHING)
+REVIEW_CONFLICT_COLUMNS = ("source", "external_id", *REVIEW_PARTITION_KEY)
+# review_date stored for undated reviews while it is a partition key. Being fixed (rather than the
+# scrape time), it keeps every re-scrape of such a review on the same conflict key
+UNDATED_REVIEW_DATE = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def review_stratum_date(columns):
+    """
+    Date a review is bucketed by when sampling; undated reviews count from ingestion, as in
+    review_daily_stats. Never NULL. The sentinel is inlined rather than bound, so queries match
+    the expression of ix_reviews_org_source_rating_date.
+    """
+    undated = literal_column(f"'{UNDATED_REVIEW_DATE.isoformat()}'::timestamptz")
+    return func.coalesce(func.nullif(columns.review_date, undated), columns.created_at)
+
 class Review(Base):
     __tablename__ = "reviews"
+    __table_args__ = (
+        PrimaryKeyConstraint("id", *REVIEW_PARTITION_KEY, name="pk_reviews"),
+        UniqueConstraint(*REVIEW_CONFLICT_COLUMNS, name="uq_reviews_source_external_org"),
+        # Partitions are created by the after_create hook below (see app.db.partitions)
+        {"postgresql_partition_by": "HASH (organization_id)"},
+    )
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(BigInteger, autoincrement=True)
     organization_id: Mapped[int] = mapped_column(ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
     unit_id: Mapped[Optional[int]] = mapped_column(ForeignKey("units.id", ondelete="SET NULL"))
     job_id: Mapped[str] = mapped_column(ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
@@ -22,12 +55,78 @@ class Review(Base):
     country: Mapped[Optional[str]] = mapped_column(Text)
     rating: Mapped[Optional[int]] = mapped_column(Integer)
     review_text: Mapped[str | None] = mapped_column(Text)
-    embedding: Mapped[list[float] | None] = mapped_column(Vector(1536))
-    review_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    embedding: Mapped[list[float] | None] = mapped_column(Vector(EMBEDDING_DIMENSIONS))
+    # NOT NULL when it is a partition key; ingest then stores UNDATED_REVIEW_DATE
+    review_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=not settings.REVIEWS_MONTHLY_PARTITIONS)
     raw: Mapped[dict] = mapped_column(JSONB, default=dict)
-    created_at: Mapped[datetime]
+    # 64-bit SimHash of review_text (None for very short texts); see app.core.simhash
+    simhash: Mapped[Optional[int]] = mapped_column(BigInteger)
+    is_near_duplicate: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=text("false"))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     # relationships
     discovered_product: Mapped["DiscoveredProduct | None"] = relationship(back_populates="reviews")
     discovered_place: Mapped["DiscoveredPlaces | None"] = relationship(back_populates="reviews")
-    job: Mapped["Job"] = relationship(back_populates="reviews")
\ No newline at end of file
+    job: Mapped["Job"] = relationship(back_populates="reviews")
+
+
+@event.listens_for(Review.__table__, "after_create")
+def _create_review_partitions(target, connection, **kw):
+    for statement in review_partition_ddl():
+        connection.execute(text(statement))
+
+
+# Work queue for the embedding pipeline: only rows still missing a vector are indexed,
+# so keyset batches over (organization_id, id) stay cheap as the backlog drains
+Index(
+    "ix_reviews_missing_embedding",
+    Review.organization_id,
+    Review.id,
+    postgresql_where=Review.embedding.is_(None),
+)
+
+class ReviewFingerprintBand(Base):
+    """
+    Banded LSH index over Review.simhash, one row per (review, band). Near-duplicate candidates for a
+    new review are the rows sharing any of its band values within the same organization, which is a
+    primary-key lookup regardless of corpus size. Only canonical (non near-duplicate) reviews are indexed.
+    With monthly review partitions the review's key includes review_date, which is not stored here, so
+    the foreign key to reviews is only declared for hash-only partitioning.
+    """
+    __tablename__ = "review_fingerprint_bands"
+    __table_args__ = () if settings.REVIEWS_MONTHLY_PARTITIONS else (
+        ForeignKeyConstraint(
+            ["review_id", "organization_id"], ["reviews.id", "reviews.organization_id"], ondelete="CASCADE"
+        ),
+    )
+
+    organization_id: Mapped[int] = mapped_column(ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True)
+    band: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    band_value: Mapped[int] = mapped_column(Integer, primary_key=True)
+    review_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    simhash: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+# Approximate nearest-neighbour index for cosine similarity search. Large organizations
+# additionally get a partial HNSW index (see ReviewRepository.ensure_organization_embedding_index)
+# so their searches never have to post-filter other tenants' rows out of the graph walk.
+Index(
+    "ix_reviews_embedding_hnsw",
+    Review.embedding,
+    postgresql_using="hnsw",
+    postgresql_with={"m": HNSW_M, "ef_construction": HNSW_EF_CONSTRUCTION},
+    postgresql_ops={"embedding": "vector_cosine_ops"},
+)
+
+# Tenant-scoped filters (and exact scans for organizations too small for their own HNSW index)
+Index("ix_reviews_org_review_date", Review.organization_id, Review.review_date)
+
+# Stratum lookups for review sampling: date bounds and keyset windows per (source, rating, recency)
+Index(
+    "ix_reviews_org_source_rating_date",
+    Review.organization_id,
+    Review.source,
+    Review.rating,
+    review_stratum_date(Review),
+    Review.id,
+)
@@ -0,0 +1,29 @@
+from datetime import date
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger, Date, ForeignKey, Integer, Text, Enum as PgEnum
+from app.db.base import Base
+from app.domain.types import SourceType
+
+class ReviewDailyStats(Base):
+    """
+    Pre-aggregated review counts and rating histogram per (organization, brand, source, country, day).
+    Maintained by the ingest merge statements in the same transaction as the reviews they describe,
+    so dashboards can read distributions without scanning `reviews`. Unknown countries are stored as ''.
+    Reviews flagged as near-duplicates are not counted.
+    """
+    __tablename__ = "review_daily_stats"
+
+    organization_id: Mapped[int] = mapped_column(ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True)
+    brand_name: Mapped[str] = mapped_column(Text, primary_key=True)
+    source: Mapped[SourceType] = mapped_column(PgEnum(SourceType, name="source_type", create_constraint=False), primary_key=True)
+    country: Mapped[str] = mapped_column(Text, primary_key=True, default="")
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    review_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    rating_1: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_2: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_3: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_4: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_5: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
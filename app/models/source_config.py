@@ -1,11 +1,18 @@
+from datetime import datetime
+from typing import Optional
+
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import BigInteger, ForeignKey, Integer, Boolean, String, Enum as PgEnum
+from sqlalchemy import BigInteger, ForeignKey, Integer, Boolean, String, DateTime, Index, Enum as PgEnum, text
 from sqlalchemy.dialects.postgresql import JSONB
 from app.db.base import Base
 from app.domain.types import SourceType
 
 class SourceConfig(Base):
     __tablename__ = "source_config"
+    __table_args__ = (
+        # keyset scans of the refresh scheduler walk active configs in id order
+        Index("ix_source_config_active_id", "id", postgresql_where=text("is_active")),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     source_group_id: Mapped[int] = mapped_column(ForeignKey("source_groups.id", ondelete="CASCADE"), nullable=False)
@@ -15,6 +22,7 @@ class SourceConfig(Base):
     number_of_reviews: Mapped[int] = mapped_column(Integer, default=1000)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     options: Mapped[dict] = mapped_column(JSONB, default=dict)
+    last_refreshed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))  # last scheduled refresh
 
     # relationship
     source_group: Mapped["SourceGroup"] = relationship(back_populates="sources")
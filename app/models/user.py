@@ -1,12 +1,17 @@
 from datetime import datetime, timezone
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import BigInteger, String, Text, ForeignKey, Boolean, DateTime, Enum as PgEnum
+from sqlalchemy import BigInteger, DDL, String, Text, ForeignKey, Boolean, DateTime, Index, Enum as PgEnum, event
 from app.db.base import Base
 from app.domain.types import Role
 from typing import Optional
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Trigram indexes for substring (ILIKE '%q%') and similarity (%) search on name and email
+        Index("ix_users_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_users_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     organization_id: Mapped[Optional[int]] = mapped_column(ForeignKey("organizations.id", ondelete="CASCADE"), nullable=True)
@@ -42,4 +47,7 @@ class User(Base):
     )
     
     def __repr__(self) -> str:
-        return f"<User(id={self.id}, email='{self.email}', role='{self.role}')>"
\ No newline at end of file
+        return f"<User(id={self.id}, email='{self.email}', role='{self.role}')>"
+
+
+event.listen(User.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
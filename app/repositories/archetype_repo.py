@@ -1,10 +1,22 @@
 from typing import List, Dict, Optional,Any
-from sqlalchemy import select, and_
+from sqlalchemy import insert, select, and_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
 
 from app.models.archetype import Archetype
 
+# Columns needed to render archetype listings; the JSONB profile fields are only read per archetype
+ARCHETYPE_LIST_COLUMNS = (
+    Archetype.id,
+    Archetype.competitor_id,
+    Archetype.job_id,
+    Archetype.name,
+    Archetype.description,
+    Archetype.avatar_url,
+    Archetype.is_active,
+    Archetype.created_at,
+)
+
 class ArchetypeRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -20,27 +32,44 @@ class ArchetypeRepository:
         Create a new archetype
         """
         archetype = Archetype(
-            organization_id=organization_id,
-            competitor_id=competitor_id,
-            job_id=job_id,
-            name=archetype_data["name"],
-            description=archetype_data["description"],
-            pain_points=archetype_data["pain_points"],
-            fears_and_concerns=archetype_data["fears_and_concerns"],
-            objections=archetype_data["objections"],
-            goals_and_objectives=archetype_data["goals_and_objectives"],
-            expected_benefits=archetype_data["expected_benefits"],
-            values=archetype_data["values"],
-            influence_factors=archetype_data["influence_factors"],
-            social_behavior=archetype_data["social_behavior"],
-            internal_narrative=archetype_data["internal_narrative"],
-            avatar_url=archetype_data.get("avatar_url"),
-            created_at=datetime.now(timezone.utc)
-        ) #LOL kill me please
+            **self._archetype_values(organization_id, job_id, archetype_data, competitor_id, datetime.now(timezone.utc))
+        )
 
         self.session.add(archetype)
         await self.session.flush()
         return archetype
+
+    async def bulk_create_archetypes(
+        self,
+        organization_id: int,
+        job_id: str,
+        archetypes: List[Dict[str, Any]],
+        competitor_id: Optional[int] = None,
+        replace_active: bool = True
+    ) -> List[int]:
+        """
+        Insert a batch of archetypes with a single INSERT ... RETURNING id and return the new ids.
+        With `replace_active`, the currently active archetypes of the same target (the organization,
+        or one competitor) are deactivated first, in the same transaction, so readers switch from
+        the old set to the new one at commit. An empty batch changes nothing, so the active set is
+        never replaced by nothing. Does not commit.
+        """
+        if not archetypes:
+            return []
+        if replace_active:
+            await self.session.execute(
+                update(Archetype)
+                .where(*self._target_conditions(organization_id, competitor_id), Archetype.is_active.is_(True))
+                .values(is_active=False)
+            )
+
+        created_at = datetime.now(timezone.utc)
+        rows = [
+            self._archetype_values(organization_id, job_id, archetype_data, competitor_id, created_at)
+            for archetype_data in archetypes
+        ]
+        result = await self.session.execute(insert(Archetype).values(rows).returning(Archetype.id))
+        return list(result.scalars().all())
     
     async def get_archetypes_by_organization(
         self,
@@ -66,6 +95,24 @@ class ArchetypeRepository:
         result = await self.session.execute(query)
         return result.scalars().all()
     
+    async def list_archetype_summaries(
+        self,
+        organization_id: int,
+        competitor_id: Optional[int] = None,
+        is_active: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Same filter as get_archetypes_by_organization, projected to ARCHETYPE_LIST_COLUMNS so
+        listings do not load the JSONB profile of every archetype. Newest first.
+        """
+        query = (
+            select(*ARCHETYPE_LIST_COLUMNS)
+            .where(*self._target_conditions(organization_id, competitor_id), Archetype.is_active == is_active)
+            .order_by(Archetype.created_at.desc(), Archetype.id.desc())
+        )
+        result = await self.session.execute(query)
+        return [dict(row._mapping) for row in result]
+
     async def get_archetype_by_id(
         self,
         archetype_id: int,
@@ -98,4 +145,38 @@ class ArchetypeRepository:
             await self.session.commit()
             return True
         return False
-    
\ No newline at end of file
+
+    @staticmethod
+    def _target_conditions(organization_id: int, competitor_id: Optional[int]) -> list:
+        return [
+            Archetype.organization_id == organization_id,
+            Archetype.competitor_id.is_(None) if competitor_id is None else Archetype.competitor_id == competitor_id,
+        ]
+
+    @staticmethod
+    def _archetype_values(
+        organization_id: int,
+        job_id: str,
+        archetype_data: Dict[str, Any],
+        competitor_id: Optional[int],
+        created_at: datetime
+    ) -> Dict[str, Any]:
+        return {
+            "organization_id": organization_id,
+            "competitor_id": competitor_id,
+            "job_id": job_id,
+            "name": archetype_data["name"],
+            "description": archetype_data["description"],
+            "pain_points": archetype_data["pain_points"],
+            "fears_and_concerns": archetype_data["fears_and_concerns"],
+            "objections": archetype_data["objections"],
+            "goals_and_objectives": archetype_data["goals_and_objectives"],
+            "expected_benefits": archetype_data["expected_benefits"],
+            "values": archetype_data["values"],
+            "influence_factors": archetype_data["influence_factors"],
+            "social_behavior": archetype_data["social_behavior"],
+            "internal_narrative": archetype_data["internal_narrative"],
+            "avatar_url": archetype_data.get("avatar_url"),
+            "is_active": True,
+            "created_at": created_at,
+        }
@@ -1,15 +1,41 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime, timezone
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import DateTime, Text, column, insert, select, text, update, tuple_, values
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import selectinload
 
 from app.models import Job, JobSource, JobEvent
 from app.domain.types import JobStatus, JobSourceStatus, SourceType, JobType, JobTargetType
+from app.core.pagination import encode_cursor, decode_cursor
 
 logger = logging.getLogger(__name__)
 
+# Event name of the row that replaces compacted job events
+JOB_EVENT_SUMMARY = "summary"
+
+# Folds all but the newest :keep_last events of a finished job (errors are always kept) into one
+# summary row with per-event counts and the time range covered. Earlier summaries are left alone.
+COMPACT_JOB_EVENTS_SQL = text(
+    "WITH ranked AS ("
+    " SELECT id, row_number() OVER (ORDER BY at DESC, id DESC) AS rn FROM job_events"
+    " WHERE job_id = :job_id AND event <> :summary"
+    "), doomed AS ("
+    " DELETE FROM job_events e USING ranked r"
+    " WHERE e.id = r.id AND r.rn > :keep_last AND e.event <> 'error'"
+    " RETURNING e.event, e.at"
+    "), counts AS ("
+    " SELECT event, count(*) AS n FROM doomed GROUP BY event"
+    ") "
+    "INSERT INTO job_events (job_id, at, event, data) "
+    "SELECT :job_id, max(at), :summary, jsonb_build_object("
+    "'compacted', count(*), 'first_at', min(at), 'last_at', max(at), "
+    "'counts', (SELECT jsonb_object_agg(event, n) FROM counts)) "
+    "FROM doomed HAVING count(*) > 0 "
+    "RETURNING (data->>'compacted')::int"
+)
+
 class JobRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -58,22 +84,69 @@ class JobRepository:
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
     
-    async def get_jobs_by_user_id(self, user_id: int, limit: int = 50, offset: int = 0) -> List[Job]:
+    def _filtered_jobs_query(self, user_id: int, status: Optional[JobStatus] = None, job_type: Optional[JobType] = None):
         """
-        Retrieves jobs for a specific user with pagination
+        Base listing query for a user; status and job_type filters line up with the partial/composite indexes on jobs
+        """
+        stmt = select(Job).options(selectinload(Job.sources)).where(Job.user_id == user_id)
+        if status is not None:
+            stmt = stmt.where(Job.status == status)
+        if job_type is not None:
+            stmt = stmt.where(Job.job_type == job_type)
+        return stmt
+
+    async def get_jobs_by_user_id(
+        self,
+        user_id: int,
+        limit: int = 50,
+        offset: int = 0,
+        status: Optional[JobStatus] = None,
+        job_type: Optional[JobType] = None,
+    ) -> List[Job]:
+        """
+        Retrieves jobs for a specific user with offset pagination (kept for compatibility, prefer the keyset variant)
         """
         stmt = (
-            select(Job)
-            .options(selectinload(Job.sources))
-            .where(Job.user_id == user_id)
-            .order_by(Job.created_at.desc())
+            self._filtered_jobs_query(user_id, status=status, job_type=job_type)
+            .order_by(Job.created_at.desc(), Job.id.desc())
             .limit(limit)
             .offset(offset)
         )
         result = await self.session.execute(stmt)
         return result.scalars().all()
+
+    async def get_jobs_page_by_user_id(
+        self,
+        user_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        status: Optional[JobStatus] = None,
+        job_type: Optional[JobType] = None,
+    ) -> Tuple[List[Job], Optional[str]]:
+        """
+        Retrieves a page of jobs for a user using keyset pagination on (created_at, id).
+        Returns the jobs and an opaque cursor for the next page (None when there are no more rows).
+        Raises ValueError if the cursor is malformed.
+        """
+        stmt = self._filtered_jobs_query(user_id, status=status, job_type=job_type)
+        if cursor:
+            last_created_at, last_id = decode_cursor(cursor, expected_len=2, types=(datetime, str))
+            stmt = stmt.where(tuple_(Job.created_at, Job.id) < (last_created_at, last_id))
+
+        # Fetch one extra row to know whether another page exists without a COUNT
+        stmt = stmt.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit + 1)
+        result = await self.session.execute(stmt)
+        jobs = list(result.scalars().all())
+
+        next_cursor = None
+        if len(jobs) > limit:
+            jobs = jobs[:limit]
+            next_cursor = encode_cursor(jobs[-1].created_at, jobs[-1].id)
+        return jobs, next_cursor
     
-    async def update_job_status(self, job_id: str, status: JobStatus, error: Optional[str] = None) -> None:
+    async def update_job_status(
+        self, job_id: str, status: JobStatus, result: Optional[dict] = None, error: Optional[str] = None
+    ) -> None:
         """
         Updates the status and timestamp of a job
         """
@@ -82,6 +155,8 @@ class JobRepository:
             values["started_at"] = datetime.now(timezone.utc)
         if status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED]:
             values["finished_at"] = datetime.now(timezone.utc)
+        if result:
+            values["result"] = result
         if error:
             values["error"] = error
         
@@ -105,7 +180,7 @@ class JobRepository:
         db_source.status = status
         if status == JobSourceStatus.RUNNING and not db_source.started_at:
             db_source.started_at = datetime.now(timezone.utc)
-        if status in [JobSourceStatus.COMPLETED, JobSourceStatus.FAILED, JobSourceStatus.SKIPPED]:
+        if status in [JobSourceStatus.COMPLETED, JobSourceStatus.FAILED, JobSourceStatus.SKIPPED, JobSourceStatus.CANCELLED]:
             db_source.finished_at = datetime.now(timezone.utc)
             if result:
                 db_source.result = result
@@ -123,6 +198,41 @@ class JobRepository:
         if not statuses:
             return False
         
-        terminal_statuses = [JobSourceStatus.COMPLETED, JobSourceStatus.FAILED, JobSourceStatus.SKIPPED]
+        terminal_statuses = [JobSourceStatus.COMPLETED, JobSourceStatus.FAILED, JobSourceStatus.SKIPPED, JobSourceStatus.CANCELLED]
         return all(status in terminal_statuses for status in statuses)
-    
\ No newline at end of file
+    
+
+    async def append_job_events(self, events: List[dict]) -> int:
+        """
+        Appends events ({"job_id", "at", "event", "data"}) to job_events with one multi-row INSERT
+        and commits. Events of unknown jobs are skipped rather than failing the whole batch.
+        Returns the number of rows written.
+        """
+        if not events:
+            return 0
+        batch = values(
+            column("job_id", UUID(as_uuid=False)),
+            column("at", DateTime(timezone=True)),
+            column("event", Text),
+            column("data", JSONB),
+            name="batch",
+        ).data([(e["job_id"], e["at"], e["event"], e["data"]) for e in events])
+        stmt = insert(JobEvent).from_select(
+            ["job_id", "at", "event", "data"],
+            select(batch.c.job_id, batch.c.at, batch.c.event, batch.c.data).join(Job, Job.id == batch.c.job_id),
+        )
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return result.rowcount
+
+    async def compact_job_events(self, job_id: str, keep_last: int = 50) -> int:
+        """
+        Replaces all but the newest `keep_last` events of a job (error events are always kept) with a
+        single summary event, in one statement. Returns the number of events compacted.
+        """
+        result = await self.session.execute(
+            COMPACT_JOB_EVENTS_SQL, {"job_id": job_id, "keep_last": keep_last, "summary": JOB_EVENT_SUMMARY}
+        )
+        compacted = result.scalar_one_or_none() or 0
+        await self.session.commit()
+        return compacted
@@ -1,9 +1,37 @@
-from typing import List, Optional
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import literal_column, select, delete, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
 
+from app.db.base import PG_MAX_BIND_PARAMS
 from app.models import DiscoveredProduct
 
+logger = logging.getLogger(__name__)
+
+# Never overwritten when an existing product is updated
+_UPSERT_IMMUTABLE_COLUMNS = {"organization_id", "asin", "identifier_hash", "created_at"}
+
+
+def product_identifier_hash(product_data: Dict[str, Any]) -> str:
+    """
+    Stable key for products without an ASIN: sha256 of their sorted identifiers, or of the
+    normalised title and URLs when the provider returned no identifiers either.
+    """
+    identifiers = sorted({str(i).strip().lower() for i in product_data.get("identifiers") or [] if i})
+    if identifiers:
+        payload = {"identifiers": identifiers}
+    else:
+        payload = {
+            key: (product_data.get(key) or "").strip().lower()
+            for key in ("title", "amazon_url", "druni_url")
+        }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
 class ProductRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -12,26 +40,111 @@ class ProductRepository:
         """
         Creates or updates a discovered product based on a unique identifier (e.g. ASIN, EAN, UPC, GTIN, etc.)
         """
-        asin = product_data.get("asin")
-        if not asin:
+        product_data = self._with_product_key(product_data)
+        if product_data.get("asin"):
+            key = DiscoveredProduct.asin == product_data["asin"]
+        else:
+            key = DiscoveredProduct.asin.is_(None) & (DiscoveredProduct.identifier_hash == product_data["identifier_hash"])
+        stmt = select(DiscoveredProduct).where(key, DiscoveredProduct.organization_id == organization_id)
+        result = await self.session.execute(stmt)
+        product = result.scalar_one_or_none()
+
+        if product:
+            for key, value in product_data.items():
+                setattr(product, key, value)
+        else:
             product = DiscoveredProduct(organization_id=organization_id, **product_data)
             self.session.add(product)
-        else:
-            stmt = select(DiscoveredProduct).where(DiscoveredProduct.asin == asin, DiscoveredProduct.organization_id == organization_id)
-            result = await self.session.execute(stmt)
-            product = result.scalar_one_or_none()
-
-            if product:
-                for key, value in product_data.items():
-                    setattr(product, key, value)
-            else:
-                product = DiscoveredProduct(organization_id=organization_id, **product_data)
-                self.session.add(product)
         
         await self.session.commit()
         await self.session.refresh(product)
         return product
     
+    async def bulk_upsert_products(
+        self,
+        organization_id: int,
+        products: List[Dict[str, Any]],
+        chunk_size: int = 1000
+    ) -> Dict[str, int]:
+        """
+        Creates or updates many discovered products with chunked
+        INSERT ... ON CONFLICT (organization_id, asin) DO UPDATE statements, all in one transaction.
+        Products without an ASIN conflict on (organization_id, identifier_hash) instead.
+        When the same product appears several times in `products`, the last occurrence wins.
+
+        Invalid products are skipped, not fatal: each chunk runs in a savepoint, and a chunk the
+        database rejects is retried row by row so only the offending products are left out.
+
+        Returns {"received", "inserted", "updated", "skipped"}; inserted and updated rows are told
+        apart with RETURNING (xmax = 0), which is true only for freshly inserted tuples.
+        """
+        skipped = 0
+        by_key: Dict[tuple, Dict[str, Any]] = {}
+        for product_data in products:
+            try:
+                row = {**self._with_product_key(product_data), "organization_id": organization_id}
+            except (AttributeError, TypeError) as e:
+                logger.warning(f"Skipping malformed discovered product {product_data!r}: {e}")
+                skipped += 1
+                continue
+            by_key[(row.get("asin"), row["identifier_hash"])] = row
+
+        # multi-row VALUES need the same columns in every row, so rows are grouped by their key set
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for row in by_key.values():
+            groups.setdefault((bool(row.get("asin")), tuple(sorted(row))), []).append(row)
+
+        inserted = updated = 0
+        try:
+            for (has_asin, columns), rows in groups.items():
+                step = max(1, min(chunk_size, PG_MAX_BIND_PARAMS // len(columns)))
+                for start in range(0, len(rows), step):
+                    flags, failed = await self._upsert_chunk_or_rows(rows[start:start + step], columns, has_asin)
+                    inserted += sum(flags)
+                    updated += len(flags) - sum(flags)
+                    skipped += failed
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+        return {"received": len(products), "inserted": inserted, "updated": updated, "skipped": skipped}
+
+    async def _upsert_chunk_or_rows(self, rows: List[Dict[str, Any]], columns: tuple, has_asin: bool) -> tuple:
+        """
+        Upserts a chunk in a savepoint; if the database rejects it, upserts its rows one by one and
+        skips those that fail. Returns the RETURNING flags of the stored rows and the number skipped.
+        """
+        try:
+            async with self.session.begin_nested():
+                return await self._upsert_chunk(rows, columns, has_asin), 0
+        except SQLAlchemyError as e:
+            if len(rows) == 1:
+                logger.warning(f"Skipping discovered product {rows[0].get('asin') or rows[0].get('identifier_hash')}: {e}")
+                return [], 1
+        flags, skipped = [], 0
+        for row in rows:
+            row_flags, failed = await self._upsert_chunk_or_rows([row], columns, has_asin)
+            flags += row_flags
+            skipped += failed
+        return flags, skipped
+
+    async def _upsert_chunk(self, rows: List[Dict[str, Any]], columns: tuple, has_asin: bool) -> List[bool]:
+        stmt = pg_insert(DiscoveredProduct).values(rows)
+        if has_asin:
+            conflict = {"index_elements": ["organization_id", "asin"], "index_where": text("asin IS NOT NULL")}
+        else:
+            conflict = {"index_elements": ["organization_id", "identifier_hash"], "index_where": text("asin IS NULL")}
+        updates = {name: stmt.excluded[name] for name in columns if name not in _UPSERT_IMMUTABLE_COLUMNS}
+        stmt = stmt.on_conflict_do_update(**conflict, set_=updates).returning(literal_column("xmax = 0"))
+        result = await self.session.execute(stmt)
+        return [bool(flag) for flag in result.scalars().all()]
+
+    @staticmethod
+    def _with_product_key(product_data: Dict[str, Any]) -> Dict[str, Any]:
+        if product_data.get("asin"):
+            return {**product_data, "identifier_hash": None}
+        return {**product_data, "asin": None, "identifier_hash": product_identifier_hash(product_data)}
+
     async def get_produts_by_organization(self, organization_id: int) -> List[DiscoveredProduct]:
         """
         Retrieves all discovered products for a specific organization
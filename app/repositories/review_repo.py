@@ -1,27 +1,818 @@
-from typing import List
+import json
+import logging
+import random
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Set, Tuple
+from sqlalchemy import BigInteger, and_, bindparam, case, cast, column, func, select, tablesample, text, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from app.models import Review
+from pgvector.sqlalchemy import Vector
+
+from app.core.config import settings
+from app.core.simhash import SIMHASH_BANDS, SIMHASH_BAND_BITS, SIMHASH_BAND_MASK
+from app.models import Competitor, Review, ReviewDailyStats, SourceConfig, SourceGroup
+from app.models.review import (
+    EMBEDDING_DIMENSIONS,
+    REVIEW_CONFLICT_COLUMNS,
+    REVIEW_PARTITION_KEY,
+    UNDATED_REVIEW_DATE,
+    review_stratum_date,
+)
+from app.db.base import PG_MAX_BIND_PARAMS
+from app.db.partitions import (
+    ensure_review_month_partitions,
+    organization_embedding_index_ddl,
+    organization_embedding_index_name,
+    organization_partitions,
+    pending_review_months,
+    record_review_months,
+)
+from app.domain.types import SourceType
+
+logger = logging.getLogger(__name__)
+
+# Columns streamed through COPY; created_at is left to its server default
+REVIEW_COPY_COLUMNS = (
+    "organization_id",
+    "unit_id",
+    "job_id",
+    "discovered_product_id",
+    "discovered_place_id",
+    "source",
+    "external_id",
+    "brand_name",
+    "country",
+    "rating",
+    "review_text",
+    "review_date",
+    "raw",
+    "simhash",
+    "is_near_duplicate",
+)
+REVIEW_STAGING_TABLE = "reviews_staging"
+
+# Columns of newly inserted reviews that DERIVED_WRITES_SQL reads from the `inserted` CTE
+INSERTED_REVIEW_COLUMNS = (
+    "id, organization_id, brand_name, source, country, rating, review_date, created_at, simhash, is_near_duplicate"
+)
+
+# Parsed columns a reparse rewrites on stored reviews. review_date is left out while it is part of the
+# conflict key (monthly partitions): there a review with another date is a different row
+REPARSE_UPDATE_COLUMNS = tuple(
+    name for name in ("country", "rating", "review_text", "review_date", "raw", "simhash")
+    if name not in REVIEW_CONFLICT_COLUMNS
+)
+
+_RATING_BUCKETS = range(1, 6)
+_STATS_DELTA_COLUMNS = ["review_count", "rating_count", "rating_sum"] + [f"rating_{r}" for r in _RATING_BUCKETS]
+
+
+
+def _stats_writes_sql(rows: str) -> str:
+    """
+    `stats` CTE folding the reviews selected by `rows` into review_daily_stats. Each row carries a
+    `sign`: 1 counts the review in its (org, brand, source, country, day) bucket, -1 takes it out
+    again. Undated reviews count on the day they were ingested. Keys are upserted in sorted order
+    so concurrent writers lock them consistently.
+    """
+    return (
+        f"stats AS ("
+        f"INSERT INTO review_daily_stats (organization_id, brand_name, source, country, day, {', '.join(_STATS_DELTA_COLUMNS)}) "
+        f"SELECT r.organization_id, r.brand_name, r.source, COALESCE(r.country, ''), "
+        f"(COALESCE(NULLIF(r.review_date, '{UNDATED_REVIEW_DATE.isoformat()}'::timestamptz), r.created_at) AT TIME ZONE 'UTC')::date, "
+        f"sum(r.sign), COALESCE(sum(r.sign) FILTER (WHERE r.rating IS NOT NULL), 0), COALESCE(sum(r.sign * r.rating), 0), "
+        + ", ".join(f"COALESCE(sum(r.sign) FILTER (WHERE r.rating = {r}), 0)" for r in _RATING_BUCKETS)
+        + f" FROM ({rows}) r WHERE NOT r.is_near_duplicate "
+        "GROUP BY 1, 2, 3, 4, 5 ORDER BY 1, 2, 3, 4, 5 "
+        "ON CONFLICT (organization_id, brand_name, source, country, day) DO UPDATE SET "
+        + ", ".join(f"{c} = review_daily_stats.{c} + EXCLUDED.{c}" for c in _STATS_DELTA_COLUMNS)
+        + ")"
+    )
+
+
+# LSH band rows for the canonical fingerprinted reviews of an `inserted` CTE
+_BANDS_SQL = (
+    f"bands AS ("
+    f"INSERT INTO review_fingerprint_bands (organization_id, band, band_value, review_id, simhash) "
+    f"SELECT r.organization_id, b.band, (r.simhash >> ({SIMHASH_BAND_BITS} * b.band)) & {SIMHASH_BAND_MASK}, r.id, r.simhash "
+    f"FROM inserted r CROSS JOIN generate_series(0, {SIMHASH_BANDS - 1}) AS b(band) "
+    f"WHERE r.simhash IS NOT NULL AND NOT r.is_near_duplicate"
+    f")"
+)
+
+# Writes derived from the rows that actually landed, chained as CTEs after an `inserted` CTE so
+# they commit (or roll back) atomically with the reviews themselves:
+#   bands - one LSH band row per band for canonical fingerprinted reviews
+#   stats - per (org, brand, source, country, day) deltas folded into review_daily_stats
+DERIVED_WRITES_SQL = f"{_BANDS_SQL}, {_stats_writes_sql(f'SELECT {INSERTED_REVIEW_COLUMNS}, 1 AS sign FROM inserted')}"
+
+# Recency strata used when sampling reviews: (label, max age in days). Older and undated reviews
+# fall into SAMPLE_RECENCY_OLDER.
+SAMPLE_RECENCY_BUCKETS = (("recent", 90), ("year", 365))
+SAMPLE_RECENCY_OLDER = "older"
+# Rows the keyset fallback may read per missing sample before giving up on a stratum
+SAMPLE_KEYSET_WINDOW = 20
+
+# (source, rating, recency label); rating is None for unrated reviews
+Stratum = Tuple[SourceType, Optional[int], str]
+
+
+def recency_bucket(review_date: Optional[datetime], today: date) -> str:
+    if review_date is None:
+        return SAMPLE_RECENCY_OLDER
+    age = (today - (review_date.date() if isinstance(review_date, datetime) else review_date)).days
+    for label, max_age in SAMPLE_RECENCY_BUCKETS:
+        if age <= max_age:
+            return label
+    return SAMPLE_RECENCY_OLDER
+
+
+def allocate_stratum_quotas(sizes: Dict[Any, int], limit: int) -> Dict[Any, int]:
+    """
+    Splits `limit` samples across strata in proportion to their sizes (largest remainder method),
+    never asking a stratum for more rows than it holds. Every non-empty stratum gets at least one
+    sample while there are enough to go round, so rare ratings or sources are not rounded away.
+    """
+    sizes = {key: size for key, size in sizes.items() if size > 0}
+    total = sum(sizes.values())
+    if total <= limit:
+        return sizes
+
+    by_size = sorted(sizes, key=lambda key: sizes[key], reverse=True)
+    if len(by_size) >= limit:
+        return {key: 1 for key in by_size[:limit]}
+
+    exact = {key: limit * size / total for key, size in sizes.items()}
+    quotas = {key: max(1, int(share)) for key, share in exact.items()}
+
+    # the one-sample floor can overshoot; give the excess back from the largest quotas
+    while sum(quotas.values()) > limit:
+        quotas[max(quotas, key=quotas.get)] -= 1
+
+    remaining = limit - sum(quotas.values())
+    while remaining > 0:
+        open_keys = sorted(
+            (key for key in sizes if quotas[key] < sizes[key]),
+            key=lambda key: exact[key] - quotas[key],
+            reverse=True,
+        )
+        for key in open_keys[:remaining]:
+            quotas[key] += 1
+        remaining = limit - sum(quotas.values())
+    return quotas
+
 
 class ReviewRepository:
+    COPY_CHUNK_SIZE = 50_000
+
     def __init__(self, session: AsyncSession):
         self.session = session
     
     async def bulk_insert_reviews(self, reviews_data: List[dict]) -> int:
         """
-        Inserts a list of reviews efficiently, ignoring duplicates based on a unique constraint. 
-        A unique constraine on (source, external:id, organization_id) is recommended in the 'reviews' table.
+        Inserts a list of reviews efficiently, ignoring duplicates based on the
+        (source, external_id, organization_id) unique constraint.
+        Rows are split into statements that stay under PostgreSQL's bind-parameter limit.
         """
         if not reviews_data:
             return 0
 
-        stmt = pg_insert(Review).values(reviews_data)
-        stmt = stmt.on_conflict_do_nothing(
-            index_elements=["source", "external_id", "organization_id"]
+        await self.ensure_partitions(reviews_data)
+
+        rows_per_statement = max(1, PG_MAX_BIND_PARAMS // max(len(reviews_data[0]), 1))
+        inserted_ids = []
+        for start in range(0, len(reviews_data), rows_per_statement):
+            stmt = pg_insert(Review).values(reviews_data[start:start + rows_per_statement])
+            stmt = stmt.on_conflict_do_nothing(
+                index_elements=list(REVIEW_CONFLICT_COLUMNS)
+            ).returning(Review.id)
+            result = await self.session.execute(stmt)
+            inserted_ids.extend(result.scalars().all())
+
+        if inserted_ids:
+            await self.session.execute(
+                text(
+                    f"WITH inserted AS ("
+                    f"SELECT {INSERTED_REVIEW_COLUMNS} FROM reviews "
+                    f"WHERE id = ANY(CAST(:ids AS bigint[])) AND organization_id = ANY(CAST(:organization_ids AS bigint[]))"
+                    f"), {DERIVED_WRITES_SQL} SELECT count(*) FROM inserted"
+                ),
+                {"ids": inserted_ids, "organization_ids": list({row["organization_id"] for row in reviews_data})},
+            )
+        await self.session.commit()
+        return len(inserted_ids)
+
+    async def copy_insert_reviews(
+        self, reviews_data: List[dict], chunk_size: int | None = None, update_existing: bool = False
+    ) -> Dict[str, int]:
+        """
+        High-throughput ingest path: streams rows with COPY into a session-local staging table,
+        then merges them into `reviews` with INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+        Chunks bound the size of each COPY, but the call commits once: it either stores every row
+        or none. Callers wanting shorter transactions pass smaller lists (the stream ingest does).
+
+        With `update_existing` (reparse jobs) stored reviews are upserted instead: their
+        REPARSE_UPDATE_COLUMNS are overwritten where they differ, see _copy_upsert_chunk.
+
+        Returns a dict with the number of inserted, updated and duplicate (unchanged) rows.
+        """
+        if not reviews_data:
+            return {"inserted": 0, "updated": 0, "duplicates": 0}
+
+        # every month up front: partition DDL cannot wait on locks this transaction already holds
+        await self.ensure_partitions(reviews_data)
+        chunk_size = chunk_size or self.COPY_CHUNK_SIZE
+        inserted = updated = 0
+        for start in range(0, len(reviews_data), chunk_size):
+            chunk = reviews_data[start:start + chunk_size]
+            if update_existing:
+                chunk_inserted, chunk_updated = await self._copy_upsert_chunk(chunk)
+                inserted += chunk_inserted
+                updated += chunk_updated
+            else:
+                inserted += await self._copy_merge_chunk(chunk)
+        await self.session.commit()
+
+        duplicates = len(reviews_data) - inserted - updated
+        logger.debug(f"COPY ingest merged {inserted} reviews, updated {updated}, skipped {duplicates} duplicates")
+        return {"inserted": inserted, "updated": updated, "duplicates": duplicates}
+
+    async def _copy_merge_chunk(self, chunk: List[dict]) -> int:
+        """
+        COPY one chunk into the staging table and merge it into reviews inside the current transaction.
+        Rows are merged in partition-key order so consecutive tuples are routed to the same partition.
+        """
+        await self._copy_to_staging(chunk)
+
+        # Merge, index fingerprints and fold stats deltas for the rows that actually landed, in one statement
+        columns = ", ".join(REVIEW_COPY_COLUMNS)
+        result = await self.session.execute(text(
+            f"WITH inserted AS ("
+            f"INSERT INTO reviews ({columns}) "
+            f"SELECT {columns} FROM {REVIEW_STAGING_TABLE} ORDER BY {', '.join(REVIEW_PARTITION_KEY)} "
+            f"ON CONFLICT ({', '.join(REVIEW_CONFLICT_COLUMNS)}) DO NOTHING "
+            f"RETURNING {INSERTED_REVIEW_COLUMNS}"
+            f"), {DERIVED_WRITES_SQL} SELECT count(*) FROM inserted"
+        ))
+        inserted = result.scalar_one()
+        await self.session.execute(text(f"TRUNCATE {REVIEW_STAGING_TABLE}"))
+        return inserted
+
+    async def _copy_upsert_chunk(self, chunk: List[dict]) -> Tuple[int, int]:
+        """
+        Like _copy_merge_chunk, but stored reviews whose parsed columns differ are updated in place
+        (ON CONFLICT DO UPDATE ... WHERE ... IS DISTINCT FROM), and (xmax = 0) tells inserted rows
+        from updated ones. For updated rows the same statement moves their stats from the old
+        values' bucket to the new one (`old` still sees the rows as they were before the statement),
+        and a changed review_text clears the embedding so the embedding pipeline picks it up again.
+        Their LSH bands are rebuilt afterwards when the SimHash changed. Returns (inserted, updated).
+        """
+        await self._copy_to_staging(chunk)
+
+        columns = ", ".join(REVIEW_COPY_COLUMNS)
+        conflict = ", ".join(REVIEW_CONFLICT_COLUMNS)
+        matches = " AND ".join(f"r.{name} = s.{name}" for name in REVIEW_CONFLICT_COLUMNS)
+        stored = ", ".join(f"r.{name}" for name in INSERTED_REVIEW_COLUMNS.split(", "))
+        assignments = ", ".join(f"{name} = EXCLUDED.{name}" for name in REPARSE_UPDATE_COLUMNS)
+        current = ", ".join(f"reviews.{name}" for name in REPARSE_UPDATE_COLUMNS)
+        parsed = ", ".join(f"EXCLUDED.{name}" for name in REPARSE_UPDATE_COLUMNS)
+        result = await self.session.execute(text(
+            f"WITH old AS ("
+            f"SELECT {stored} FROM reviews r WHERE EXISTS (SELECT 1 FROM {REVIEW_STAGING_TABLE} s WHERE {matches})"
+            f"), merged AS ("
+            f"INSERT INTO reviews ({columns}) "
+            # DO UPDATE may not touch a row twice, so a review repeated within the chunk is merged once
+            f"SELECT {columns} FROM (SELECT DISTINCT ON ({conflict}) {columns} FROM {REVIEW_STAGING_TABLE} ORDER BY {conflict}) s "
+            f"ORDER BY {', '.join(REVIEW_PARTITION_KEY)} "
+            f"ON CONFLICT ({conflict}) DO UPDATE SET {assignments}, "
+            f"embedding = CASE WHEN reviews.review_text IS DISTINCT FROM EXCLUDED.review_text THEN NULL ELSE reviews.embedding END "
+            f"WHERE ({current}) IS DISTINCT FROM ({parsed}) "
+            f"RETURNING {INSERTED_REVIEW_COLUMNS}, (xmax = 0) AS is_new"
+            f"), inserted AS ("
+            f"SELECT {INSERTED_REVIEW_COLUMNS} FROM merged WHERE is_new"
+            f"), {_BANDS_SQL}, "
+            + _stats_writes_sql(
+                f"SELECT {INSERTED_REVIEW_COLUMNS}, 1 AS sign FROM merged "
+                f"UNION ALL SELECT o.*, -1 FROM old o JOIN merged m ON m.id = o.id AND m.organization_id = o.organization_id "
+                f"WHERE NOT m.is_new"
+            )
+            + " SELECT count(*) FILTER (WHERE m.is_new), count(*) FILTER (WHERE NOT m.is_new), "
+            "array_agg(m.id) FILTER (WHERE NOT m.is_new AND m.simhash IS DISTINCT FROM o.simhash) "
+            "FROM merged m LEFT JOIN old o ON o.id = m.id AND o.organization_id = m.organization_id"
+        ))
+        inserted, updated, rehashed = result.one()
+        await self.session.execute(text(f"TRUNCATE {REVIEW_STAGING_TABLE}"))
+        if rehashed:
+            await self._reindex_fingerprints(rehashed, {row["organization_id"] for row in chunk})
+        return inserted, updated
+
+    async def _reindex_fingerprints(self, review_ids: List[int], organization_ids: Set[int]) -> None:
+        """
+        Replaces the LSH band rows of reviews whose SimHash changed in place. Runs as its own
+        statements: a DELETE and an INSERT of the same band key cannot share one.
+        """
+        params = {"ids": review_ids, "organization_ids": list(organization_ids)}
+        await self.session.execute(
+            text(
+                "DELETE FROM review_fingerprint_bands "
+                "WHERE review_id = ANY(CAST(:ids AS bigint[])) AND organization_id = ANY(CAST(:organization_ids AS bigint[]))"
+            ),
+            params,
+        )
+        await self.session.execute(
+            text(
+                f"WITH inserted AS ("
+                f"SELECT {INSERTED_REVIEW_COLUMNS} FROM reviews "
+                f"WHERE id = ANY(CAST(:ids AS bigint[])) AND organization_id = ANY(CAST(:organization_ids AS bigint[]))"
+                f"), {_BANDS_SQL} SELECT count(*) FROM inserted"
+            ),
+            params,
         )
+
+    async def _copy_to_staging(self, chunk: List[dict]) -> None:
+        """
+        COPY a chunk into the staging table; the merge empties it again, since it is only cleared on commit.
+        """
+        conn = await self.session.connection()
+        await self._ensure_staging_table()
+
+        raw_connection = await conn.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            REVIEW_STAGING_TABLE,
+            records=[self._to_copy_record(row) for row in chunk],
+            columns=REVIEW_COPY_COLUMNS,
+        )
+
+    async def ensure_partitions(self, rows: List[dict]) -> None:
+        """
+        Make sure the month partitions for the rows' review dates exist before they are merged, so no row
+        lands in a DEFAULT partition (which would block creating that month later). The DDL runs in its
+        own short transaction, outside the ingest one, and is skipped for months already seen. Call it
+        before the ingest transaction touches `reviews`: the DDL would otherwise wait on that transaction.
+        """
+        months = pending_review_months(row.get("review_date") for row in rows)
+        if not months:
+            return
+        async with self.session.bind.begin() as conn:
+            await ensure_review_month_partitions(conn, months)
+        record_review_months(months)
+
+    async def _ensure_staging_table(self) -> None:
+        """
+        Create the staging table for this connection if needed. A temporary table is never WAL-logged
+        (same write cost as an UNLOGGED table), is private to the connection so concurrent workers never
+        see each other's rows, and is emptied on every commit.
+        """
+        columns = ", ".join(REVIEW_COPY_COLUMNS)
+        await self.session.execute(text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {REVIEW_STAGING_TABLE} ON COMMIT DELETE ROWS "
+            f"AS SELECT {columns} FROM reviews WITH NO DATA"
+        ))
+
+    @staticmethod
+    def _to_copy_record(row: Dict[str, Any]) -> tuple:
+        """
+        Convert a review dict (as produced by the ingest service) into a COPY record.
+        Enum columns are sent by name and JSONB as text, matching how SQLAlchemy persists them.
+        """
+        record = []
+        for column in REVIEW_COPY_COLUMNS:
+            value = row.get(column)
+            if column == "source" and value is not None:
+                value = SourceType(value).name
+            elif column == "raw":
+                value = json.dumps(value or {}, default=str)
+            elif column == "is_near_duplicate":
+                value = bool(value)
+            record.append(value)
+        return tuple(record)
+    
+    async def lock_fingerprint_index(self, organization_id: int) -> None:
+        """
+        Takes the organization's near-duplicate lock until the end of the current transaction.
+        Writers holding it from their fingerprint lookup to their commit see each other's bands,
+        so two reposts ingested at the same instant cannot both be stored as canonical.
+        """
+        await self.session.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+            {"key": f"review_fingerprint_bands:{organization_id}"},
+        )
+
+    async def find_existing_external_ids(
+        self, organization_id: int, keys: Iterable[Tuple[SourceType, str]]
+    ) -> Set[Tuple[SourceType, str]]:
+        """
+        Returns the (source, external_id) pairs among `keys` that the organization already has a review for.
+        """
+        by_source: Dict[SourceType, List[str]] = defaultdict(list)
+        for source, external_id in keys:
+            if external_id is not None:
+                by_source[SourceType(source)].append(external_id)
+
+        existing: Set[Tuple[SourceType, str]] = set()
+        for source, external_ids in by_source.items():
+            result = await self.session.execute(
+                select(Review.external_id).where(
+                    Review.organization_id == organization_id,
+                    Review.source == source,
+                    Review.external_id.in_(external_ids),
+                )
+            )
+            existing.update((source, external_id) for external_id in result.scalars())
+        return existing
+
+    async def find_fingerprint_matches(
+        self, organization_id: int, band_keys: Iterable[Tuple[int, int]]
+    ) -> Dict[Tuple[int, int], List[int]]:
+        """
+        Looks up the banded LSH index for an organization. `band_keys` are (band, band_value) pairs;
+        returns, for each pair that has entries, the simhashes of the canonical reviews that share it.
+        """
+        band_keys = set(band_keys)
+        if not band_keys:
+            return {}
+
+        bands, band_values = zip(*band_keys)
+        result = await self.session.execute(
+            text(
+                "SELECT f.band, f.band_value, f.simhash FROM review_fingerprint_bands f "
+                "JOIN unnest(CAST(:bands AS smallint[]), CAST(:band_values AS integer[])) AS k(band, band_value) "
+                "ON f.band = k.band AND f.band_value = k.band_value "
+                "WHERE f.organization_id = :organization_id"
+            ),
+            {"organization_id": organization_id, "bands": list(bands), "band_values": list(band_values)},
+        )
+        matches: Dict[Tuple[int, int], List[int]] = {}
+        for band, band_value, simhash in result:
+            matches.setdefault((band, band_value), []).append(simhash)
+        return matches
+
+    async def get_reviews_missing_embeddings(
+        self, organization_id: Optional[int] = None, after_id: int = 0, limit: int = 256
+    ) -> List[Tuple[int, str]]:
+        """
+        Returns (id, review_text) for the next keyset batch of reviews that have text but no embedding,
+        ordered by id. Pass the last id of the previous batch as `after_id` to continue.
+        """
+        stmt = (
+            select(Review.id, Review.review_text)
+            .where(
+                Review.embedding.is_(None),
+                Review.review_text.is_not(None),
+                Review.is_near_duplicate.is_(False),
+                Review.id > after_id,
+            )
+            .order_by(Review.id)
+            .limit(limit)
+        )
+        if organization_id is not None:
+            stmt = stmt.where(Review.organization_id == organization_id)
+
+        result = await self.session.execute(stmt)
+        return [(row.id, row.review_text) for row in result]
+
+    async def update_embeddings(
+        self, embeddings: Sequence[Tuple[int, List[float]]], organization_id: Optional[int] = None
+    ) -> int:
+        """
+        Writes a batch of (review_id, embedding) pairs with a single
+        UPDATE reviews ... FROM (VALUES ...) statement and commits.
+        Pass the organization the reviews belong to so the update prunes to its partition.
+        Returns the number of rows updated.
+        """
+        if not embeddings:
+            return 0
+
+        batch = values(
+            column("id", BigInteger),
+            column("embedding", Vector(EMBEDDING_DIMENSIONS)),
+            name="v",
+        ).data([(review_id, embedding) for review_id, embedding in embeddings])
+        stmt = (
+            update(Review)
+            .where(Review.id == batch.c.id)
+            .values(embedding=cast(batch.c.embedding, Vector(EMBEDDING_DIMENSIONS)))
+            .execution_options(synchronize_session=False)
+        )
+        if organization_id is not None:
+            stmt = stmt.where(Review.organization_id == bindparam("organization_id", organization_id, literal_execute=True))
         result = await self.session.execute(stmt)
         await self.session.commit()
         return result.rowcount
-    
-    # TODO: do get_reviews_for_competitor_analysis and get_reviews_for_archetype_analysis
\ No newline at end of file
+
+    async def search_similar_reviews(
+        self,
+        organization_id: int,
+        embedding: List[float],
+        k: int = 10,
+        sources: Optional[List[SourceType]] = None,
+        brand_name: Optional[str] = None,
+        country: Optional[str] = None,
+        min_rating: Optional[int] = None,
+        max_rating: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        ef_search: Optional[int] = None,
+        iterative_scan: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the k reviews of an organization closest to `embedding` by cosine distance,
+        as dicts with the review columns plus `distance`.
+
+        organization_id is inlined as a literal rather than bound, so the planner can match the
+        organization's partial HNSW index (if it has one) even when the prepared statement
+        switches to a generic plan. ef_search and iterative_scan are applied with SET LOCAL and
+        only affect the current transaction.
+
+        The index scan runs in a materialized CTE and its k rows are sorted again outside it:
+        with iterative_scan=relaxed_order, pgvector may return them slightly out of distance order.
+        """
+        if ef_search:
+            await self.session.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+        if iterative_scan:
+            await self.session.execute(text("SELECT set_config('hnsw.iterative_scan', :mode, true)"), {"mode": iterative_scan})
+
+        distance = Review.embedding.cosine_distance(embedding).label("distance")
+        stmt = (
+            select(
+                Review.id,
+                Review.source,
+                Review.external_id,
+                Review.brand_name,
+                Review.country,
+                Review.rating,
+                Review.review_text,
+                Review.review_date,
+                distance,
+            )
+            .where(
+                Review.organization_id == bindparam("organization_id", organization_id, literal_execute=True),
+                Review.embedding.is_not(None),
+            )
+            .order_by(distance)
+            .limit(k)
+        )
+        if sources:
+            stmt = stmt.where(Review.source.in_(sources))
+        if brand_name:
+            stmt = stmt.where(Review.brand_name == brand_name)
+        if country:
+            stmt = stmt.where(Review.country == country)
+        if min_rating is not None:
+            stmt = stmt.where(Review.rating >= min_rating)
+        if max_rating is not None:
+            stmt = stmt.where(Review.rating <= max_rating)
+        if date_from:
+            stmt = stmt.where(Review.review_date >= date_from)
+        if date_to:
+            stmt = stmt.where(Review.review_date < date_to)
+
+        nearest = stmt.cte("nearest").prefix_with("MATERIALIZED")
+        result = await self.session.execute(select(nearest).order_by(nearest.c.distance))
+        return [dict(row._mapping) for row in result]
+
+    async def count_embedded_reviews(self, organization_id: int) -> int:
+        """
+        Number of reviews of an organization that already have an embedding.
+        """
+        stmt = select(func.count()).select_from(Review).where(
+            Review.organization_id == organization_id,
+            Review.embedding.is_not(None),
+        )
+        return (await self.session.execute(stmt)).scalar_one()
+
+    async def ensure_organization_embedding_index(self, organization_id: int) -> List[str]:
+        """
+        Builds a partial HNSW index restricted to one organization, so its similarity searches walk a
+        graph that only contains its own rows instead of filtering other tenants out of the global one.
+        `reviews` is partitioned and CONCURRENTLY cannot target a partitioned table, so one index is
+        built on each leaf partition that can hold the organization's rows; month partitions created
+        later get theirs when they are created (see app.db.partitions).
+        Must be called on a session with no open transaction. Returns the index names.
+        """
+        organization_id = int(organization_id)
+        conn = await self.session.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+        index_names = []
+        for partition in await organization_partitions(conn, organization_id):
+            await conn.execute(text(organization_embedding_index_ddl(partition, organization_id, concurrently=True)))
+            index_names.append(organization_embedding_index_name(partition, organization_id))
+        return index_names
+
+    async def get_reviews_for_archetype_analysis(
+        self,
+        organization_id: int,
+        limit: int = 100,
+        brand_names: Optional[Sequence[str]] = None,
+    ) -> List[str]:
+        """
+        Returns up to `limit` review texts of an organization, stratified by source, rating and
+        recency so the sample has the same mix as the whole corpus. See _sample_review_texts.
+        """
+        return await self._sample_review_texts(organization_id, limit, brand_names)
+
+    async def get_reviews_for_competitor_analysis(
+        self,
+        organization_id: int,
+        competitor_id: int,
+        limit: int = 100,
+    ) -> List[str]:
+        """
+        Same sample restricted to a competitor: reviews scraped for the brands of its source configs,
+        or under the competitor's own name. Returns an empty list for an unknown competitor.
+        """
+        name = (await self.session.execute(
+            select(Competitor.name).where(Competitor.id == competitor_id, Competitor.organization_id == organization_id)
+        )).scalar_one_or_none()
+        if name is None:
+            return []
+
+        brands = (await self.session.execute(
+            select(SourceConfig.brand_name)
+            .join(SourceGroup, SourceGroup.id == SourceConfig.source_group_id)
+            .where(SourceGroup.competitor_id == competitor_id)
+            .distinct()
+        )).scalars().all()
+        return await self._sample_review_texts(organization_id, limit, sorted({name, *brands}))
+
+    async def _sample_review_texts(
+        self,
+        organization_id: int,
+        limit: int,
+        brand_names: Optional[Sequence[str]] = None,
+    ) -> List[str]:
+        """
+        Stratified random sample of review texts that never sorts or scans the organization's reviews:
+
+        1. stratum sizes (source x rating x recency) are read from review_daily_stats;
+        2. one TABLESAMPLE SYSTEM pass reads random pages of the organization's partition, sized to
+           yield about REVIEW_SAMPLE_OVERSAMPLING times `limit` rows, and each stratum keeps up to its
+           quota (see allocate_stratum_quotas);
+        3. strata left short, since block sampling picks up rows written together, are topped up by
+           reservoir sampling over a bounded keyset window that starts at a random date.
+
+        Corpora up to REVIEW_SAMPLE_FULL_SCAN_ROWS are read in full instead. Only review_text is
+        fetched; empty texts and near-duplicates are skipped. The result is shuffled.
+        """
+        if limit <= 0:
+            return []
+        today = datetime.now(timezone.utc).date()
+        sizes = await self._stratum_sizes(organization_id, today, brand_names)
+        total = sum(sizes.values())
+        if total == 0:
+            return []
+
+        quotas = allocate_stratum_quotas(sizes, limit)
+        full_scan = total <= settings.REVIEW_SAMPLE_FULL_SCAN_ROWS
+        rng = random.Random()
+
+        source = Review.__table__
+        if not full_scan:
+            percent = min(100.0, 100.0 * settings.REVIEW_SAMPLE_OVERSAMPLING * limit / total)
+            source = tablesample(source, func.system(percent), name="sampled_reviews")
+        stmt = select(
+            source.c.source, source.c.rating, self._stratum_date(source.c).label("review_date"), source.c.review_text
+        ).where(
+            *self._sample_conditions(source.c, organization_id, brand_names)
+        )
+
+        candidates: Dict[Stratum, List[str]] = defaultdict(list)
+        for row in await self.session.execute(stmt):
+            candidates[(row.source, row.rating, recency_bucket(row.review_date, today))].append(row.review_text)
+
+        samples = []
+        for stratum, quota in quotas.items():
+            texts = candidates.get(stratum, [])
+            picked = rng.sample(texts, quota) if len(texts) > quota else texts
+            if len(picked) < quota and not full_scan:
+                picked += await self._reservoir_sample_stratum(
+                    organization_id, stratum, quota - len(picked), today, brand_names, rng, exclude=set(picked)
+                )
+            samples.extend(picked)
+
+        rng.shuffle(samples)
+        return samples
+
+    async def _stratum_sizes(
+        self,
+        organization_id: int,
+        today: date,
+        brand_names: Optional[Sequence[str]] = None,
+    ) -> Dict[Stratum, int]:
+        """
+        Review counts per (source, rating, recency) from the daily aggregates.
+        """
+        recency = case(
+            *[
+                (ReviewDailyStats.day >= today - timedelta(days=max_age), label)
+                for label, max_age in SAMPLE_RECENCY_BUCKETS
+            ],
+            else_=SAMPLE_RECENCY_OLDER,
+        )
+        stmt = (
+            select(
+                ReviewDailyStats.source,
+                recency.label("recency"),
+                func.sum(ReviewDailyStats.review_count - ReviewDailyStats.rating_count).label("unrated"),
+                *[func.sum(getattr(ReviewDailyStats, f"rating_{r}")).label(f"rating_{r}") for r in _RATING_BUCKETS],
+            )
+            .where(ReviewDailyStats.organization_id == organization_id)
+            .group_by(ReviewDailyStats.source, recency)
+        )
+        if brand_names:
+            stmt = stmt.where(ReviewDailyStats.brand_name.in_(brand_names))
+
+        sizes: Dict[Stratum, int] = {}
+        for row in await self.session.execute(stmt):
+            sizes[(row.source, None, row.recency)] = int(row.unrated or 0)
+            for r in _RATING_BUCKETS:
+                sizes[(row.source, r, row.recency)] = int(row._mapping[f"rating_{r}"] or 0)
+        return sizes
+
+    async def _reservoir_sample_stratum(
+        self,
+        organization_id: int,
+        stratum: Stratum,
+        k: int,
+        today: date,
+        brand_names: Optional[Sequence[str]],
+        rng: random.Random,
+        exclude: Optional[set] = None,
+    ) -> List[str]:
+        """
+        Draws up to `k` texts of one stratum with reservoir sampling (Algorithm R) over a cursor that
+        streams at most k * SAMPLE_KEYSET_WINDOW rows in (date, id) order from a random date pivot,
+        wrapping around to the start of the stratum. The date bounds are the two ends of the stratum's
+        range in ix_reviews_org_source_rating_date, whose key includes the recency expression, and the
+        windows are ranges of it; the remaining filters (non-empty text, canonical, brand) only skip
+        the rows that fail them, so the cost does not grow with the stratum.
+        """
+        source, rating, recency = stratum
+        columns = Review.__table__.c
+        stratum_date = self._stratum_date(columns)
+        conditions = [
+            *self._sample_conditions(columns, organization_id, brand_names),
+            columns.source == source,
+            columns.rating.is_(None) if rating is None else columns.rating == rating,
+            self._recency_condition(stratum_date, recency, today),
+        ]
+        lowest, highest = (await self.session.execute(
+            select(func.min(stratum_date), func.max(stratum_date)).where(*conditions)
+        )).one()
+        if lowest is None:
+            return []
+
+        pivot = lowest + (highest - lowest) * rng.random()
+        budget = k * SAMPLE_KEYSET_WINDOW
+        exclude = exclude or set()
+        reservoir: List[str] = []
+        seen = 0
+        for window in (stratum_date >= pivot, stratum_date < pivot):
+            stmt = select(columns.review_text).where(*conditions, window).order_by(stratum_date, columns.id).limit(budget)
+            async for (review_text,) in await self.session.stream(stmt):
+                budget -= 1
+                if review_text in exclude:
+                    continue
+                seen += 1
+                if len(reservoir) < k:
+                    reservoir.append(review_text)
+                else:
+                    slot = rng.randrange(seen)
+                    if slot < k:
+                        reservoir[slot] = review_text
+            if budget <= 0:
+                break
+        return reservoir
+
+    @staticmethod
+    def _sample_conditions(columns, organization_id: int, brand_names: Optional[Sequence[str]] = None) -> list:
+        conditions = [
+            columns.organization_id == bindparam("organization_id", organization_id, literal_execute=True),
+            columns.review_text.is_not(None),
+            columns.review_text != "",
+            columns.is_near_duplicate.is_(False),
+        ]
+        if brand_names:
+            conditions.append(columns.brand_name.in_(brand_names))
+        return conditions
+
+    @staticmethod
+    def _stratum_date(columns):
+        """
+        Date a review is bucketed by; undated reviews count from ingestion, as in review_daily_stats.
+        """
+        return review_stratum_date(columns)
+
+    @staticmethod
+    def _recency_condition(review_date, recency: str, today: date):
+        """
+        SQL counterpart of recency_bucket for one label, on the (never NULL) stratum date.
+        """
+        upper = None
+        for label, max_age in SAMPLE_RECENCY_BUCKETS:
+            lower = datetime.combine(today - timedelta(days=max_age), time.min, tzinfo=timezone.utc)
+            if label == recency:
+                return review_date >= lower if upper is None else and_(review_date >= lower, review_date < upper)
+            upper = lower
+        return review_date < upper
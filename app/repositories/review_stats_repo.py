@@ -0,0 +1,57 @@
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ReviewDailyStats
+from app.domain.types import SourceType
+
+# Dimensions a stats query can be grouped by, mapped to their expression on review_daily_stats
+STATS_DIMENSIONS = {
+    "brand": ReviewDailyStats.brand_name,
+    "source": ReviewDailyStats.source,
+    "country": ReviewDailyStats.country,
+    "day": ReviewDailyStats.day,
+    "month": cast(func.date_trunc("month", ReviewDailyStats.day), Date),
+}
+
+class ReviewStatsRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_stats(
+        self,
+        organization_id: int,
+        group_by: Sequence[str] = ("brand", "source", "country", "month"),
+        brand_name: Optional[str] = None,
+        sources: Optional[List[SourceType]] = None,
+        country: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Rolls review_daily_stats up to the requested dimensions. Reads only the aggregates table,
+        never `reviews`. date_from is inclusive and date_to exclusive.
+        Each row holds the dimension values plus review_count, rating_count, rating_sum and rating_1..5.
+        """
+        dimensions = [STATS_DIMENSIONS[name].label(name) for name in group_by]
+        totals = [
+            func.coalesce(func.sum(getattr(ReviewDailyStats, column)), 0).label(column)
+            for column in ("review_count", "rating_count", "rating_sum", "rating_1", "rating_2", "rating_3", "rating_4", "rating_5")
+        ]
+        stmt = select(*dimensions, *totals).where(ReviewDailyStats.organization_id == organization_id)
+        if brand_name:
+            stmt = stmt.where(ReviewDailyStats.brand_name == brand_name)
+        if sources:
+            stmt = stmt.where(ReviewDailyStats.source.in_(sources))
+        if country is not None:
+            stmt = stmt.where(ReviewDailyStats.country == country)
+        if date_from:
+            stmt = stmt.where(ReviewDailyStats.day >= date_from)
+        if date_to:
+            stmt = stmt.where(ReviewDailyStats.day < date_to)
+        if dimensions:
+            stmt = stmt.group_by(*dimensions).order_by(*dimensions)
+
+        result = await self.session.execute(stmt)
+        return [dict(row._mapping) for row in result]
@@ -1,8 +1,10 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func, or_, update
+from sqlalchemy.orm import aliased
 
-from app.models import SourceConfig
+from app.models import Competitor, SourceConfig, SourceGroup, User
 from app.domain.types import SourceType
 
 class SourceConfigRepositoru:
@@ -44,6 +46,52 @@ class SourceConfigRepositoru:
         await self.session.refresh(config)
         return config
 
+    async def get_due_for_refresh(self, stale_before: datetime, after_id: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+        """
+        One keyset batch (id > after_id) of active configs not refreshed since `stale_before`, with
+        the organization they belong to and the user a refresh job runs as: the group's user, or,
+        for competitor groups, the organization's oldest active user.
+        """
+        # an alias, so the subquery does not correlate to the User outer-joined below
+        member = aliased(User)
+        org_user = (
+            select(func.min(member.id))
+            .where(member.organization_id == Competitor.organization_id, member.is_active == True)
+            .scalar_subquery()
+        )
+        stmt = (
+            select(
+                SourceConfig.id,
+                SourceConfig.source,
+                SourceConfig.brand_name,
+                SourceConfig.countries,
+                SourceConfig.number_of_reviews,
+                SourceConfig.options,
+                func.coalesce(User.organization_id, Competitor.organization_id).label("organization_id"),
+                func.coalesce(SourceGroup.user_id, org_user).label("user_id"),
+            )
+            .join(SourceGroup, SourceGroup.id == SourceConfig.source_group_id)
+            .outerjoin(User, User.id == SourceGroup.user_id)
+            .outerjoin(Competitor, Competitor.id == SourceGroup.competitor_id)
+            .where(
+                SourceConfig.is_active == True,
+                SourceConfig.id > after_id,
+                or_(SourceConfig.last_refreshed_at.is_(None), SourceConfig.last_refreshed_at < stale_before),
+            )
+            .order_by(SourceConfig.id)
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return [dict(row._mapping) for row in result]
+
+    async def mark_refreshed(self, config_ids: List[int], refreshed_at: datetime) -> None:
+        if not config_ids:
+            return
+        await self.session.execute(
+            update(SourceConfig).where(SourceConfig.id.in_(config_ids)).values(last_refreshed_at=refreshed_at)
+        )
+        await self.session.commit()
+
     async def delete(self, user_id: int, source: SourceType) -> bool:
         """
         Deletes a source configuration
@@ -4,7 +4,7 @@ from typing import List, Optional, Tuple
 from datetime import datetime, timezone, timedelta
 from uuid import UUID 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, and_, or_
+from sqlalchemy import select, update, delete, and_, or_, func, tuple_
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 
@@ -18,6 +18,8 @@ from app.models.email_verification import EmailVerification
 from app.domain.types import Role, TokenType
 from app.core.exceptions import NotFoundError, ConflictError
 from app.core.security import hash_token
+from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -147,6 +149,8 @@ class UserRepository:
     ) -> List[User]:
         """
         Search users with various filters.
+        `query` matches substrings of name or email through the trigram indexes.
+        Raises ValueError if `query` is shorter than USER_SEARCH_MIN_QUERY_LENGTH.
         """
         stmt = select(User)
         
@@ -156,13 +160,7 @@ class UserRepository:
             conditions.append(User.organization_id == organization_id)
         
         if query:
-            search_term = f"%{query}%"
-            conditions.append(
-                or_(
-                    User.name.ilike(search_term),
-                    User.email.ilike(search_term)
-                )
-            )
+            conditions.append(self._substring_match(self._search_term(query)))
         
         if is_active is not None:
             conditions.append(User.is_active == is_active)
@@ -174,6 +172,56 @@ class UserRepository:
         
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
+
+    async def search_users_ranked(
+        self,
+        query: str,
+        organization_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[User], Optional[str]]:
+        """
+        Relevance-ranked search: users whose name or email contains `query` or is trigram-similar
+        to it (pg_trgm `%`), best match first. Both predicates are served by the trigram GIN
+        indexes, so only matching rows are ranked. Keyset pagination on (score, id).
+        Raises ValueError for a too short query or a malformed cursor.
+        """
+        term = self._search_term(query)
+        score = func.greatest(func.similarity(User.name, term), func.similarity(User.email, term))
+
+        stmt = select(User, score.label("score")).where(
+            or_(self._substring_match(term), User.name.op("%")(term), User.email.op("%")(term))
+        )
+        if organization_id is not None:
+            stmt = stmt.where(User.organization_id == organization_id)
+        if is_active is not None:
+            stmt = stmt.where(User.is_active == is_active)
+        if cursor:
+            last_score, last_id = decode_cursor(cursor, expected_len=2, types=((int, float), int))
+            stmt = stmt.where(tuple_(score, User.id) < (last_score, last_id))
+
+        # Fetch one extra row to know whether another page exists without a COUNT
+        stmt = stmt.order_by(score.desc(), User.id.desc()).limit(limit + 1)
+        rows = (await self.session.execute(stmt)).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(float(rows[-1].score), rows[-1].User.id)
+        return [row.User for row in rows], next_cursor
+
+    @staticmethod
+    def _search_term(query: str) -> str:
+        term = (query or "").strip()
+        if len(term) < settings.USER_SEARCH_MIN_QUERY_LENGTH:
+            raise ValueError(f"Search query must be at least {settings.USER_SEARCH_MIN_QUERY_LENGTH} characters")
+        return term
+
+    @staticmethod
+    def _substring_match(term: str):
+        pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return or_(User.name.ilike(pattern, escape="\\"), User.email.ilike(pattern, escape="\\"))
     
     async def update_user(self, user_id: int, **kwargs) -> Optional[User]:
         """
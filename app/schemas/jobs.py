@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field 
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-from app.domain.types import SourceType, JobStatus, JobSourceStatus
+from app.domain.types import SourceType, JobStatus, JobSourceStatus, JobType
 
 class SourceConfigRequest(BaseModel):
     source_type: SourceType
@@ -30,6 +30,7 @@ class JobResponse(BaseModel):
     user_id: int
     organization_id: int
     unit_id: Optional[int] = None
+    job_type: Optional[JobType] = None
     status: JobStatus
     error: Optional[str] = None
     created_at: datetime
@@ -40,6 +41,13 @@ class JobResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class JobListResponse(BaseModel):
+    """
+    Cursor-paginated page of jobs. Pass next_cursor back as `cursor` to fetch the following page.
+    """
+    items: List[JobResponse] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+
 class ReviewData(BaseModel):
     """
     TODO: This is a placeholder for the review data.
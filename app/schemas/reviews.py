@@ -0,0 +1,69 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, Dict, List, Literal, Optional
+from datetime import date, datetime
+from app.domain.types import SourceType
+
+class ReviewSearchRequest(BaseModel):
+    query: str = Field(min_length=1, max_length=2000)
+    k: int = Field(default=10, ge=1, le=100)
+    sources: Optional[List[SourceType]] = None
+    brand_name: Optional[str] = None
+    country: Optional[str] = None
+    min_rating: Optional[int] = Field(default=None, ge=1, le=5)
+    max_rating: Optional[int] = Field(default=None, ge=1, le=5)
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    ef_search: Optional[int] = Field(default=None, ge=1, le=1000)
+
+    @model_validator(mode="after")
+    def check_ranges(self) -> "ReviewSearchRequest":
+        if self.min_rating is not None and self.max_rating is not None and self.min_rating > self.max_rating:
+            raise ValueError("min_rating must be lower than or equal to max_rating")
+        if self.date_from and self.date_to and self.date_from >= self.date_to:
+            raise ValueError("date_from must be earlier than date_to")
+        return self
+
+class ReviewSearchHit(BaseModel):
+    id: int
+    source: SourceType
+    external_id: Optional[str] = None
+    brand_name: str
+    country: Optional[str] = None
+    rating: Optional[int] = None
+    review_text: Optional[str] = None
+    review_date: Optional[datetime] = None
+    similarity: float
+
+class ReviewSearchResponse(BaseModel):
+    items: List[ReviewSearchHit] = Field(default_factory=list)
+    ef_search: int
+
+StatsDimension = Literal["brand", "source", "country", "day", "month"]
+
+class ReviewStatsBucket(BaseModel):
+    """
+    One group of the stats rollup; dimension fields not in group_by are None.
+    """
+    brand: Optional[str] = None
+    source: Optional[SourceType] = None
+    country: Optional[str] = None
+    day: Optional[date] = None
+    month: Optional[date] = None
+    review_count: int
+    rating_count: int
+    average_rating: Optional[float] = None
+    histogram: Dict[int, int] = Field(default_factory=dict)
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "ReviewStatsBucket":
+        rating_count = row["rating_count"]
+        return cls(
+            **{key: value for key, value in row.items() if not key.startswith("rating_")},
+            rating_count=rating_count,
+            average_rating=round(row["rating_sum"] / rating_count, 3) if rating_count else None,
+            histogram={rating: row[f"rating_{rating}"] for rating in range(1, 6)},
+        )
+
+class ReviewStatsResponse(BaseModel):
+    group_by: List[StatsDimension]
+    items: List[ReviewStatsBucket] = Field(default_factory=list)
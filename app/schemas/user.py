@@ -55,4 +55,11 @@ class UserListResponse(BaseModel):
     created_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class UserSearchPageResponse(BaseModel):
+    """
+    Relevance-ranked page of users. Pass next_cursor back as `cursor` to fetch the following page.
+    """
+    items: List[UserListResponse] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
@@ -0,0 +1,180 @@
+import asyncio
+import hashlib
+import logging
+import math
+import re
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.models.review import EMBEDDING_DIMENSIONS
+from app.repositories.review_repo import ReviewRepository
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class EmbeddingProvider(ABC):
+    """
+    Turns a batch of texts into vectors of `dimensions` floats, one per input and in the same order.
+    """
+    name: str = "base"
+    dimensions: int = EMBEDDING_DIMENSIONS
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        pass
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """
+    Deterministic, offline provider based on the hashing trick: every unigram and bigram is hashed
+    into a signed bucket and the result is L2-normalised. Texts sharing vocabulary end up close
+    in cosine space, which is enough for local development, tests and benchmarks.
+    """
+    name = "hashing"
+
+    def __init__(self, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.dimensions = dimensions
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.to_thread(lambda: [self.embed_one(text) for text in texts])
+
+    def embed_one(self, text: str) -> List[float]:
+        tokens = _TOKEN_RE.findall((text or "").lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        if not features:
+            features = [text or ""]
+
+        vector = [0.0] * self.dimensions
+        for feature in features:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+            sign = 1.0 if digest & 1 else -1.0
+            vector[(digest >> 1) % self.dimensions] += sign
+
+        norm = math.sqrt(sum(value * value for value in vector))
+        if norm == 0:
+            # every feature cancelled out; fall back to a fixed unit vector so cosine distance stays defined
+            vector[0], norm = 1.0, 1.0
+        return [value / norm for value in vector]
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """
+    Calls an OpenAI-compatible /embeddings endpoint.
+    """
+    name = "openai"
+
+    def __init__(self, model: str, api_key: Optional[str] = None, base_url: Optional[str] = None):
+        from openai import AsyncOpenAI
+
+        self.model = model
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        response = await self.client.embeddings.create(
+            model=self.model,
+            input=texts,
+            dimensions=self.dimensions,
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+@lru_cache
+def get_embedding_provider(name: Optional[str] = None) -> EmbeddingProvider:
+    """
+    Returns the provider configured by EMBEDDING_PROVIDER (or `name` when given).
+    Cached so API requests and tasks reuse one client per process.
+    """
+    name = (name or settings.EMBEDDING_PROVIDER).lower()
+    if name == HashingEmbeddingProvider.name:
+        return HashingEmbeddingProvider()
+    if name == OpenAIEmbeddingProvider.name:
+        return OpenAIEmbeddingProvider(
+            model=settings.EMBEDDING_MODEL,
+            api_key=settings.EMBEDDING_API_KEY,
+            base_url=settings.EMBEDDING_API_BASE_URL,
+        )
+    raise ValueError(f"Unknown embedding provider: {name}")
+
+
+class ReviewEmbeddingService:
+    def __init__(
+        self,
+        review_repo: ReviewRepository,
+        provider: EmbeddingProvider,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ):
+        self.review_repo = review_repo
+        self.provider = provider
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.concurrency = concurrency or settings.EMBEDDING_CONCURRENCY
+
+    async def embed_pending_reviews(
+        self,
+        organization_id: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Embeds every review that still has a null embedding, walking them in id order.
+
+        Each round reads `batch_size * concurrency` rows, sends up to `concurrency` provider calls
+        in flight at once and writes every batch back with one UPDATE. Progress lives in the table
+        itself (rows leave the null-embedding set as they are written), so a crashed run is resumed
+        simply by starting the job again.
+
+        Returns counts plus the throughput in rows per second.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        window = self.batch_size * self.concurrency
+        after_id = 0
+        embedded = 0
+        batches = 0
+        started = time.perf_counter()
+
+        async def embed_batch(batch):
+            async with semaphore:
+                vectors = await self.provider.embed([text for _, text in batch])
+            if len(vectors) != len(batch):
+                raise ValueError(f"Provider returned {len(vectors)} embeddings for {len(batch)} texts")
+            return [(review_id, vector) for (review_id, _), vector in zip(batch, vectors)]
+
+        while max_rows is None or embedded < max_rows:
+            limit = window if max_rows is None else min(window, max_rows - embedded)
+            rows = await self.review_repo.get_reviews_missing_embeddings(
+                organization_id=organization_id, after_id=after_id, limit=limit
+            )
+            if not rows:
+                break
+            after_id = rows[-1][0]
+
+            chunks = [rows[i:i + self.batch_size] for i in range(0, len(rows), self.batch_size)]
+            results = await asyncio.gather(*(embed_batch(chunk) for chunk in chunks))
+            for pairs in results:
+                embedded += await self.review_repo.update_embeddings(pairs, organization_id=organization_id)
+                batches += 1
+
+            if on_progress:
+                await on_progress(self._report(embedded, batches, started))
+
+        report = self._report(embedded, batches, started)
+        logger.info(
+            f"Embedded {report['rows_embedded']} reviews in {report['elapsed_seconds']}s "
+            f"({report['rows_per_second']} rows/s) with provider '{self.provider.name}'"
+        )
+        return report
+
+    @staticmethod
+    def _report(embedded: int, batches: int, started: float) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - started
+        return {
+            "rows_embedded": embedded,
+            "batches": batches,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(embedded / elapsed, 1) if elapsed > 0 else 0.0,
+        }
@@ -8,6 +8,8 @@ from datetime import datetime
 from app.domain.events import BaseEvent, JobEvent, TaskEvent, ProgressEvent, ErrorEvent, SystemEvent, UserNotificationEvent
 from app.domain.types import WebSocketEventType
 from app.db.redis import get_redis_client
+from app.core.config import settings
+from app.services.job_event_log import job_event_log
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +36,10 @@ class EventDispatcher:
         Main dispatch method for events
         """
         try:
+            if settings.JOB_EVENT_LOG_ENABLED:
+                # buffered; persisted in the background by the job event log
+                job_event_log.record(event)
+
             manager = self._get_manager()
             await manager.send_event_to_channels(event)
 
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional
+
+import redis.asyncio as redis
+from arq.connections import ArqRedis
+from arq.jobs import Job, JobStatus as ArqJobStatus
+
+from app.core.config import settings
+from app.db.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+CANCEL_KEY_PREFIX = "job:cancel"
+
+
+class JobCancelledError(Exception):
+    """Raised inside a worker task once its job has been cancelled."""
+
+    def __init__(self, job_id: str):
+        super().__init__(f"Job {job_id} was cancelled")
+        self.job_id = job_id
+
+
+@dataclass
+class CancellationScope:
+    job_id: str
+    requested: bool = False
+
+
+class JobCancellation:
+    """
+    Cooperative cancellation of jobs.
+
+    `job:cancel:<job_id>` is the cancellation flag. `job:cancel:<job_id>:arq` maps each ARQ job
+    enqueued for the job to its queue, so the ones still waiting can be aborted. Running tasks never
+    get killed by ARQ: they watch the flag themselves (see `watch`), so they can record what they
+    had done before stopping.
+    """
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        self._redis = redis_client
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = get_redis_client()
+        return self._redis
+
+    @staticmethod
+    def _flag_key(job_id: str) -> str:
+        return f"{CANCEL_KEY_PREFIX}:{job_id}"
+
+    @staticmethod
+    def _arq_jobs_key(job_id: str) -> str:
+        return f"{CANCEL_KEY_PREFIX}:{job_id}:arq"
+
+    async def record_enqueued(self, job_id: str, arq_job: Optional[Job], queue_name: str) -> None:
+        if arq_job is None:
+            return
+        ttl = settings.JOB_CANCEL_TTL_SECONDS
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._arq_jobs_key(job_id), arq_job.job_id, queue_name)
+            pipe.expire(self._arq_jobs_key(job_id), ttl)
+            await pipe.execute()
+
+    async def request(self, job_id: str) -> None:
+        await self.redis.set(self._flag_key(job_id), 1, ex=settings.JOB_CANCEL_TTL_SECONDS)
+
+    async def is_cancelled(self, job_id: str) -> bool:
+        return bool(await self.redis.exists(self._flag_key(job_id)))
+
+    async def raise_if_cancelled(self, job_id: str) -> None:
+        if await self.is_cancelled(job_id):
+            raise JobCancelledError(job_id)
+
+    async def abort_queued(self, arq_pool: ArqRedis, job_id: str) -> int:
+        """
+        Aborts the job's ARQ jobs that no worker has started yet; they finish as "aborted before
+        start" without running. Returns how many were aborted. Does not wait for ARQ to confirm.
+        """
+        recorded: Dict = await self.redis.hgetall(self._arq_jobs_key(job_id))
+        aborted = 0
+        for arq_job_id, queue_name in recorded.items():
+            arq_job_id = arq_job_id.decode() if isinstance(arq_job_id, bytes) else arq_job_id
+            queue_name = queue_name.decode() if isinstance(queue_name, bytes) else queue_name
+            arq_job = Job(arq_job_id, arq_pool, _queue_name=queue_name)
+            if await arq_job.status() not in (ArqJobStatus.queued, ArqJobStatus.deferred):
+                continue
+            try:
+                await arq_job.abort(timeout=0, poll_delay=0.01)
+            except asyncio.TimeoutError:
+                pass
+            aborted += 1
+        return aborted
+
+    @asynccontextmanager
+    async def watch(self, job_id: str) -> AsyncIterator[CancellationScope]:
+        """
+        Runs the body while polling the flag every JOB_CANCEL_POLL_SECONDS. When the job is cancelled,
+        the body is interrupted at its current await (a page fetch, a batch write, an LLM call) and
+        JobCancelledError is raised in its place:
+
+            async with job_cancellation.watch(job_id):
+                await long_running_work()
+        """
+        scope = CancellationScope(job_id)
+        task = asyncio.current_task()
+
+        async def poll() -> None:
+            while True:
+                await asyncio.sleep(settings.JOB_CANCEL_POLL_SECONDS)
+                try:
+                    if await self.is_cancelled(job_id):
+                        scope.requested = True
+                        task.cancel()
+                        return
+                except Exception as e:
+                    logger.debug(f"[{job_id}] Could not check for cancellation: {e}")
+
+        poller = asyncio.create_task(poll())
+        try:
+            yield scope
+        except asyncio.CancelledError:
+            if not scope.requested:
+                # ARQ itself cancels a task that started between abort_queued's status check and its
+                # abort; with the flag set that is our cancellation, not a shutdown or job timeout
+                try:
+                    scope.requested = await self.is_cancelled(job_id)
+                except Exception as e:
+                    logger.debug(f"[{job_id}] Could not check for cancellation: {e}")
+            if not scope.requested:
+                # a worker shutdown or job timeout, not ours to handle
+                raise
+            task.uncancel()
+            raise JobCancelledError(job_id) from None
+        else:
+            if scope.requested:
+                # the body swallowed the interruption and finished anyway
+                task.uncancel()
+        finally:
+            poller.cancel()
+
+
+# Global instance
+job_cancellation = JobCancellation()
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+import redis.asyncio as redis
+from arq.connections import ArqRedis
+from arq.constants import result_key_prefix
+from arq.jobs import Job
+
+from app.core.config import settings
+from app.db.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+COALESCE_KEY_PREFIX = "coalesce"
+
+
+def coalescing_key(organization_id: int, source_config: Dict[str, Any]) -> str:
+    """
+    Deterministic key of one scrape: the same organization, source, brand, set of countries and
+    options always give the same key, whatever the order or casing they were submitted in.
+    """
+    payload = {
+        "organization_id": organization_id,
+        "source": str(getattr(source_config.get("source_type"), "value", source_config.get("source_type"))).lower(),
+        "brand": (source_config.get("brand_name") or "").strip().lower(),
+        "countries": sorted({country.strip().upper() for country in source_config.get("countries") or []}),
+        "options": source_config.get("options") or {},
+    }
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")).hexdigest()
+    return f"scrape:{payload['source']}:{digest[:32]}"
+
+
+class JobCoalescer:
+    """
+    Records which job owns each in-flight scrape, so identical requests attach to it instead of
+    scraping again.
+
+    `coalesce:<key>` holds the owning job id. It is claimed with SET NX before the job is created,
+    so two simultaneous clicks cannot both win. It expires after JOB_COALESCE_RUNNING_TTL_SECONDS
+    in case the job never finishes. When the job completes, the entry is kept for
+    JOB_COALESCE_FRESHNESS_SECONDS so recent results are reused; after a failure it is removed.
+
+    `coalesce:attached:<job id>` holds the users who attached to a job, the only ones besides its
+    owner and organization admins allowed to read it. It outlives the claims (JOB_ATTACHMENT_TTL_SECONDS).
+    """
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        self._redis = redis_client
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = get_redis_client()
+        return self._redis
+
+    @staticmethod
+    def _owner_key(key: str) -> str:
+        return f"{COALESCE_KEY_PREFIX}:{key}"
+
+    @staticmethod
+    def _job_keys(job_id: str) -> str:
+        return f"{COALESCE_KEY_PREFIX}:job:{job_id}"
+
+    @staticmethod
+    def _attachers_key(job_id: str) -> str:
+        return f"{COALESCE_KEY_PREFIX}:attached:{job_id}"
+
+    async def claim(self, key: str, job_id: str) -> str:
+        """Claims `key` for `job_id`; returns the owning job id, i.e. `job_id` itself if the claim won."""
+        ttl = settings.JOB_COALESCE_RUNNING_TTL_SECONDS
+        if await self.redis.set(self._owner_key(key), job_id, nx=True, ex=ttl):
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.sadd(self._job_keys(job_id), key)
+                pipe.expire(self._job_keys(job_id), ttl)
+                await pipe.execute()
+            return job_id
+
+        owner = await self.redis.get(self._owner_key(key))
+        if owner is None:
+            # expired between SET and GET; try once more
+            return await self.claim(key, job_id)
+        return owner.decode() if isinstance(owner, bytes) else owner
+
+    async def record_attachment(self, job_id: str, user_id: int) -> None:
+        """Records that `user_id` attached to `job_id`, granting them read access to it."""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.sadd(self._attachers_key(job_id), str(user_id))
+            pipe.expire(self._attachers_key(job_id), settings.JOB_ATTACHMENT_TTL_SECONDS)
+            await pipe.execute()
+
+    async def is_attached(self, job_id: str, user_id: int) -> bool:
+        return bool(await self.redis.sismember(self._attachers_key(job_id), str(user_id)))
+
+    async def lookup(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        keys = list(keys)
+        owners = await self.redis.mget([self._owner_key(key) for key in keys]) if keys else []
+        return {key: (owner.decode() if isinstance(owner, bytes) else owner) for key, owner in zip(keys, owners)}
+
+    async def release_job(self, job_id: str, succeeded: bool) -> None:
+        """
+        Called when a job finishes: its keys stay claimed for the freshness window if it succeeded
+        and are released otherwise. Keys that another job has taken over meanwhile are left alone.
+        """
+        keys = await self.redis.smembers(self._job_keys(job_id))
+        owners = await self.lookup(key.decode() if isinstance(key, bytes) else key for key in keys)
+        freshness = settings.JOB_COALESCE_FRESHNESS_SECONDS
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, owner in owners.items():
+                if owner != job_id:
+                    continue
+                if succeeded and freshness > 0:
+                    pipe.expire(self._owner_key(key), freshness)
+                else:
+                    pipe.delete(self._owner_key(key))
+            pipe.delete(self._job_keys(job_id))
+            await pipe.execute()
+
+    @staticmethod
+    async def enqueue(arq_pool: ArqRedis, function: str, key: str, **kwargs: Any) -> Optional[Job]:
+        """
+        Enqueues with the coalescing key as the ARQ job id, so ARQ itself refuses a second copy of a
+        queued or running scrape. ARQ also refuses ids whose result is still kept; once we hold the
+        claim such a result is stale, so it is dropped and the enqueue retried.
+        """
+        job = await arq_pool.enqueue_job(function, _job_id=key, **kwargs)
+        if job is None:
+            await arq_pool.delete(result_key_prefix + key)
+            job = await arq_pool.enqueue_job(function, _job_id=key, **kwargs)
+        return job
+
+
+# Global instance
+job_coalescer = JobCoalescer()
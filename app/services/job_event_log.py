@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.domain.events import BaseEvent
+from app.repositories.job_repo import JobRepository
+
+logger = logging.getLogger(__name__)
+
+
+class JobEventLog:
+    """
+    Buffered, append-only writer for the job_events table.
+
+    `record` only appends to an in-memory buffer, so dispatching an event never waits on the
+    database. A background task per event loop writes the buffer with one multi-row INSERT every
+    `batch_size` events or `flush_interval_ms`, whichever comes first. Once a job finishes
+    (`request_compaction`, called by JobService.finalize_job) its older events are folded into a
+    summary after the next flush. JOB_COMPLETED events do not trigger it: one is sent per finished
+    source, while the job's other sources may still be running. The buffer is bounded: past `max_buffer` the oldest events are dropped.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+        max_buffer: Optional[int] = None,
+        keep_last: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.JOB_EVENT_BATCH_SIZE
+        self.flush_interval = (flush_interval_ms or settings.JOB_EVENT_FLUSH_INTERVAL_MS) / 1000
+        self.max_buffer = max_buffer or settings.JOB_EVENT_MAX_BUFFER
+        self.keep_last = settings.JOB_EVENT_KEEP_LAST if keep_last is None else keep_last
+        self.dropped = 0
+
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._pending_compactions: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def record(self, event: BaseEvent) -> None:
+        """
+        Queues a job-scoped event for persistence. Events without a job_id are ignored.
+        """
+        job_id = getattr(event, "job_id", None)
+        if not job_id:
+            return
+
+        if len(self._buffer) >= self.max_buffer:
+            self._buffer.popleft()
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"Job event buffer full, dropped {self.dropped} events so far")
+
+        data = dict(event.data)
+        if getattr(event, "task_name", None):
+            data.setdefault("task_name", event.task_name)
+        self._buffer.append({"job_id": job_id, "at": event.timestamp, "event": event.event_type.value, "data": data})
+        self._ensure_running()
+        if len(self._buffer) >= self.batch_size and self._wakeup:
+            self._wakeup.set()
+
+    def request_compaction(self, job_id: str) -> None:
+        """
+        Marks a finished job for compaction; done in the background after its buffered events are written.
+        """
+        self._pending_compactions.add(job_id)
+        self._ensure_running()
+        if self._wakeup:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """
+        Writes everything buffered so far, then runs pending compactions. Returns the rows written.
+        Failed batches are logged and dropped: the event log must never break the job itself.
+        """
+        async with self._get_lock():
+            written = 0
+            while self._buffer:
+                batch: List[Dict[str, Any]] = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                try:
+                    async with self.session_factory() as session:
+                        written += await JobRepository(session).append_job_events(batch)
+                except Exception as e:
+                    logger.error(f"Failed to write {len(batch)} job events: {e}")
+
+            while self._pending_compactions:
+                job_id = self._pending_compactions.pop()
+                try:
+                    async with self.session_factory() as session:
+                        compacted = await JobRepository(session).compact_job_events(job_id, keep_last=self.keep_last)
+                    if compacted:
+                        logger.info(f"[{job_id}] Compacted {compacted} job events into a summary")
+                except Exception as e:
+                    logger.error(f"[{job_id}] Failed to compact job events: {e}")
+            return written
+
+    async def close(self) -> None:
+        """
+        Stops the background flusher and writes whatever is still buffered.
+        """
+        task, self._task = self._task, None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None or self._loop is not asyncio.get_running_loop():
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _ensure_running(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # no loop (sync caller): events stay buffered until the next record from async code
+            return
+        if self._task and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._buffer or self._pending_compactions:
+                await self.flush()
+
+
+# Global instance
+job_event_log = JobEventLog()
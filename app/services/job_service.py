@@ -1,9 +1,14 @@
 import logging
 import uuid 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from arq.connections import ArqRedis
+from app.core.config import settings
+from app.core.exceptions import ConflictError, NotFoundError
 from app.repositories.job_repo import JobRepository
-from app.domain.types import SourceType, JobStatus, JobSourceStatus, JobType, JobTargetType
+from app.services.job_cancellation import job_cancellation
+from app.services.job_coalescing import coalescing_key, job_coalescer
+from app.services.job_event_log import job_event_log
+from app.domain.types import SourceType, JobStatus, JobSourceStatus, JobType, JobTargetType, JobPriority
 
 logger = logging.getLogger(__name__)
 
@@ -25,33 +30,91 @@ class JobService:
         """
         Creates a job with specified type, adds its sources, and enqueues background tasks.
         """
+        job_id, _ = await self.create_or_attach_job(
+            user_id, organization_id, job_type, target_type, target_id, sources_data, config
+        )
+        return job_id
+
+    async def create_or_attach_job(
+        self,
+        user_id: int,
+        organization_id: int,
+        job_type: JobType,
+        target_type: JobTargetType = JobTargetType.ORGANIZATION,
+        target_id: int = None,
+        sources_data: List[Dict[str, Any]] = None,
+        config: Dict[str, Any] = None
+    ) -> Tuple[Optional[str], Dict[SourceType, str]]:
+        """
+        Like create_and_start_job, but a scrape identical to one already running (or completed within
+        JOB_COALESCE_FRESHNESS_SECONDS) returns that job instead of starting a new one.
+
+        Returns (job_id, attached_to): `attached_to` maps each source already scraped by another job
+        to that job. A new job is only created for the remaining sources; when there are none,
+        `job_id` is the one job covering every source, or None if several jobs do.
+        """
         job_id = str(uuid.uuid4())
         target_id = target_id or organization_id
+
+        coalesce_keys: Dict[SourceType, str] = {}
+        coalesced_with: Dict[SourceType, str] = {}
+        if job_type == JobType.REVIEW_SCRAPING and sources_data and settings.JOB_COALESCING_ENABLED:
+            coalesce_keys = {
+                SourceType(source["source_type"]): coalescing_key(organization_id, source) for source in sources_data
+            }
+            try:
+                for source_type, key in coalesce_keys.items():
+                    owner = await job_coalescer.claim(key, job_id)
+                    if owner != job_id:
+                        coalesced_with[source_type] = owner
+            except Exception as e:
+                # coalescing is an optimisation: without Redis every request simply gets its own job
+                logger.warning(f"Job coalescing unavailable, starting a new job: {e}")
+                coalesce_keys, coalesced_with = {}, {}
+
+            owners = set(coalesced_with.values())
+            for owner in owners:
+                # lets the user read the job that scrapes (some of) their sources
+                try:
+                    await job_coalescer.record_attachment(owner, user_id)
+                except Exception as e:
+                    logger.warning(f"Could not record user {user_id} as attached to job {owner}: {e}")
+            if coalesced_with and len(coalesced_with) == len(coalesce_keys):
+                # nothing is left for a new job to do: the caller follows the owning jobs instead
+                existing_job_id = owners.pop() if len(owners) == 1 else None
+                logger.info(f"Scrape request from user {user_id} attached to jobs {sorted(set(coalesced_with.values()))}")
+                return existing_job_id, coalesced_with
         
         logger.info(f"Creating {job_type.value} job {job_id} for user {user_id}, org {organization_id}, target {target_type.value}:{target_id}")
 
-        # Create the main job record with job_type and target info
-        await self.job_repo.create_job(
-            job_id=job_id, 
-            user_id=user_id, 
-            organization_id=organization_id,
-            job_type=job_type,
-            target_type=target_type,
-            target_id=target_id
-        )
-
-        # Enqueue tasks based on job type
-        if self.arq_pool:
-            await self._enqueue_tasks_for_job_type(
-                job_id, organization_id, job_type, target_type, target_id, sources_data, config
+        try:
+            # Create the main job record with job_type and target info
+            await self.job_repo.create_job(
+                job_id=job_id, 
+                user_id=user_id, 
+                organization_id=organization_id,
+                job_type=job_type,
+                target_type=target_type,
+                target_id=target_id
             )
-        else:
-            logger.warning("No ARQ pool available, tasks not enqueued")
+
+            # Enqueue tasks based on job type
+            if self.arq_pool:
+                await self._enqueue_tasks_for_job_type(
+                    job_id, organization_id, job_type, target_type, target_id, sources_data, config,
+                    coalesce_keys=coalesce_keys, coalesced_with=coalesced_with,
+                )
+            else:
+                logger.warning("No ARQ pool available, tasks not enqueued")
+        except Exception:
+            if coalesce_keys:
+                # do not leave later requests attached to a job that was never started
+                await job_coalescer.release_job(job_id, succeeded=False)
+            raise
         
         await self.job_repo.update_job_status(job_id=job_id, status=JobStatus.RUNNING)
         logger.info(f"Job {job_id} Status set to RUNNING")
-
-        return job_id
+        return job_id, coalesced_with
     
     async def _enqueue_tasks_for_job_type(
         self, 
@@ -61,12 +124,27 @@ class JobService:
         target_type: JobTargetType,
         target_id: int,
         sources_data: List[Dict[str, Any]] = None,
-        config: Dict[str, Any] = None
+        config: Dict[str, Any] = None,
+        coalesce_keys: Optional[Dict[SourceType, str]] = None,
+        coalesced_with: Optional[Dict[SourceType, str]] = None,
     ) -> None:
-        """Enqueue appropriate tasks based on job type."""
+        """
+        Enqueue appropriate tasks based on job type.
+        Scrape sources listed in `coalesced_with` are already being scraped by another job: they are
+        marked SKIPPED with a pointer to that job instead of being enqueued again.
+        """
+        # imported here: app.workers imports the task modules, which import this service
+        from app.workers.queue import queue_for_job
+
+        coalesce_keys = coalesce_keys or {}
+        coalesced_with = coalesced_with or {}
+        priority = (config or {}).get("priority")
+        # scheduled refreshes spread their start over a window instead of all running at once
+        defer_by = (config or {}).get("defer_seconds")
+        queue_name = queue_for_job(job_type, JobPriority(priority) if priority else None)
         
-        if job_type == JobType.REVIEW_SCRAPING:
-            # Enqueue scraping tasks
+        if job_type in (JobType.REVIEW_SCRAPING, JobType.REVIEW_REPARSE):
+            # Enqueue scraping tasks; a reparse runs the same tasks over cached pages only
             if not sources_data:
                 logger.warning(f"No sources data provided for scraping job {job_id}")
                 return
@@ -77,15 +155,50 @@ class JobService:
             
             for source_config in sources_data:
                 source_type = SourceType(source_config["source_type"])
+                if job_type == JobType.REVIEW_REPARSE:
+                    source_config = {**source_config, "mode": "reparse"}
                 task_name = f"scrape_{source_type.value.lower()}_reviews_task"
+
+                if source_type in coalesced_with:
+                    logger.info(f"[{job_id}] {source_type.value} is already scraped by job {coalesced_with[source_type]}")
+                    await self.job_repo.update_job_source_status(
+                        job_id=job_id,
+                        source=source_type,
+                        status=JobSourceStatus.SKIPPED,
+                        result={"coalesced_with": coalesced_with[source_type]},
+                    )
+                    continue
                 
-                logger.info(f"Enqueuing {task_name} for {job_type.value} job")
-                await self.arq_pool.enqueue_job(
-                    task_name,
-                    job_id=job_id,
-                    organization_id=organization_id,
-                    source_config=source_config
-                )
+                logger.info(f"Enqueuing {task_name} for {job_type.value} job on {queue_name}")
+                if source_type in coalesce_keys:
+                    enqueued = await job_coalescer.enqueue(
+                        self.arq_pool,
+                        task_name,
+                        coalesce_keys[source_type],
+                        _queue_name=queue_name,
+                        _defer_by=defer_by,
+                        job_id=job_id,
+                        organization_id=organization_id,
+                        source_config=source_config,
+                    )
+                    if enqueued is None:
+                        # an older copy is still queued under the same key although its claim expired
+                        await self.job_repo.update_job_source_status(
+                            job_id=job_id,
+                            source=source_type,
+                            status=JobSourceStatus.FAILED,
+                            error="An identical scrape is already queued",
+                        )
+                else:
+                    enqueued = await self.arq_pool.enqueue_job(
+                        task_name,
+                        _queue_name=queue_name,
+                        _defer_by=defer_by,
+                        job_id=job_id,
+                        organization_id=organization_id,
+                        source_config=source_config
+                    )
+                await self._record_enqueued(job_id, enqueued, queue_name)
         
         elif job_type == JobType.ARCHETYPE_GENERATION:
             # Enqueue archetype generation task
@@ -96,13 +209,26 @@ class JobService:
                 "job_type": job_type.value
             })
             
-            logger.info(f"Enqueuing archetype generation task for job {job_id}")
-            await self.arq_pool.enqueue_job(
+            logger.info(f"Enqueuing archetype generation task for job {job_id} on {queue_name}")
+            enqueued = await self.arq_pool.enqueue_job(
                 "generate_customer_archetypes_task",
+                _queue_name=queue_name,
                 job_id=job_id,
                 organization_id=organization_id,
                 config=task_config
             )
+            await self._record_enqueued(job_id, enqueued, queue_name)
+        
+        elif job_type == JobType.EMBEDDING_GENERATION:
+            logger.info(f"Enqueuing review embedding task for job {job_id} on {queue_name}")
+            enqueued = await self.arq_pool.enqueue_job(
+                "generate_review_embeddings_task",
+                _queue_name=queue_name,
+                job_id=job_id,
+                organization_id=organization_id,
+                config=config or {}
+            )
+            await self._record_enqueued(job_id, enqueued, queue_name)
         
         elif job_type == JobType.SENTIMENT_ANALYSIS:
             # Future: enqueue sentiment analysis tasks
@@ -111,6 +237,48 @@ class JobService:
         else:
             logger.warning(f"Unknown job type: {job_type}")
 
+    async def _record_enqueued(self, job_id: str, arq_job, queue_name: str) -> None:
+        """Remembers an enqueued ARQ job so cancel_job can abort it while it is still queued."""
+        try:
+            await job_cancellation.record_enqueued(job_id, arq_job, queue_name)
+        except Exception as e:
+            # the task still notices a cancellation when it starts; only the early abort is lost
+            logger.warning(f"[{job_id}] Could not record ARQ job for cancellation: {e}")
+
+    async def cancel_job(self, job_id: str) -> Dict[str, Any]:
+        """
+        Cancels a pending or running job. Its tasks still waiting in ARQ are aborted and their sources
+        marked SKIPPED; running tasks notice the cancellation flag within JOB_CANCEL_POLL_SECONDS,
+        keep what they have already stored and mark their source CANCELLED.
+        """
+        job = await self.job_repo.get_job_by_id(job_id=job_id)
+        if not job:
+            raise NotFoundError(f"Job with ID {job_id} not found")
+        if job.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED]:
+            raise ConflictError(f"Job {job_id} is already {job.status.value}")
+
+        has_sources = bool(job.sources)
+        pending_sources = [s.source for s in job.sources if s.status == JobSourceStatus.PENDING]
+
+        logger.info(f"[{job_id}] Cancelling job")
+        await job_cancellation.request(job_id)
+        await self.job_repo.update_job_status(job_id=job_id, status=JobStatus.CANCELLED)
+        aborted = await job_cancellation.abort_queued(self.arq_pool, job_id) if self.arq_pool else 0
+
+        for source in pending_sources:
+            await self.job_repo.update_job_source_status(
+                job_id=job_id, source=source, status=JobSourceStatus.SKIPPED, result={"cancelled": True}
+            )
+        if not has_sources or await self.job_repo.are_all_sources_finished(job_id=job_id):
+            await self.finalize_job(job_id=job_id)
+
+        return {
+            "job_id": job_id,
+            "status": JobStatus.CANCELLED.value,
+            "aborted_tasks": aborted,
+            "skipped_sources": [source.value for source in pending_sources],
+        }
+
     async def update_source_progress(
         self,
         job_id: str,
@@ -141,14 +309,17 @@ class JobService:
             await self.finalize_job(job_id=job_id)
     
     async def finalize_job(self, job_id: str) -> None:
-        """Finalizes a job by setting its status to COMPLETED or FAILED."""
+        """Finalizes a job by setting its status to COMPLETED, FAILED or, once cancelled, CANCELLED."""
         job = await self.job_repo.get_job_by_id(job_id=job_id)
         if not job:
             logger.error(f"[{job_id}] Cannot finalize job, ID not found")
             return
         
+        if job.status == JobStatus.CANCELLED:
+            # sources stopped by a cancellation end as SKIPPED/CANCELLED, never turning the job into FAILED
+            final_status = JobStatus.CANCELLED
         # For jobs with sources, check source status
-        if job.sources:
+        elif job.sources:
             has_failures = any(s.status == JobSourceStatus.FAILED for s in job.sources)
             final_status = JobStatus.FAILED if has_failures else JobStatus.COMPLETED
         else:
@@ -156,4 +327,11 @@ class JobService:
             final_status = job.status
 
         logger.info(f"[{job_id}] Finalizing job with status '{final_status.value}'")
-        await self.job_repo.update_job_status(job_id=job_id, status=final_status) 
\ No newline at end of file
+        await self.job_repo.update_job_status(job_id=job_id, status=final_status)
+        # fold the job's event log into a summary once its remaining events are written
+        job_event_log.request_compaction(job_id)
+        if job.job_type == JobType.REVIEW_SCRAPING and settings.JOB_COALESCING_ENABLED:
+            try:
+                await job_coalescer.release_job(job_id, succeeded=final_status == JobStatus.COMPLETED)
+            except Exception as e:
+                logger.warning(f"[{job_id}] Could not release coalescing keys: {e}") 
\ No newline at end of file
@@ -40,23 +40,26 @@ class ProductDiscoveryService:
             ),
         ]
     
-    async def process_discovery_results(self, organization_id: int, results: List[Dict[str, Any]]):
+    async def process_discovery_results(self, organization_id: int, results: List[Dict[str, Any]]) -> Dict[str, int]:
         """
         Processes the results from a discovery job (e.g., from a webhook)
-        and saves the products to the database.
+        and saves the products to the database in one batched upsert.
+        Invalid products are skipped rather than failing the batch.
+        Returns the received/inserted/updated/skipped counts.
         """
         logger.info(f"Processing {len(results)} discovered products for organization {organization_id}.")
-        
-        for product_data in results:
-            try:
-                # The repository handles the create-or-update (upsert) logic
-                await self.product_repo.upsert_product(organization_id, product_data)
-            except Exception as e:
-                logger.error(
-                    f"Failed to save discovered product with ASIN {product_data.get('asin')}: {e}",
-                    exc_info=True
-                )
-        logger.info("Finished processing discovery results.")
+
+        try:
+            counts = await self.product_repo.bulk_upsert_products(organization_id, results)
+        except Exception as e:
+            logger.error(f"Failed to save {len(results)} discovered products: {e}", exc_info=True)
+            raise AppError("Failed to save discovered products") from e
+
+        logger.info(
+            f"Finished processing discovery results: {counts['inserted']} inserted, {counts['updated']} updated, "
+            f"{counts['skipped']} skipped."
+        )
+        return counts
 
     async def get_discovered_products(self, organization_id: int) -> List[Dict[str, Any]]:
         """
@@ -1,7 +1,12 @@
+import asyncio
 import logging 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Awaitable, Callable, Optional
 from datetime import datetime, timezone
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.core.config import settings
+from app.core.simhash import simhash64, simhash_bands, hamming_distance
 from app.repositories.review_repo import ReviewRepository
+from app.models.review import UNDATED_REVIEW_DATE
 from app.domain.types import SourceType, JobSourceStatus
 from app.models import DiscoveredProduct
 
@@ -13,15 +18,18 @@ from app.models import DiscoveredProduct
 logger = logging.getLogger(__name__)
 
 class ReviewIngestService:
-    def __init__(self, review_repo: ReviewRepository):
+    def __init__(self, review_repo: ReviewRepository, session_factory: Optional[async_sessionmaker[AsyncSession]] = None):
         self.review_repo = review_repo
+        # When provided, each stream writer persists chunks on its own session so writers can run concurrently
+        self.session_factory = session_factory
     
     def _clean_and_transform(
         self, 
         raw_reviews: List[Dict[str, Any]],
         organization_id: int,
         source: SourceType,
-        brand_name: str 
+        brand_name: str,
+        job_id: Optional[str] = None,
     ) -> List[Dict[str, any]]:
         """
         Private helper to standardize review data from different scrapers
@@ -31,25 +39,35 @@ class ReviewIngestService:
         for raw_review in raw_reviews:
             # Example transformation (adapt for each source) TODO
             # You would have more complex logic here based on scraper output
-            review_date = raw_review.get("date")
+            review_date = raw_review.get("date") or raw_review.get("review_date")
             if isinstance(review_date, str):
                 try:
                     # Handle different date formats from scrapers
                     review_date = datetime.fromisoformat(review_date.replace('Z', '+00:00'))
                 except ValueError:
                     review_date = None
+            if review_date is None and settings.REVIEWS_MONTHLY_PARTITIONS:
+                # review_date is a partition key (NOT NULL) and part of the conflict key in this layout;
+                # a fixed value keeps re-scrapes of the review idempotent
+                review_date = UNDATED_REVIEW_DATE
             
+            review_text = raw_review.get("review") or raw_review.get("text") or raw_review.get("review_text")
+
             # This dictionary must match the columns of the `Review` model
             transformed = {
                 "organization_id": organization_id,
+                "job_id": job_id,
                 "source": source,
-                "external_id": raw_review.get("review_id") or raw_review.get("id"),
+                "external_id": raw_review.get("review_id") or raw_review.get("id") or raw_review.get("external_id"),
                 "brand_name": brand_name,
                 "country": raw_review.get("country"),
                 "rating": raw_review.get("rating"),
-                "review_text": raw_review.get("review") or raw_review.get("text"),
+                "review_text": review_text,
                 "review_date": review_date,
                 "raw": raw_review, # Store the original scraped data
+                # Fingerprint for near-duplicate detection (reposts under a different external_id)
+                "simhash": simhash64(review_text, min_tokens=settings.NEAR_DUPLICATE_MIN_TOKENS),
+                "is_near_duplicate": False,
                 "created_at": datetime.now(timezone.utc)
             }
             cleaned_data.append(transformed)
@@ -60,7 +78,8 @@ class ReviewIngestService:
         organization_id: int,
         source: SourceType,
         brand_name: str,
-        raw_data: List[Dict[str, Any]]
+        raw_data: List[Dict[str, Any]],
+        job_id: Optional[str] = None,
     ) -> int:
         """
         Processes and ingests a batch of scraped reviews.
@@ -72,10 +91,160 @@ class ReviewIngestService:
         logger.info(f"Ingesting {len(raw_data)} reviews from {source.value} for brand {brand_name}")
 
         # 1.- Clean and transform the data to matcch our DB schema 
-        reviews_to_insert = self._clean_and_transform(raw_reviews=raw_data, organization_id=organization_id, source=source, brand_name=brand_name)
+        reviews_to_insert = self._clean_and_transform(
+            raw_reviews=raw_data, organization_id=organization_id, source=source, brand_name=brand_name, job_id=job_id
+        )
+
+        # 2.- Drop or flag reposts of reviews we already have
+        await self.review_repo.ensure_partitions(reviews_to_insert)
+        reviews_to_insert = await self._apply_near_duplicates(self.review_repo, reviews_to_insert)
 
-        # 2.- Bulk insert into the databse
+        # 3.- Bulk insert into the databse
         inserted_count = await self.review_repo.bulk_insert_reviews(reviews_data=reviews_to_insert)
 
         logger.info(f"Successfully ingested {inserted_count} reviews from {source.value} for brand {brand_name}")
-        return inserted_count
\ No newline at end of file
+        return inserted_count
+
+    async def ingest_review_stream(
+        self,
+        organization_id: int,
+        source: SourceType,
+        brand_name: str,
+        batches: AsyncIterator[List[Dict[str, Any]]],
+        job_id: Optional[str] = None,
+        on_persisted: Optional[Callable[[int], Awaitable[None]]] = None,
+        on_batch_committed: Optional[Callable[[int, Dict[str, int]], Awaitable[None]]] = None,
+        update_existing: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Ingests reviews as they are scraped. Batches flow through a bounded queue into one or more
+        DB writers that commit each chunk as it arrives, so memory stays flat regardless of scrape size.
+        `on_persisted` is awaited after every committed chunk with the running number of persisted rows.
+        `on_batch_committed` is awaited with the position of the committed batch among the non-empty
+        batches of the stream and its counts; with several writers, commits may arrive out of order.
+        With `update_existing` (reparse jobs) stored reviews are updated with the parsed values, and
+        counted as `updated` rather than duplicates when anything changed.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.INGEST_QUEUE_SIZE)
+        writers = max(1, settings.INGEST_WRITERS) if self.session_factory else 1
+        totals = {"received": 0, "inserted": 0, "updated": 0, "duplicates": 0, "near_duplicates": 0}
+
+        async def produce() -> None:
+            index = 0
+            async for batch in batches:
+                if not batch:
+                    continue
+                totals["received"] += len(batch)
+                # put() blocks while the queue is full, applying backpressure to the scraper
+                await queue.put((index, self._clean_and_transform(
+                    raw_reviews=batch, organization_id=organization_id, source=source, brand_name=brand_name, job_id=job_id
+                )))
+                index += 1
+            for _ in range(writers):
+                await queue.put(None)
+
+        async def write() -> None:
+            while (item := await queue.get()) is not None:
+                index, rows = item
+                result = await self._persist_chunk(rows, update_existing)
+                totals["inserted"] += result["inserted"]
+                totals["updated"] += result.get("updated", 0)
+                totals["duplicates"] += result["duplicates"]
+                totals["near_duplicates"] += result.get("near_duplicates", 0)
+                if on_persisted:
+                    await on_persisted(totals["inserted"] + totals["updated"] + totals["duplicates"])
+                if on_batch_committed:
+                    await on_batch_committed(index, result)
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(produce())
+                for _ in range(writers):
+                    tg.create_task(write())
+        except ExceptionGroup as eg:
+            # Surface the original failure (scraper or writer) rather than the group wrapper
+            raise eg.exceptions[0]
+
+        logger.info(
+            f"Streamed {totals['received']} reviews from {source.value} for brand {brand_name}: "
+            f"{totals['inserted']} inserted, {totals['updated']} updated, {totals['duplicates']} duplicates "
+            f"({totals['near_duplicates']} near-duplicates)"
+        )
+        return totals
+
+    async def _persist_chunk(self, rows: List[Dict[str, Any]], update_existing: bool = False) -> Dict[str, int]:
+        """
+        Persist one transformed chunk through the COPY ingest path.
+        Near-duplicates dropped before the insert are reported both as duplicates and near_duplicates;
+        re-scrapes of stored reviews only as duplicates (or as updated, with `update_existing`).
+        """
+        if self.session_factory is None:
+            return await self._persist_with(self.review_repo, rows, update_existing)
+        async with self.session_factory() as session:
+            return await self._persist_with(ReviewRepository(session), rows, update_existing)
+
+    async def _persist_with(
+        self, review_repo: ReviewRepository, rows: List[Dict[str, Any]], update_existing: bool = False
+    ) -> Dict[str, int]:
+        received = len(rows)
+        # partition DDL first: it cannot run once the near-duplicate lookup holds locks on reviews
+        await review_repo.ensure_partitions(rows)
+        rows = await self._apply_near_duplicates(review_repo, rows)
+        near_duplicates = sum(1 for row in rows if row.get("is_near_duplicate")) + received - len(rows)
+
+        if rows:
+            result = await review_repo.copy_insert_reviews(rows, update_existing=update_existing)
+        else:
+            # every row was a near-duplicate: nothing to insert, but the lookup's fingerprint lock is held
+            # until the transaction ends
+            await review_repo.session.commit()
+            result = {"inserted": 0, "updated": 0, "duplicates": 0}
+        return {
+            "inserted": result["inserted"],
+            "updated": result["updated"],
+            "duplicates": received - result["inserted"] - result["updated"],
+            "near_duplicates": near_duplicates,
+        }
+
+    async def _apply_near_duplicates(self, review_repo: ReviewRepository, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Compares each row's SimHash with the organization's banded LSH index and with the rows
+        before it in the same chunk. Rows within NEAR_DUPLICATE_MAX_DISTANCE bits of a known review
+        are dropped (NEAR_DUPLICATE_MODE=drop) or kept with is_near_duplicate=True (mode=mark).
+        Re-scrapes of reviews already stored would match their own fingerprint; they are left to the
+        insert, which skips them as plain duplicates.
+
+        Writers of the same organization take turns from this lookup to their commit (see
+        ReviewRepository.lock_fingerprint_index), so a repost pair split across them is still caught.
+        """
+        mode = settings.NEAR_DUPLICATE_MODE
+        fingerprinted = [row for row in rows if row.get("simhash") is not None]
+        if mode == "off" or not fingerprinted:
+            return rows
+
+        organization_id = fingerprinted[0]["organization_id"]
+        await review_repo.lock_fingerprint_index(organization_id)
+        stored = await review_repo.find_existing_external_ids(
+            organization_id, {(row["source"], row["external_id"]) for row in fingerprinted}
+        )
+        band_keys = {
+            (band, value) for row in fingerprinted for band, value in enumerate(simhash_bands(row["simhash"]))
+        }
+        known = await review_repo.find_fingerprint_matches(organization_id, band_keys)
+
+        kept = []
+        for row in rows:
+            fingerprint = row.get("simhash")
+            if fingerprint is not None and (row["source"], row["external_id"]) not in stored:
+                keys = list(enumerate(simhash_bands(fingerprint)))
+                candidates = {candidate for key in keys for candidate in known.get(key, ())}
+                if any(hamming_distance(fingerprint, c) <= settings.NEAR_DUPLICATE_MAX_DISTANCE for c in candidates):
+                    if mode == "drop":
+                        continue
+                    row["is_near_duplicate"] = True
+                else:
+                    # canonical: later rows in this chunk are compared against it too
+                    for key in keys:
+                        known.setdefault(key, []).append(fingerprint)
+            kept.append(row)
+        return kept
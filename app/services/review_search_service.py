@@ -0,0 +1,43 @@
+import logging
+from typing import List
+
+from app.core.config import settings
+from app.repositories.review_repo import ReviewRepository
+from app.schemas.reviews import ReviewSearchRequest, ReviewSearchHit, ReviewSearchResponse
+from app.services.embedding_service import EmbeddingProvider
+
+logger = logging.getLogger(__name__)
+
+class ReviewSearchService:
+    def __init__(self, review_repo: ReviewRepository, provider: EmbeddingProvider):
+        self.review_repo = review_repo
+        self.provider = provider
+
+    async def search(self, organization_id: int, request: ReviewSearchRequest) -> ReviewSearchResponse:
+        """
+        Embeds the query with the same provider used for reviews and returns the k most similar
+        reviews of the organization. ef_search is never set below k, otherwise HNSW cannot
+        return k candidates.
+        """
+        (query_embedding,) = await self.provider.embed([request.query])
+        ef_search = max(request.ef_search or settings.VECTOR_SEARCH_EF_SEARCH, request.k)
+
+        rows = await self.review_repo.search_similar_reviews(
+            organization_id=organization_id,
+            embedding=query_embedding,
+            k=request.k,
+            sources=request.sources,
+            brand_name=request.brand_name,
+            country=request.country,
+            min_rating=request.min_rating,
+            max_rating=request.max_rating,
+            date_from=request.date_from,
+            date_to=request.date_to,
+            ef_search=ef_search,
+            iterative_scan=settings.VECTOR_SEARCH_ITERATIVE_SCAN,
+        )
+        hits: List[ReviewSearchHit] = [
+            ReviewSearchHit(**{key: value for key, value in row.items() if key != "distance"}, similarity=1 - row["distance"])
+            for row in rows
+        ]
+        return ReviewSearchResponse(items=hits, ef_search=ef_search)
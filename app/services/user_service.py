@@ -1,5 +1,5 @@
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from fastapi import BackgroundTasks
 from app.repositories.user_repo import UserRepository
 from app.core.security import hash_password, password_meets_policy
@@ -198,4 +198,23 @@ class UserService:
             is_active=is_active,
             skip=skip,
             limit=limit
-        )
\ No newline at end of file
+        )
+
+    async def search_users_ranked(
+        self,
+        query: str,
+        organization_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[User], Optional[str]]:
+        """
+        Searches users by relevance to `query`, one keyset page at a time.
+        """
+        return await self.user_repo.search_users_ranked(
+            query=query,
+            organization_id=organization_id,
+            is_active=is_active,
+            limit=limit,
+            cursor=cursor
+        )
@@ -0,0 +1,151 @@
+import json
+import logging
+from dataclasses import asdict, dataclass, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.db.redis import get_redis_client
+from app.domain.types import SourceType
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_KEY_PREFIX = "checkpoint"
+
+# (country, external_id, ISO review_date) of a committed review, to be added to its watermark
+SeenReview = Tuple[Optional[str], str, Optional[str]]
+
+
+@dataclass
+class ScrapeCheckpoint:
+    """
+    How far one (job, source) scrape got: the number of pages whose reviews are all committed,
+    the scraper's cursor to the page after them, and the ingest counts so far.
+    """
+    pages: int = 0
+    cursor: Optional[str] = None
+    received: int = 0
+    inserted: int = 0
+    updated: int = 0
+    duplicates: int = 0
+    near_duplicates: int = 0
+    last_external_id: Optional[str] = None
+
+
+class CheckpointTracker:
+    """
+    Advances a checkpoint over the longest run of pages whose batches are all committed. Concurrent
+    ingest writers may commit batch 3 before batch 2; the checkpoint only moves once 2 is in too.
+    The reviews of the pages it moves over are collected for take_seen().
+    """
+
+    def __init__(self, start: Optional[ScrapeCheckpoint] = None):
+        self.checkpoint = replace(start) if start else ScrapeCheckpoint()
+        self._pages: List[Tuple[Optional[str], Optional[str], int, List[SeenReview]]] = []
+        self._committed: Dict[int, Dict[str, int]] = {}
+        self._seen: List[SeenReview] = []
+        self._next = 0
+
+    def page_yielded(
+        self, cursor: Optional[str], last_external_id: Optional[str], size: int, seen: Optional[List[SeenReview]] = None
+    ) -> None:
+        """Called for every non-empty page handed to the ingest, in order."""
+        self._pages.append((cursor, last_external_id, size, seen or []))
+
+    def batch_committed(self, index: int, counts: Dict[str, int]) -> bool:
+        """Records the commit of the index-th batch; returns True when the checkpoint moved forward."""
+        self._committed[index] = counts
+        advanced = False
+        while self._next in self._committed:
+            counts = self._committed.pop(self._next)
+            cursor, last_external_id, size, seen = self._pages[self._next]
+            self._pages[self._next] = (cursor, last_external_id, size, [])
+            self._seen.extend(seen)
+            checkpoint = self.checkpoint
+            checkpoint.pages += 1
+            checkpoint.cursor = cursor
+            checkpoint.last_external_id = last_external_id
+            checkpoint.received += size
+            checkpoint.inserted += counts.get("inserted", 0)
+            checkpoint.updated += counts.get("updated", 0)
+            checkpoint.duplicates += counts.get("duplicates", 0)
+            checkpoint.near_duplicates += counts.get("near_duplicates", 0)
+            self._next += 1
+            advanced = True
+        return advanced
+
+    def take_seen(self) -> List[SeenReview]:
+        """The reviews of the pages the checkpoint moved over since the last call."""
+        seen, self._seen = self._seen, []
+        return seen
+
+
+class CheckpointStore:
+    """
+    Keeps the checkpoint of each running (job, source) scrape in Redis, so a retried task resumes
+    after the last committed page instead of starting over. Alongside it, a list of the reviews of
+    those pages, which the retry adds to the watermarks it saves. Errors are logged and degrade to a
+    scrape from the first page.
+    """
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        self._redis = redis_client
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = get_redis_client()
+        return self._redis
+
+    @staticmethod
+    def key(job_id: str, source: SourceType | str) -> str:
+        return f"{CHECKPOINT_KEY_PREFIX}:{job_id}:{getattr(source, 'value', source)}"
+
+    @classmethod
+    def seen_key(cls, job_id: str, source: SourceType | str) -> str:
+        return f"{cls.key(job_id, source)}:seen"
+
+    async def load(self, job_id: str, source: SourceType | str) -> Optional[ScrapeCheckpoint]:
+        key = self.key(job_id, source)
+        try:
+            raw = await self.redis.get(key)
+            return ScrapeCheckpoint(**json.loads(raw)) if raw else None
+        except Exception as e:
+            logger.warning(f"Could not load scrape checkpoint '{key}', scraping from the first page: {e}")
+            return None
+
+    async def load_seen(self, job_id: str, source: SourceType | str) -> List[SeenReview]:
+        key = self.seen_key(job_id, source)
+        try:
+            return [tuple(json.loads(entry)) for entry in await self.redis.lrange(key, 0, -1)]
+        except Exception as e:
+            logger.warning(f"Could not load the reviews of scrape checkpoint '{key}': {e}")
+            return []
+
+    async def save(
+        self, job_id: str, source: SourceType | str, checkpoint: ScrapeCheckpoint, seen: Sequence[SeenReview] = ()
+    ) -> None:
+        """Saves the checkpoint and appends the reviews of the pages it moved over, atomically."""
+        key, seen_key = self.key(job_id, source), self.seen_key(job_id, source)
+        ttl = settings.SCRAPE_CHECKPOINT_TTL_SECONDS
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.set(key, json.dumps(asdict(checkpoint)), ex=ttl)
+                if seen:
+                    pipe.rpush(seen_key, *(json.dumps(entry) for entry in seen))
+                    pipe.expire(seen_key, ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not save scrape checkpoint '{key}': {e}")
+
+    async def clear(self, job_id: str, source: SourceType | str) -> None:
+        key = self.key(job_id, source)
+        try:
+            await self.redis.delete(key, self.seen_key(job_id, source))
+        except Exception as e:
+            logger.warning(f"Could not clear scrape checkpoint '{key}': {e}")
+
+
+# Global instance
+checkpoint_store = CheckpointStore()
@@ -116,6 +116,18 @@ class ProgressNotifier:
             data={"task_name": task_name, "result": result},
         )
     
+    @staticmethod
+    async def notify_task_cancelled(job_id: str, task_name: str, result: Dict[str, Any]) -> None:
+        """
+        Send notification when a task stops because its job was cancelled.
+        """
+        await ProgressNotifier.notify_job_progress(
+            job_id=job_id,
+            event_type=WebSocketEventType.TASK_CANCELLED,
+            message=f"Cancelled {task_name} task",
+            data={"task_name": task_name, "result": result},
+        )
+
     @staticmethod
     async def notify_task_error(job_id: str, task_name: str, error: str) -> None:
         """
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.db.redis import get_redis_client
+from app.domain.types import SourceType
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY_PREFIX = "ratelimit"
+
+# Reserves one token and returns how long the caller must wait before using it (ms).
+# Tokens may go negative: each caller reserves its own slot in the queue, so concurrent
+# workers are spaced out by 1/rate instead of all retrying at once. Time comes from the
+# Redis server so that clock skew between workers does not matter.
+#   KEYS[1]  bucket hash (tokens, ts)      KEYS[2]  metrics hash
+#   ARGV[1]  tokens per second             ARGV[2]  burst (bucket capacity)
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = burst
+    ts = now
+end
+
+tokens = math.min(burst, tokens + (now - ts) * rate / 1000) - 1
+local wait_ms = 0
+if tokens < 0 then
+    wait_ms = math.ceil(-tokens * 1000 / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) * 1000 / rate) + 1000)
+
+redis.call('HINCRBY', KEYS[2], 'acquired', 1)
+if wait_ms > 0 then
+    redis.call('HINCRBY', KEYS[2], 'waited', 1)
+    redis.call('HINCRBY', KEYS[2], 'wait_ms_total', wait_ms)
+end
+return wait_ms
+"""
+
+
+@dataclass
+class RateLimitStats:
+    """Wait-time counters, either for this process or (from Redis) for every worker."""
+    acquired: int = 0
+    waited: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+    def record(self, wait_seconds: float) -> None:
+        self.acquired += 1
+        if wait_seconds > 0:
+            self.waited += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    @property
+    def wait_seconds_avg(self) -> float:
+        return self.wait_seconds_total / self.acquired if self.acquired else 0.0
+
+
+class RateLimiter:
+    """
+    Distributed token-bucket limiter, one bucket per source (or per source and upstream host).
+
+    Every worker process talks to the same Redis keys, so the budget in RATE_LIMIT_PER_SECOND is
+    shared by all jobs scraping a source, however many run concurrently. The bucket update is a
+    single Lua script, which makes each acquisition one atomic round trip. If Redis is unavailable
+    the limiter fails open: scraping continues unthrottled rather than failing the job.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        per_second: Optional[Dict[str, float]] = None,
+        burst: Optional[Dict[str, int]] = None,
+        per_host: Optional[bool] = None,
+    ):
+        self._redis = redis_client
+        self.per_second = settings.RATE_LIMIT_PER_SECOND if per_second is None else per_second
+        self.burst = settings.RATE_LIMIT_BURST if burst is None else burst
+        self.per_host = settings.RATE_LIMIT_PER_HOST if per_host is None else per_host
+        self.stats: Dict[str, RateLimitStats] = {}
+        self._script = None
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = get_redis_client()
+        return self._redis
+
+    def budget(self, source: SourceType | str) -> Tuple[float, int]:
+        """(tokens per second, burst) for a source."""
+        name = getattr(source, "value", source)
+        return (
+            self.per_second.get(name, settings.RATE_LIMIT_DEFAULT_PER_SECOND),
+            self.burst.get(name, settings.RATE_LIMIT_DEFAULT_BURST),
+        )
+
+    def bucket_name(self, source: SourceType | str, url: Optional[str] = None) -> str:
+        name = getattr(source, "value", source)
+        host = urlsplit(url).hostname if url and self.per_host else None
+        return f"{name}:{host}" if host else name
+
+    async def acquire(self, source: SourceType | str, url: Optional[str] = None) -> float:
+        """
+        Takes one token for `source`, sleeping until it is available. Returns the seconds waited.
+        """
+        if not settings.RATE_LIMIT_ENABLED:
+            return 0.0
+
+        bucket = self.bucket_name(source, url)
+        rate, burst = self.budget(source)
+        try:
+            if self._script is None:
+                self._script = self.redis.register_script(TOKEN_BUCKET_LUA)
+            wait_ms = await self._script(
+                keys=[f"{RATE_LIMIT_KEY_PREFIX}:bucket:{bucket}", f"{RATE_LIMIT_KEY_PREFIX}:metrics:{bucket}"],
+                args=[rate, burst],
+            )
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable for '{bucket}', continuing unthrottled: {e}")
+            return 0.0
+
+        wait_seconds = int(wait_ms) / 1000
+        if wait_seconds > 0:
+            logger.debug(f"Rate limited on '{bucket}', waiting {wait_seconds:.3f}s")
+            await asyncio.sleep(wait_seconds)
+        self.stats.setdefault(bucket, RateLimitStats()).record(wait_seconds)
+        return wait_seconds
+
+    @asynccontextmanager
+    async def limit(self, source: SourceType | str, url: Optional[str] = None) -> AsyncIterator[float]:
+        """
+        Wraps one upstream request:
+
+            async with rate_limiter.limit(SourceType.TRUSTPILOT, url) as waited:
+                response = await client.get(url)
+        """
+        yield await self.acquire(source, url)
+
+    async def get_shared_stats(self, source: SourceType | str, url: Optional[str] = None) -> RateLimitStats:
+        """
+        Wait-time counters for a bucket aggregated over every worker, as kept in Redis.
+        """
+        raw = await self.redis.hgetall(f"{RATE_LIMIT_KEY_PREFIX}:metrics:{self.bucket_name(source, url)}")
+        return RateLimitStats(
+            acquired=int(raw.get("acquired", 0)),
+            waited=int(raw.get("waited", 0)),
+            wait_seconds_total=int(raw.get("wait_ms_total", 0)) / 1000,
+        )
+
+
+# Global instance
+rate_limiter = RateLimiter()
@@ -0,0 +1,129 @@
+import base64
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional
+
+import redis.asyncio as redis
+
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+from app.db.redis import get_redis_client
+from app.domain.types import SourceType
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_KEY_PREFIX = "watermark"
+
+
+def _new_bloom() -> BloomFilter:
+    return BloomFilter(settings.WATERMARK_BLOOM_CAPACITY, settings.WATERMARK_BLOOM_ERROR_RATE)
+
+
+def _as_aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class Watermark:
+    """
+    What a previous scrape of one (organization, source, brand, country) already stored:
+    the newest review_date seen and a Bloom filter of every external_id ingested.
+    """
+    newest_review_date: Optional[datetime] = None
+    known_ids: BloomFilter = field(default_factory=_new_bloom)
+
+    def is_known(self, external_id: str, review_date: Optional[datetime] = None) -> bool:
+        # anything newer than the high-water mark is new, whatever the filter says (no false positives there)
+        if review_date and self.newest_review_date and _as_aware(review_date) > self.newest_review_date:
+            return False
+        return external_id in self.known_ids
+
+    def add(self, external_id: str, review_date: Optional[datetime] = None) -> None:
+        self.known_ids.add(external_id)
+        if review_date:
+            review_date = _as_aware(review_date)
+            if self.newest_review_date is None or review_date > self.newest_review_date:
+                self.newest_review_date = review_date
+
+
+class WatermarkStore:
+    """
+    Loads and saves scrape watermarks in Redis, one hash per (organization, source, brand, country).
+    Errors are logged and degrade to an empty watermark, i.e. a full scrape.
+    """
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        self._redis = redis_client
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = get_redis_client()
+        return self._redis
+
+    @staticmethod
+    def key(organization_id: int, source: SourceType | str, brand_name: str, country: str) -> str:
+        source = getattr(source, "value", source)
+        return f"{WATERMARK_KEY_PREFIX}:{organization_id}:{source}:{brand_name.strip().lower()}:{(country or '').upper()}"
+
+    async def load(self, organization_id: int, source: SourceType | str, brand_name: str, country: str) -> Watermark:
+        key = self.key(organization_id, source, brand_name, country)
+        try:
+            raw = await self.redis.hgetall(key)
+            if not raw:
+                return Watermark()
+            known_ids = BloomFilter.from_bytes(
+                base64.b64decode(raw["bloom"]),
+                capacity=int(raw["capacity"]),
+                error_rate=float(raw["error_rate"]),
+                bits=int(raw["bits"]),
+                hashes=int(raw["hashes"]),
+                count=int(raw.get("count", 0)),
+            )
+        except Exception as e:
+            logger.warning(f"Could not load scrape watermark '{key}', scraping without it: {e}")
+            return Watermark()
+
+        if known_ids.saturated:
+            # past its capacity the filter's false-positive rate climbs; start over with a full scrape
+            logger.info(f"Scrape watermark '{key}' is saturated ({known_ids.count} ids), resetting it")
+            return Watermark()
+
+        newest = raw.get("newest_review_date")
+        return Watermark(newest_review_date=datetime.fromisoformat(newest) if newest else None, known_ids=known_ids)
+
+    async def save(self, organization_id: int, source: SourceType | str, brand_name: str, country: str, watermark: Watermark) -> None:
+        key = self.key(organization_id, source, brand_name, country)
+        known_ids = watermark.known_ids
+        try:
+            # merge with whatever a concurrent scrape of the same brand saved meanwhile
+            current = await self.load(organization_id, source, brand_name, country)
+            if (current.known_ids.size, current.known_ids.hashes) == (known_ids.size, known_ids.hashes) and current.known_ids.count:
+                known_ids.union(current.known_ids)
+            newest = max(filter(None, [watermark.newest_review_date, current.newest_review_date]), default=None)
+
+            mapping: Dict[str, str] = {
+                "bloom": base64.b64encode(known_ids.to_bytes()).decode("ascii"),
+                "capacity": str(known_ids.capacity),
+                "error_rate": str(known_ids.error_rate),
+                "bits": str(known_ids.size),
+                "hashes": str(known_ids.hashes),
+                "count": str(known_ids.count),
+                "newest_review_date": newest.isoformat() if newest else "",
+            }
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, timedelta(days=settings.WATERMARK_TTL_DAYS))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not save scrape watermark '{key}': {e}")
+
+    async def reset(self, organization_id: int, source: SourceType | str, brand_name: str, countries: Iterable[str]) -> None:
+        keys = [self.key(organization_id, source, brand_name, country) for country in countries]
+        if keys:
+            await self.redis.delete(*keys)
+
+
+# Global instance
+watermark_store = WatermarkStore()
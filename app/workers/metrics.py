@@ -0,0 +1,198 @@
+import asyncio
+import functools
+import logging
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.workers.queue import DEFAULT_QUEUE
+
+logger = logging.getLogger(__name__)
+
+QUEUE_WAIT_KEY_PREFIX = "arq:metrics:queue_wait:"
+# one hash for every counter, field "{queue}|{task}|{counter}": read back with a single HGETALL
+TASK_COUNTERS_KEY = "arq:metrics:task_counters"
+TASK_RUNTIME_KEY_PREFIX = "arq:metrics:runtime:"
+# per-minute buckets ("{prefix}{epoch minute}") of the same fields, expiring after the rate window
+TASK_RATE_KEY_PREFIX = "arq:metrics:rate:"
+TASK_COUNTERS = ("started", "completed", "failed")
+# running jobs, member "{queue}|{task}|{job id}" scored by its last heartbeat (ms). A worker killed
+# mid-task leaves its entry behind, but the entry stops being refreshed and ages out
+TASK_RUNNING_KEY = "arq:metrics:running"
+# set by each worker variant's on_startup, so tasks know which queue they were taken from
+QUEUE_CTX_KEY = "queue_name"
+
+
+def queue_wait_ms(ctx: Dict[str, Any], now_ms: Optional[int] = None) -> Optional[int]:
+    """
+    Time a job spent queued before a worker picked it up: from the moment it became runnable
+    (ARQ's score, i.e. enqueue time or the deferred start) until now.
+    """
+    score = ctx.get("score") if isinstance(ctx, dict) else None
+    if score is None:
+        return None
+    now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+    return max(0, now_ms - int(score))
+
+
+async def record_queue_wait(redis, queue_name: str, wait_ms: int) -> None:
+    """Keeps the latest QUEUE_WAIT_SAMPLES wait times per queue in a capped Redis list."""
+    key = QUEUE_WAIT_KEY_PREFIX + queue_name
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.lpush(key, wait_ms)
+        pipe.ltrim(key, 0, settings.QUEUE_WAIT_SAMPLES - 1)
+        await pipe.execute()
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+async def get_queue_wait_stats(redis, queue_name: str) -> Dict[str, Any]:
+    """p50/p95/max queue wait (ms) over the samples currently kept for a queue."""
+    raw = await redis.lrange(QUEUE_WAIT_KEY_PREFIX + queue_name, 0, -1)
+    samples = sorted(int(value) for value in raw)
+    return {
+        "samples": len(samples),
+        "p50_ms": percentile(samples, 0.5),
+        "p95_ms": percentile(samples, 0.95),
+        "max_ms": samples[-1] if samples else None,
+    }
+
+
+def counter_field(queue_name: str, task_name: str, counter: str) -> str:
+    return f"{queue_name}|{task_name}|{counter}"
+
+
+def parse_counter_field(field: str) -> Optional[Tuple[str, str, str]]:
+    parts = field.rsplit("|", 2)
+    return tuple(parts) if len(parts) == 3 else None
+
+
+def rate_bucket_key(now: float) -> str:
+    return f"{TASK_RATE_KEY_PREFIX}{int(now // 60)}"
+
+
+def running_member(queue_name: str, task_name: str, job_id: str) -> str:
+    return f"{queue_name}|{task_name}|{job_id}"
+
+
+async def record_task_started(redis, queue_name: str, task_name: str, job_id: str, now: Optional[float] = None) -> None:
+    now_ms = int((now if now is not None else time.time()) * 1000)
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.hincrby(TASK_COUNTERS_KEY, counter_field(queue_name, task_name, "started"), 1)
+        pipe.zadd(TASK_RUNNING_KEY, {running_member(queue_name, task_name, job_id): now_ms})
+        await pipe.execute()
+
+
+async def _heartbeat(redis, member: str) -> None:
+    """Refreshes a running task's entry until cancelled; XX so a finished task is never re-added."""
+    while True:
+        await asyncio.sleep(settings.TASK_HEARTBEAT_SECONDS)
+        try:
+            await redis.zadd(TASK_RUNNING_KEY, {member: int(time.time() * 1000)}, xx=True)
+        except Exception as e:
+            logger.debug(f"Could not refresh in-progress entry {member}: {e}")
+
+
+async def read_in_progress(redis, now: Optional[float] = None) -> Dict[Tuple[str, str], int]:
+    """
+    Running jobs per (queue, task): the entries heartbeated within the last TASK_HEARTBEAT_MISSES
+    intervals. Older ones, left by killed workers, are dropped on the way.
+    """
+    now_ms = int((now if now is not None else time.time()) * 1000)
+    alive_after = now_ms - settings.TASK_HEARTBEAT_SECONDS * max(1, settings.TASK_HEARTBEAT_MISSES) * 1000
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.zremrangebyscore(TASK_RUNNING_KEY, "-inf", f"({alive_after}")
+        pipe.zrangebyscore(TASK_RUNNING_KEY, alive_after, "+inf")
+        _, members = await pipe.execute()
+
+    running: Dict[Tuple[str, str], int] = {}
+    for member in members:
+        parsed = parse_counter_field(member.decode() if isinstance(member, bytes) else member)
+        if parsed is None:
+            continue
+        queue_name, task_name, _ = parsed
+        running[(queue_name, task_name)] = running.get((queue_name, task_name), 0) + 1
+    return running
+
+
+async def record_task_finished(
+    redis,
+    queue_name: str,
+    task_name: str,
+    job_id: str,
+    succeeded: bool,
+    runtime_ms: int,
+    now: Optional[float] = None,
+) -> None:
+    """
+    Counts the outcome in the lifetime counters and in the current minute's rate bucket, and keeps
+    the run time in a capped per-task list. All constant-time writes in one round trip.
+    """
+    outcome = "completed" if succeeded else "failed"
+    bucket = rate_bucket_key(now if now is not None else time.time())
+    runtime_key = TASK_RUNTIME_KEY_PREFIX + task_name
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.zrem(TASK_RUNNING_KEY, running_member(queue_name, task_name, job_id))
+        pipe.hincrby(TASK_COUNTERS_KEY, counter_field(queue_name, task_name, outcome), 1)
+        pipe.hincrby(bucket, counter_field(queue_name, task_name, outcome), 1)
+        pipe.expire(bucket, (settings.TASK_RATE_WINDOW_MINUTES + 2) * 60)
+        pipe.lpush(runtime_key, runtime_ms)
+        pipe.ltrim(runtime_key, 0, settings.TASK_RUNTIME_SAMPLES - 1)
+        await pipe.execute()
+
+
+def track_task(func: Callable) -> Callable:
+    """
+    Wraps an ARQ task function to record how long each job waited in its queue, and per queue and
+    task: started/completed/failed counters, the run time, and a heartbeated in-progress entry while
+    the job runs (all read by app.workers.telemetry). Recording failures are logged and never affect the task.
+    """
+    task_name = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(ctx: Dict[str, Any], *args: Any, **kwargs: Any) -> Any:
+        queue_name = ctx.get(QUEUE_CTX_KEY, DEFAULT_QUEUE)
+        redis = ctx.get("redis")
+        job_id = str(ctx.get("job_id") or uuid.uuid4().hex)
+        wait_ms = queue_wait_ms(ctx)
+        if wait_ms is not None:
+            logger.info(f"Task {task_name} waited {wait_ms} ms in {queue_name}")
+            if redis is not None:
+                try:
+                    await record_queue_wait(redis, queue_name, wait_ms)
+                except Exception as e:
+                    logger.debug(f"Could not record queue wait for {task_name}: {e}")
+
+        tracked = False
+        heartbeat = None
+        if redis is not None:
+            try:
+                await record_task_started(redis, queue_name, task_name, job_id)
+                tracked = True
+                heartbeat = asyncio.create_task(_heartbeat(redis, running_member(queue_name, task_name, job_id)))
+            except Exception as e:
+                logger.debug(f"Could not record start of {task_name}: {e}")
+
+        started = time.perf_counter()
+        succeeded = False
+        try:
+            result = await func(ctx, *args, **kwargs)
+            succeeded = True
+            return result
+        finally:
+            # also runs on cancellation (job timeout or abort), which counts as a failure
+            if heartbeat is not None:
+                heartbeat.cancel()
+            if tracked:
+                runtime_ms = int((time.perf_counter() - started) * 1000)
+                try:
+                    await record_task_finished(redis, queue_name, task_name, job_id, succeeded, runtime_ms)
+                except Exception as e:
+                    logger.debug(f"Could not record outcome of {task_name}: {e}")
+
+    return wrapper
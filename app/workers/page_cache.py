@@ -0,0 +1,221 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import zlib
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # optional: falls back to zlib, at a worse ratio and speed
+    zstandard = None
+
+
+class PageNotCachedError(LookupError):
+    """Raised in reparse mode when a page was never fetched (or has been evicted)."""
+
+
+@dataclass
+class CachedPage:
+    """One fetch of a URL; `blob` is the content address (sha256) of its body."""
+    url: str
+    fetched_at: str
+    blob: str
+    status_code: int = 200
+    content_type: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self, body: bytes) -> httpx.Response:
+        headers = {"Content-Type": self.content_type} if self.content_type else {}
+        return httpx.Response(self.status_code, content=body, headers=headers, request=httpx.Request("GET", self.url))
+
+
+class PageCache:
+    """
+    Local, content-addressed cache of raw page bodies.
+
+    Bodies are stored once per distinct content under blobs/<sha256>, compressed with zstd
+    (zlib when the zstandard package is not installed). A small JSON index per URL records its
+    latest fetches (time, blob, ETag, Last-Modified). Reading a blob bumps its mtime, and once the
+    blobs exceed `max_bytes` the least recently used ones are evicted. Index entries whose blob
+    is gone are dropped on read.
+
+    File writes go through a temporary file and os.replace, so several worker processes on the same
+    host can share one cache directory.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None, versions_per_url: Optional[int] = None):
+        self.root = Path(root or settings.PAGE_CACHE_DIR)
+        self.max_bytes = max_bytes or settings.PAGE_CACHE_MAX_BYTES
+        self.versions_per_url = versions_per_url or settings.PAGE_CACHE_VERSIONS_PER_URL
+        self.suffix = ".zst" if zstandard else ".zlib"
+        self._size: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    # --- public API
+
+    async def get(self, url: str) -> Optional[Tuple[CachedPage, bytes]]:
+        """Latest cached fetch of `url` and its body, or None."""
+        return await asyncio.to_thread(self._get, url)
+
+    async def put(self, url: str, response: httpx.Response) -> CachedPage:
+        """Stores a fetched response as the newest version of `url`."""
+        page = CachedPage(
+            url=url,
+            fetched_at=datetime.now(timezone.utc).isoformat(),
+            blob=hashlib.sha256(response.content).hexdigest(),
+            status_code=response.status_code,
+            content_type=response.headers.get("content-type"),
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+        )
+        async with self._lock:
+            await asyncio.to_thread(self._put, page, response.content)
+        return page
+
+    async def revalidated(self, page: CachedPage) -> CachedPage:
+        """Records a 304 answer: a new fetch of the same body."""
+        fresh = CachedPage(**{**asdict(page), "fetched_at": datetime.now(timezone.utc).isoformat()})
+        async with self._lock:
+            await asyncio.to_thread(self._append_version, fresh)
+        return fresh
+
+    async def history(self, url: str) -> List[CachedPage]:
+        """Every fetch of `url` still indexed, oldest first."""
+        return await asyncio.to_thread(self._read_index, url)
+
+    # --- storage
+
+    def _index_path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.root / "index" / digest[:2] / f"{digest}.json"
+
+    def _blob_path(self, blob: str) -> Path:
+        return self.root / "blobs" / blob[:2] / f"{blob}{self.suffix}"
+
+    def _get(self, url: str) -> Optional[Tuple[CachedPage, bytes]]:
+        for page in reversed(self._read_index(url)):
+            path = self._blob_path(page.blob)
+            try:
+                data = path.read_bytes()
+                os.utime(path)  # LRU: mark as recently used
+            except FileNotFoundError:
+                continue
+            return page, self._decompress(data)
+        return None
+
+    def _put(self, page: CachedPage, body: bytes) -> None:
+        path = self._blob_path(page.blob)
+        if not path.exists():
+            if self._size is None:
+                self._size = self._scan_size()
+            data = self._compress(body)
+            self._write_atomic(path, data)
+            self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+        else:
+            os.utime(path)
+        self._append_version(page)
+
+    def _append_version(self, page: CachedPage) -> None:
+        versions = [p for p in self._read_index(page.url) if (p.fetched_at, p.blob) != (page.fetched_at, page.blob)]
+        versions = (versions + [page])[-self.versions_per_url:]
+        payload = {"url": page.url, "fetches": [asdict(p) for p in versions]}
+        self._write_atomic(self._index_path(page.url), json.dumps(payload).encode("utf-8"))
+
+    def _read_index(self, url: str) -> List[CachedPage]:
+        try:
+            payload = json.loads(self._index_path(url).read_bytes())
+        except (FileNotFoundError, ValueError):
+            return []
+        return [CachedPage(**fetch) for fetch in payload.get("fetches", [])]
+
+    def _blobs(self) -> List[os.DirEntry]:
+        entries = []
+        blobs_dir = self.root / "blobs"
+        if not blobs_dir.exists():
+            return entries
+        for shard in os.scandir(blobs_dir):
+            if shard.is_dir():
+                entries.extend(entry for entry in os.scandir(shard.path) if entry.is_file())
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(entry.stat().st_size for entry in self._blobs())
+
+    def _evict(self) -> None:
+        # evict down to 90% so that we do not scan the directory on every subsequent write
+        target = int(self.max_bytes * 0.9)
+        entries = sorted(((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self._blobs()))
+        size = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, blob_size, path in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= blob_size
+            evicted += 1
+        self._size = size
+        logger.info(f"Page cache evicted {evicted} blobs, {size} bytes remain")
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @staticmethod
+    def _compress(body: bytes) -> bytes:
+        if zstandard:
+            return zstandard.ZstdCompressor(level=settings.PAGE_CACHE_ZSTD_LEVEL).compress(body)
+        return zlib.compress(body, 6)
+
+    @staticmethod
+    def _decompress(data: bytes) -> bytes:
+        if zstandard:
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+
+_page_cache: Optional[PageCache] = None
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """The process-wide cache, or None when PAGE_CACHE_ENABLED is off."""
+    global _page_cache
+    if not settings.PAGE_CACHE_ENABLED:
+        return None
+    if _page_cache is None:
+        _page_cache = PageCache()
+    return _page_cache
@@ -1,7 +1,45 @@
+from typing import Dict, Optional
+
 from arq.connections import RedisSettings
+from arq.constants import default_queue_name
 from app.core.config import settings
+from app.domain.types import JobPriority, JobType
 
 ARQ_REDIS_SETTINGS = RedisSettings(
     host=settings.REDIS_HOST,
     port=settings.REDIS_PORT
 )
+
+# Named queues, each drained by its own worker pool (see app.workers.scheduler)
+DEFAULT_QUEUE = default_queue_name  # cron jobs and anything not routed below
+INTERACTIVE_QUEUE = "arq:queue:interactive"  # a user is waiting on the result
+SCRAPING_QUEUE = "arq:queue:scraping"
+BULK_QUEUE = "arq:queue:bulk"  # backfills and reprocessing; may lag behind without harm
+
+QUEUES = (DEFAULT_QUEUE, INTERACTIVE_QUEUE, SCRAPING_QUEUE, BULK_QUEUE)
+
+JOB_TYPE_QUEUES: Dict[JobType, str] = {
+    JobType.ARCHETYPE_GENERATION: INTERACTIVE_QUEUE,
+    JobType.COMPETITIVE_ANALYSIS: INTERACTIVE_QUEUE,
+    JobType.SENTIMENT_ANALYSIS: INTERACTIVE_QUEUE,
+    JobType.REVIEW_SCRAPING: SCRAPING_QUEUE,
+    # reparse reads the page cache the scrapes wrote (PAGE_CACHE_DIR), so it runs where they do
+    JobType.REVIEW_REPARSE: SCRAPING_QUEUE,
+    JobType.EMBEDDING_GENERATION: BULK_QUEUE,
+    JobType.DATA_PROCESSING: BULK_QUEUE,
+    JobType.EXPORT_REPORTS: BULK_QUEUE,
+    JobType.NOTIFICATION_BATCH: BULK_QUEUE,
+    JobType.BACKUP_RESTORE: BULK_QUEUE,
+}
+
+
+def queue_for_job(job_type: JobType, priority: Optional[JobPriority] = None) -> str:
+    """
+    Queue a job's tasks are enqueued on: by job type, unless an explicit priority moves
+    it to the interactive (HIGH) or bulk (LOW) queue.
+    """
+    if priority == JobPriority.HIGH:
+        return INTERACTIVE_QUEUE
+    if priority == JobPriority.LOW:
+        return BULK_QUEUE
+    return JOB_TYPE_QUEUES.get(job_type, DEFAULT_QUEUE)
@@ -1,6 +1,8 @@
 import logging 
 from typing import Dict, Any, Callable, Type
 from app.workers.base.task import BaseTask
+from app.db.instrumentation import instrument_task
+from app.workers.metrics import track_task
 
 logger = logging.getLogger(__name__)
 
@@ -10,7 +12,8 @@ class TaskRegistry:
         self._task_classes: Dict[str, Type[BaseTask]] = {}
     
     def register_task(self, name: str, task_function: Callable, task_class: Type[BaseTask] = None) -> None:
-        self._tasks[name] = task_function
+        # every registered task reports its queue wait, and its statement count and DB time when it finishes
+        self._tasks[name] = track_task(instrument_task(task_function))
         if task_class:
             self._task_classes[name] = task_class
         logger.info(f"Registered task: {name}")
@@ -53,5 +56,9 @@ def register_all_tasks():
     
     task_registry.register_task("generate_customer_archetypes_task", generate_customer_archetypes_task)
 
+    from app.workers.tasks.embeddings.review_embeddings import generate_review_embeddings_task
+
+    task_registry.register_task("generate_review_embeddings_task", generate_review_embeddings_task)
+
 # Auto-register tasks when module is imported
 register_all_tasks()
\ No newline at end of file
@@ -1,10 +1,89 @@
-from app.workers.queue import ARQ_REDIS_SETTINGS
+from functools import partial
+
+from arq import cron
+
+from app.core.config import settings
+from app.db.instrumentation import instrument_task
+from app.services.job_event_log import job_event_log
+from app.workers.http_client import close_http_client, open_http_client
+from app.workers.metrics import QUEUE_CTX_KEY
+from app.workers.queue import ARQ_REDIS_SETTINGS, BULK_QUEUE, DEFAULT_QUEUE, INTERACTIVE_QUEUE, SCRAPING_QUEUE
 from app.workers.registry import task_registry
+from app.workers.tasks.maintenance.partitions import maintain_review_partitions_task
+from app.workers.tasks.maintenance.source_refresh import schedule_source_refreshes_task
+
+
+async def on_startup(ctx, queue_name: str = DEFAULT_QUEUE) -> None:
+    ctx[QUEUE_CTX_KEY] = queue_name
+    await open_http_client(ctx)
+
+
+async def on_shutdown(ctx) -> None:
+    await close_http_client(ctx)
+    # write job events still buffered in this worker
+    await job_event_log.close()
+
 
 class WorkerSettings:
     """
-    Configuration for the ARQ worker
+    Configuration for the ARQ worker on the default queue: cron jobs and tasks not routed to a named queue.
+    ARQ reads settings from the class __dict__, so the variants below repeat every field instead of inheriting.
+    allow_abort_jobs lets JobService.cancel_job drop tasks that are still queued.
     """
     functions = task_registry.get_arq_functions()
     redis_settings = ARQ_REDIS_SETTINGS 
-    keep_result = 600
\ No newline at end of file
+    keep_result = 600
+    allow_abort_jobs = True
+    queue_name = DEFAULT_QUEUE
+    max_jobs = settings.ARQ_DEFAULT_MAX_JOBS
+    on_startup = on_startup
+    on_shutdown = on_shutdown
+    cron_jobs = [
+        cron(instrument_task(maintain_review_partitions_task), hour={3}, minute={0}, run_at_startup=True),
+        # hourly; each run spreads its scrapes over SOURCE_REFRESH_WINDOW_MINUTES
+        cron(instrument_task(schedule_source_refreshes_task), minute={5}, unique=True),
+    ]
+
+
+class InteractiveWorkerSettings:
+    """
+    Worker pool for jobs a user is waiting on (archetypes, analysis). Run it on dedicated processes
+    so these never queue behind scrapes or backfills.
+    """
+    functions = task_registry.get_arq_functions()
+    redis_settings = ARQ_REDIS_SETTINGS
+    keep_result = 600
+    allow_abort_jobs = True
+    queue_name = INTERACTIVE_QUEUE
+    max_jobs = settings.ARQ_INTERACTIVE_MAX_JOBS
+    on_startup = partial(on_startup, queue_name=INTERACTIVE_QUEUE)
+    on_shutdown = on_shutdown
+
+
+class ScrapingWorkerSettings:
+    """
+    Worker pool for review scrapes; max_jobs bounds concurrent upstream scrapes per process.
+    """
+    functions = task_registry.get_arq_functions()
+    redis_settings = ARQ_REDIS_SETTINGS
+    keep_result = 600
+    allow_abort_jobs = True
+    queue_name = SCRAPING_QUEUE
+    max_jobs = settings.ARQ_SCRAPING_MAX_JOBS
+    on_startup = partial(on_startup, queue_name=SCRAPING_QUEUE)
+    on_shutdown = on_shutdown
+
+
+class BulkWorkerSettings:
+    """
+    Worker pool for backfills and reprocessing (embeddings, exports), kept small so it
+    cannot starve the database.
+    """
+    functions = task_registry.get_arq_functions()
+    redis_settings = ARQ_REDIS_SETTINGS
+    keep_result = 600
+    allow_abort_jobs = True
+    queue_name = BULK_QUEUE
+    max_jobs = settings.ARQ_BULK_MAX_JOBS
+    on_startup = partial(on_startup, queue_name=BULK_QUEUE)
+    on_shutdown = on_shutdown
\ No newline at end of file
@@ -9,6 +9,7 @@ from app.workers.base.progress import ProgressNotifier
 from app.domain.types import JobStatus, WebSocketEventType, JobTargetType
 from app.db.session import AsyncSessionLocal
 from app.repositories.job_repo import JobRepository
+from app.services.job_cancellation import JobCancelledError, job_cancellation
 from app.services.job_service import JobService
 from app.repositories.review_repo import ReviewRepository
 from app.repositories.archetype_repo import ArchetypeRepository
@@ -33,11 +34,15 @@ class BaseArchetypeTask(BaseTask):
         try:
             if not await self.validate_config(config):
                 raise ValueError("Invalid archetype configuration")
+            await job_cancellation.raise_if_cancelled(job_id)
             
             await ProgressNotifier.notify_task_started(job_id, self.task_name, config)
             await self._update_job_status(job_id, JobStatus.RUNNING)
 
-            archetypes = await self._execute_archetype_generation(job_id, organization_id, config)
+            # a cancellation stops waiting on the LLM call; the archetypes are then never saved
+            async with job_cancellation.watch(job_id):
+                archetypes = await self._execute_archetype_generation(job_id, organization_id, config)
+            await job_cancellation.raise_if_cancelled(job_id)
 
             result_data = await self._save_archetypes(job_id, organization_id, archetypes, config)
 
@@ -45,6 +50,13 @@ class BaseArchetypeTask(BaseTask):
             await ProgressNotifier.notify_task_completed(job_id, self.task_name, result_data)
             await self.on_complete(job_id, result_data)
             return result_data
+
+        except JobCancelledError:
+            result_data = {"cancelled": True, "cancelled_at": datetime.now(timezone.utc).isoformat()}
+            # already CANCELLED by JobService.cancel_job; re-asserted in case the RUNNING update above raced with it
+            await self._update_job_status(job_id, JobStatus.CANCELLED, result=result_data)
+            await ProgressNotifier.notify_task_cancelled(job_id, self.task_name, result_data)
+            return result_data
         
         except Exception as e:
             error_msg = f"Error in {self.task_name} archetype generation: {str(e)}"
@@ -74,23 +86,20 @@ class BaseArchetypeTask(BaseTask):
         config: Dict[str, Any]
     ) -> List[str]:
         """
-        Fetch reviews for archetype analysis.
+        Fetch a stratified sample of review texts for archetype analysis.
         """
         async with AsyncSessionLocal() as session:
             review_repo = ReviewRepository(session)
             if target_type == JobTargetType.COMPETITOR:
-                reviews = await review_repo.get_reviews_for_competitor_analysis(
+                return await review_repo.get_reviews_for_competitor_analysis(
                     organization_id=organization_id,
                     competitor_id=target_id,
                     limit=config.get("sample_size", 100)
                 )
-            else:
-                reviews = await review_repo.get_reviews_for_archetype_analysis(
-                    organization_id=organization_id,
-                    limit=config.get("sample_size", 100)
-                )
-            
-            return [review.review_text for review in reviews if review.review_text]
+            return await review_repo.get_reviews_for_archetype_analysis(
+                organization_id=organization_id,
+                limit=config.get("sample_size", 100)
+            )
     
     async def _save_archetypes(
         self, 
@@ -100,8 +109,12 @@ class BaseArchetypeTask(BaseTask):
         config: Dict[str, Any]
     ) -> Dict[str, Any]:
         """
-        Save the generated archetypes to the database.
+        Save the generated archetypes to the database, replacing the target's active set.
+        A generation without any archetype fails the job and leaves the active set as it was.
         """
+        if not archetypes:
+            raise ValueError("LLM returned no valid archetypes")
+
         await ProgressNotifier.notify_job_progress(
             job_id=job_id,
             event_type=WebSocketEventType.ARCHETYPE_SAVING,
@@ -112,23 +125,20 @@ class BaseArchetypeTask(BaseTask):
         async with AsyncSessionLocal() as session:
             archetype_repo = ArchetypeRepository(session)
 
-            saved_archetypes = []
-            target_type = JobTargetType(config.get("target_type"), JobTargetType.ORGANIZATION)
+            target_type = JobTargetType(config.get("target_type", JobTargetType.ORGANIZATION.value))
             target_id = config.get("target_id", organization_id)
 
-            for archetype_data in archetypes:
-                saved_archetype = await archetype_repo.create_archetype(
-                    organization_id=organization_id,
-                    job_id=job_id,
-                    competitor_id=target_id if target_type == JobTargetType.COMPETITOR else None,
-                    archetype_data=archetype_data
-                )
-                saved_archetypes.append(saved_archetype)
-            
+            archetype_ids = await archetype_repo.bulk_create_archetypes(
+                organization_id=organization_id,
+                job_id=job_id,
+                archetypes=archetypes,
+                competitor_id=target_id if target_type == JobTargetType.COMPETITOR else None
+            )
             await session.commit()
 
             return {
-            "archetypes_generated": len(saved_archetypes),
+            "archetypes_generated": len(archetype_ids),
+            "archetype_ids": archetype_ids,
             "target_type": target_type.value,
             "target_id": target_id,
             "completed_at": datetime.now(timezone.utc).isoformat()
@@ -0,0 +1,5 @@
+from .review_embeddings import generate_review_embeddings_task
+
+__all__ = [
+    "generate_review_embeddings_task"
+]
@@ -0,0 +1,159 @@
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+from app.core.config import settings
+from app.workers.base.task import BaseTask
+from app.workers.base.progress import ProgressNotifier
+from app.domain.types import JobStatus, WebSocketEventType
+from app.db.session import AsyncSessionLocal
+from app.repositories.job_repo import JobRepository
+from app.repositories.review_repo import ReviewRepository
+from app.services.job_cancellation import JobCancelledError, job_cancellation
+from app.services.job_service import JobService
+from app.services.embedding_service import ReviewEmbeddingService, get_embedding_provider
+
+logger = logging.getLogger(__name__)
+
+class ReviewEmbeddingTask(BaseTask):
+    """
+    Populates Review.embedding for every review of an organization that does not have one yet.
+    """
+
+    def __init__(self):
+        super().__init__("review_embedding_generator")
+
+    async def execute(self, ctx, job_id: str, organization_id: int, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute the embedding generation task.
+        """
+        config = {**self.get_default_config(), **(config or {})}
+        await self.on_start(job_id, config)
+        last_report: Dict[str, Any] = {"rows_embedded": 0, "batches": 0}
+
+        try:
+            if not await self.validate_config(config):
+                raise ValueError("Invalid embedding configuration")
+            await job_cancellation.raise_if_cancelled(job_id)
+
+            await ProgressNotifier.notify_task_started(job_id, self.task_name, config)
+            await self._update_job_status(job_id, JobStatus.RUNNING)
+
+            provider = get_embedding_provider(config.get("provider"))
+
+            async def report_progress(report: Dict[str, Any]) -> None:
+                last_report.update(report)
+                await ProgressNotifier.notify_job_progress(
+                    job_id=job_id,
+                    event_type=WebSocketEventType.PROGRESS,
+                    message=f"Embedded {report['rows_embedded']} reviews ({report['rows_per_second']} rows/s)",
+                    data=report,
+                    organization_id=organization_id,
+                )
+
+            async with AsyncSessionLocal() as session:
+                service = ReviewEmbeddingService(
+                    ReviewRepository(session),
+                    provider,
+                    batch_size=config.get("batch_size"),
+                    concurrency=config.get("concurrency"),
+                )
+                # every written batch is committed, so a cancelled run keeps the embeddings done so far
+                async with job_cancellation.watch(job_id):
+                    report = await service.embed_pending_reviews(
+                        organization_id=organization_id,
+                        max_rows=config.get("max_rows"),
+                        on_progress=report_progress,
+                    )
+
+            search_indexes = await self._ensure_search_index(organization_id)
+
+            result_data = {
+                **report,
+                "provider": provider.name,
+                "search_indexes": search_indexes,
+                "completed_at": datetime.now(timezone.utc).isoformat(),
+            }
+            await self._update_job_status(job_id, JobStatus.COMPLETED, result=result_data)
+            await ProgressNotifier.notify_task_completed(job_id, self.task_name, result_data)
+            await self.on_complete(job_id, result_data)
+            return result_data
+
+        except JobCancelledError:
+            result_data = {**last_report, "cancelled": True, "cancelled_at": datetime.now(timezone.utc).isoformat()}
+            # re-asserted in case the RUNNING update above raced with the cancellation
+            await self._update_job_status(job_id, JobStatus.CANCELLED, result=result_data)
+            await ProgressNotifier.notify_task_cancelled(job_id, self.task_name, result_data)
+            return result_data
+
+        except Exception as e:
+            error_msg = f"Error in {self.task_name} embedding generation: {str(e)}"
+            await self._update_job_status(job_id, JobStatus.FAILED, error=error_msg)
+            await ProgressNotifier.notify_task_error(job_id, self.task_name, error_msg)
+            await self.on_error(job_id, e)
+            raise
+
+    async def validate_config(self, config: Dict[str, Any]) -> bool:
+        """
+        Validate embedding configuration: sizes, when given, must be positive integers.
+        """
+        for field in ("batch_size", "concurrency", "max_rows"):
+            value = config.get(field)
+            if value is not None and (not isinstance(value, int) or value <= 0):
+                return False
+        return True
+
+    def get_default_config(self) -> Dict[str, Any]:
+        """
+        Get default configuration for embedding generation; unset values fall back to Settings.
+        """
+        return {
+            "provider": None,
+            "batch_size": None,
+            "concurrency": None,
+            "max_rows": None,
+        }
+
+    async def _ensure_search_index(self, organization_id: int) -> List[str]:
+        """
+        Give the organization its own partial HNSW index once it has enough embedded reviews;
+        smaller organizations are served by an exact scan over their rows.
+        """
+        async with AsyncSessionLocal() as session:
+            embedded = await ReviewRepository(session).count_embedded_reviews(organization_id)
+        if embedded < settings.VECTOR_SEARCH_ORG_INDEX_MIN_ROWS:
+            return []
+
+        async with AsyncSessionLocal() as session:
+            index_names = await ReviewRepository(session).ensure_organization_embedding_index(organization_id)
+        self.logger.info(f"Organization {organization_id} has {embedded} embedded reviews, search indexes ready: {index_names}")
+        return index_names
+
+    async def _update_job_status(
+        self,
+        job_id: str,
+        status: JobStatus,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """
+        Update job status in the database
+        """
+        async with AsyncSessionLocal() as session:
+            job_service = JobService(JobRepository(session))
+            await job_service.update_job_status(
+                job_id=job_id,
+                status=status,
+                result=result,
+                error=error
+            )
+
+async def generate_review_embeddings_task(
+    ctx,
+    job_id: str,
+    organization_id: int,
+    config: Dict[str, Any]
+):
+    """ARQ task function for review embedding generation"""
+    task = ReviewEmbeddingTask()
+    return await task.execute(ctx, job_id, organization_id, config)
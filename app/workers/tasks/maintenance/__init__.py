@@ -0,0 +1,5 @@
+from .partitions import maintain_review_partitions_task
+
+__all__ = [
+    "maintain_review_partitions_task"
+]
@@ -0,0 +1,23 @@
+import logging
+from typing import Dict, Any
+
+from app.core.config import settings
+from app.db.session import engine
+from app.db.partitions import create_future_review_partitions, future_review_months, record_review_months
+
+logger = logging.getLogger(__name__)
+
+async def maintain_review_partitions_task(ctx) -> Dict[str, Any]:
+    """
+    ARQ cron task: pre-creates the next REVIEWS_PARTITION_MONTHS_AHEAD months of review partitions,
+    so ingest rarely has to create one inline. No-op without monthly sub-partitioning.
+    """
+    if not settings.REVIEWS_MONTHLY_PARTITIONS:
+        return {"created": []}
+
+    months = future_review_months()
+    async with engine.begin() as conn:
+        created = await create_future_review_partitions(conn)
+    record_review_months(months)
+    logger.info(f"Review partition maintenance created {len(created)} partitions")
+    return {"created": created}
@@ -0,0 +1,102 @@
+import hashlib
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.domain.types import JobType
+from app.repositories.job_repo import JobRepository
+from app.repositories.source_config_repo import SourceConfigRepositoru
+from app.services.job_coalescing import coalescing_key, job_coalescer
+from app.services.job_service import JobService
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_offset_seconds(config_id: int, window_seconds: int) -> int:
+    """
+    Start offset of a config's refresh within the window. Derived from the config id, so every
+    config keeps its own slot from one day to the next and load is spread evenly over the window.
+    """
+    if window_seconds <= 0:
+        return 0
+    digest = hashlib.blake2b(str(config_id).encode("ascii"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % window_seconds
+
+
+def _source_data(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "source_type": row["source"].value,
+        "brand_name": row["brand_name"],
+        "countries": row["countries"] or [],
+        "number_of_reviews": row["number_of_reviews"],
+        "options": row["options"] or {},
+    }
+
+
+async def schedule_source_refreshes_task(ctx) -> Dict[str, Any]:
+    """
+    ARQ cron task: walks active SourceConfig rows in keyset batches and starts a refresh scrape for each
+    one not refreshed in SOURCE_REFRESH_INTERVAL_HOURS. Scrapes are deferred over
+    SOURCE_REFRESH_WINDOW_MINUTES, at most SOURCE_REFRESH_MAX_PER_ORG per organization per run.
+    Configs whose scrape is already running or fresh (see job coalescing) are marked refreshed and skipped.
+    """
+    if not settings.SOURCE_REFRESH_ENABLED:
+        return {"enqueued": 0}
+
+    now = datetime.now(timezone.utc)
+    stale_before = now - timedelta(hours=settings.SOURCE_REFRESH_INTERVAL_HOURS)
+    window_seconds = settings.SOURCE_REFRESH_WINDOW_MINUTES * 60
+    per_org: Counter = Counter()
+    stats = {"scanned": 0, "enqueued": 0, "skipped_fresh": 0, "skipped_capped": 0, "skipped_no_user": 0}
+
+    after_id = 0
+    while True:
+        async with AsyncSessionLocal() as session:
+            rows = await SourceConfigRepositoru(session).get_due_for_refresh(
+                stale_before=stale_before, after_id=after_id, limit=settings.SOURCE_REFRESH_BATCH_SIZE
+            )
+        if not rows:
+            break
+        after_id = rows[-1]["id"]
+        stats["scanned"] += len(rows)
+
+        keys = {row["id"]: coalescing_key(row["organization_id"], _source_data(row)) for row in rows}
+        try:
+            owners = await job_coalescer.lookup(keys.values())
+        except Exception as e:
+            logger.warning(f"Could not check in-flight scrapes, refreshing without it: {e}")
+            owners = {}
+
+        refreshed: List[int] = []
+        for row in rows:
+            if owners.get(keys[row["id"]]):
+                stats["skipped_fresh"] += 1
+                refreshed.append(row["id"])
+                continue
+            if row["user_id"] is None:
+                stats["skipped_no_user"] += 1
+                continue
+            if per_org[row["organization_id"]] >= settings.SOURCE_REFRESH_MAX_PER_ORG:
+                stats["skipped_capped"] += 1
+                continue
+
+            async with AsyncSessionLocal() as session:
+                await JobService(JobRepository(session), ctx["redis"]).create_or_attach_job(
+                    user_id=row["user_id"],
+                    organization_id=row["organization_id"],
+                    job_type=JobType.REVIEW_SCRAPING,
+                    sources_data=[_source_data(row)],
+                    config={"defer_seconds": refresh_offset_seconds(row["id"], window_seconds)},
+                )
+            per_org[row["organization_id"]] += 1
+            stats["enqueued"] += 1
+            refreshed.append(row["id"])
+
+        async with AsyncSessionLocal() as session:
+            await SourceConfigRepositoru(session).mark_refreshed(refreshed, now)
+
+    logger.info(f"Source refresh scheduling: {stats}")
+    return stats
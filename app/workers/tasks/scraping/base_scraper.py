@@ -1,17 +1,29 @@
 import asyncio 
 import uuid 
 from abc import abstractmethod 
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator
 
+import httpx
+
+from app.core.config import settings
 from app.workers.base.task import BaseTask
 from app.workers.base.progress import ProgressNotifier
+from app.workers.base.checkpoint import CheckpointTracker, ScrapeCheckpoint, SeenReview, checkpoint_store
+from app.workers.base.rate_limit import rate_limiter
+from app.workers.base.watermark import Watermark, watermark_store
+from app.workers.http_client import HOST_LIMITER_CTX_KEY, HTTP_CLIENT_CTX_KEY, HostLimiter, create_http_client
+from app.workers.page_cache import CachedPage, PageNotCachedError, get_page_cache
 from app.domain.types import JobSourceStatus, SourceType, WebSocketEventType
 from app.schemas.jobs import ReviewData
 
 from app.db.session import AsyncSessionLocal
 from app.repositories.job_repo import JobRepository
+from app.repositories.review_repo import ReviewRepository
+from app.services.job_cancellation import JobCancelledError, job_cancellation
 from app.services.job_service import JobService
+from app.services.review_ingest_services import ReviewIngestService
 
 class BaseScraper(BaseTask):
     """
@@ -22,82 +34,314 @@ class BaseScraper(BaseTask):
     def __init__(self, task_name: str, source_type: SourceType):
         super().__init__(task_name)
         self.source_type = source_type
+        self.rate_limit_waits = 0
+        self.rate_limit_wait_seconds = 0.0
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self.host_limiter: Optional[HostLimiter] = None
+        self._owns_http_client = False
+        self.pages_scraped = 0
+        self.stopped_at_known_page = False
+        # reparse mode: every fetch is served from the page cache, nothing goes to the network
+        self.reparse = False
+        self.page_cache = get_page_cache()
+        self.pages_from_cache = 0
+        self.reviews_persisted = 0
+        # resuming a retried scrape: _iter_review_batches starts at resume_cursor and sets page_cursor
+        # to the cursor of the page after each page it yields (None when a scraper cannot resume)
+        self.resume_cursor: Optional[str] = None
+        self.page_cursor: Optional[str] = None
+        self.resumed_from_page = 0
 
     async def execute(self, ctx, job_id: str, organization_id: int, config: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute the scraping task.
         """
         await self.on_start(job_id, config)
+        # shared, pooled client built by the worker's on_startup (absent when run outside a worker)
+        self.http_client = (ctx or {}).get(HTTP_CLIENT_CTX_KEY)
+        self.host_limiter = (ctx or {}).get(HOST_LIMITER_CTX_KEY)
+        self.reparse = config.get("mode") == "reparse"
         try:
             if not await self.validate_config(config):
                 raise ValueError("Invalid configuration")
+            await job_cancellation.raise_if_cancelled(job_id)
             
             await ProgressNotifier.notify_task_started(job_id, self.source_type.value, config)
             await self._update_job_source_status(job_id, JobSourceStatus.RUNNING)
 
-            reviews = await self._execute_scraping(job_id, organization_id, config)
+            # a cancellation interrupts the scrape at its current page fetch or batch write
+            async with job_cancellation.watch(job_id):
+                totals = await self._ingest_review_stream(job_id, organization_id, config)
 
-            result_data = await self._process_results(job_id, reviews, config)
+            result_data = await self._process_results(job_id, totals, config)
 
             await self._update_job_source_status(job_id, JobSourceStatus.COMPLETED, result=result_data)
+            await checkpoint_store.clear(job_id, self.source_type)
             await ProgressNotifier.notify_task_completed(job_id, self.source_type.value, result_data)
 
             await self.on_complete(job_id, result_data)
             return result_data
+
+        except JobCancelledError:
+            # batches committed before the cancellation stay stored; watermarks are not advanced
+            result_data = self._cancelled_result(config)
+            self.logger.info(f"[{job_id}] {self.source_type.value} scrape cancelled after {self.reviews_persisted} reviews")
+            await self._update_job_source_status(job_id, JobSourceStatus.CANCELLED, result=result_data)
+            await checkpoint_store.clear(job_id, self.source_type)
+            await ProgressNotifier.notify_task_cancelled(job_id, self.source_type.value, result_data)
+            return result_data
         
         except Exception as e:
             error_msg = f"Error in {self.source_type.value} scraping: {str(e)}"
-            await self._update_job_source_status(job_id, JobSourceStatus.FAILED, error=error_msg)
+            # batches committed before the failure stay stored; report them so the partial write is visible
+            await self._update_job_source_status(
+                job_id, JobSourceStatus.FAILED, result=self._failed_result(config), error=error_msg
+            )
             await ProgressNotifier.notify_task_error(job_id, self.source_type.value, error_msg)
             await self.on_error(job_id, e)
             raise 
+        finally:
+            if self._owns_http_client:
+                await self.http_client.aclose()
+                self.http_client, self._owns_http_client = None, False
     
     @abstractmethod
-    async def _execute_scraping(self, job_id: str, organization_id: int, config: Dict[str, Any]) -> List[ReviewData]:
+    def _iter_review_batches(self, job_id: str, organization_id: int, config: Dict[str, Any]) -> AsyncIterator[List[ReviewData]]:
         """
-        Execute the actual scrapping logic,
-        Override this method in the subclass to implement the actual scraping logic.
+        Execute the actual scraping logic, yielding reviews page by page as they are fetched.
+        Override this async generator in the subclass to implement the actual scraping logic.
+
+        To support resuming, start from `self.resume_cursor` when it is set, and before yielding
+        each page set `self.page_cursor` to whatever locates the page after it.
         """
         pass 
 
-    async def _process_results(self, job_id: str, reviews: List[ReviewData], config: Dict[str, Any]) -> Dict[str, Any]:
+    @asynccontextmanager
+    async def rate_limited(self, url: Optional[str] = None) -> AsyncIterator[float]:
         """
-        Process and format the results.
+        Wrap every upstream page fetch in this so that all workers share the source's request budget:
+
+            async with self.rate_limited(url):
+                page = await client.get(url)
         """
+        async with rate_limiter.limit(self.source_type, url) as waited:
+            if waited:
+                self.rate_limit_waits += 1
+                self.rate_limit_wait_seconds += waited
+            yield waited
 
-        await ProgressNotifier.notify_task_progress(
-            job_id=job_id,
-            task_name=self.source_type.value,
-            progress_percentage=50.0,
-            step=2,
-            total_steps=2,  
-            additional_data={
-                "reviews_count": len(reviews),
-            }
-        )
+    async def fetch(self, url: str, method: str = "GET", **kwargs: Any) -> httpx.Response:
+        """
+        Fetch one upstream page through the worker's shared client, within the source's rate limit
+        and the per-host concurrency cap. Scrapers should use this rather than creating their own client.
+
+        With the page cache enabled, GET bodies are cached and revalidated with ETag/Last-Modified;
+        a 304 is answered from the cache. In reparse mode the cache is the only source.
+        """
+        cached: Optional[CachedPage] = None
+        cached_body = b""
+        if self.page_cache and method == "GET":
+            hit = await self.page_cache.get(url)
+            if hit:
+                cached, cached_body = hit
+        if self.reparse:
+            if cached is None:
+                raise PageNotCachedError(f"Page not in cache, cannot reparse without fetching: {url}")
+            self.pages_from_cache += 1
+            return cached.to_response(cached_body)
+        if cached:
+            kwargs["headers"] = {**cached.conditional_headers(), **(kwargs.get("headers") or {})}
+
+        if self.http_client is None:
+            # outside a worker (tests, ad-hoc runs): one client for this execution, closed at the end
+            self.http_client = create_http_client()
+            self._owns_http_client = True
+        if self.host_limiter is None:
+            self.host_limiter = HostLimiter()
+
+        async with self.rate_limited(url):
+            async with self.host_limiter.slot(url):
+                response = await self.http_client.request(method, url, **kwargs)
+
+        if cached and response.status_code == 304:
+            await self.page_cache.revalidated(cached)
+            self.pages_from_cache += 1
+            return cached.to_response(cached_body)
+        response.raise_for_status()
+        if self.page_cache and method == "GET":
+            await self.page_cache.put(url, response)
+        return response
+
+    async def _execute_scraping(self, job_id: str, organization_id: int, config: Dict[str, Any]) -> List[ReviewData]:
+        """
+        Collect every scraped batch into a single list.
+        Only meant for small scrapes and debugging; execute() streams batches straight to the database.
+        """
+        reviews: List[ReviewData] = []
+        async for batch in self._iter_review_batches(job_id, organization_id, config):
+            reviews.extend(batch)
+        return reviews
 
-        # TODO: Implement the actual processing logic 
-        await asyncio.sleep(1)
-
-        await ProgressNotifier.notify_task_progress(
-            job_id=job_id,
-            task_name=self.source_type.value,
-            progress_percentage=100.0,
-            step=2,
-            total_steps=2,
-            additional_data={
-                "reviews_count": len(reviews),
-            }
+    async def _ingest_review_stream(self, job_id: str, organization_id: int, config: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Stream scraped batches into the database, reporting progress as rows are actually persisted.
+
+        With WATERMARK_ENABLED, pagination stops at the first page whose reviews were all stored by an
+        earlier scrape (pages come newest first), unless `options.full_rescrape` is set. Watermarks are
+        only saved once every page has been persisted, so a known page always means the older ones are
+        stored too.
+
+        With SCRAPE_CHECKPOINT_ENABLED, the cursor and counts of the committed pages are saved after
+        every commit, and a retry of the same job and source resumes after them. The reviews of those
+        pages are saved with the checkpoint and added to the watermarks once the retry completes. Pages
+        that were fetched again around the checkpoint are absorbed by the idempotent ingest.
+
+        In reparse mode the stored reviews are updated with what the scraper parses from the cached pages.
+        """
+        target = config.get("number_of_reviews") or 0
+        brand_name = config.get("brand_name", "Unknown")
+        incremental = (
+            settings.WATERMARK_ENABLED and not self.reparse and not (config.get("options") or {}).get("full_rescrape")
         )
+        watermarks: Dict[str, Watermark] = {}
+
+        checkpoint: Optional[ScrapeCheckpoint] = None
+        resumed_seen: List[SeenReview] = []  # reviews committed by the earlier attempts
+        if settings.SCRAPE_CHECKPOINT_ENABLED:
+            checkpoint = await checkpoint_store.load(job_id, self.source_type)
+            if checkpoint and checkpoint.cursor is not None:
+                self.resume_cursor = checkpoint.cursor
+                self.resumed_from_page = self.pages_scraped = checkpoint.pages
+                self.reviews_persisted = checkpoint.inserted + checkpoint.updated + checkpoint.duplicates
+                if settings.WATERMARK_ENABLED:
+                    resumed_seen = await checkpoint_store.load_seen(job_id, self.source_type)
+                self.logger.info(f"[{job_id}] Resuming after page {checkpoint.pages} ({checkpoint.received} reviews already stored)")
+            else:
+                checkpoint = None
+        tracker = CheckpointTracker(checkpoint)
+        base = checkpoint or ScrapeCheckpoint()  # counts of the pages stored before this run
+
+        async def batches() -> AsyncIterator[List[Dict[str, Any]]]:
+            pages = self._iter_review_batches(job_id, organization_id, config)
+            try:
+                async for page in pages:
+                    if settings.WATERMARK_ENABLED:
+                        for country in {review.country for review in page} - watermarks.keys():
+                            watermarks[country] = await watermark_store.load(organization_id, self.source_type, brand_name, country)
+                    if incremental and page and all(
+                        watermarks[review.country].is_known(review.external_id, review.review_date) for review in page
+                    ):
+                        self.stopped_at_known_page = True
+                        self.logger.info(f"[{job_id}] Page {self.pages_scraped + 1} is already stored, stopping pagination")
+                        break
+
+                    self.pages_scraped += 1
+                    if settings.WATERMARK_ENABLED:
+                        for review in page:
+                            watermarks[review.country].add(review.external_id, review.review_date)
+                    if page:
+                        seen = [
+                            (review.country, review.external_id, review.review_date.isoformat() if review.review_date else None)
+                            for review in page
+                        ] if settings.WATERMARK_ENABLED and settings.SCRAPE_CHECKPOINT_ENABLED else None
+                        tracker.page_yielded(self.page_cursor, page[-1].external_id, len(page), seen)
+                    yield [review.model_dump(mode="json") for review in page]
+            finally:
+                # stop the scraper's generator (and its open requests) right away, not when it is collected
+                await pages.aclose()
+
+        async def on_persisted(persisted: int) -> None:
+            persisted += base.inserted + base.updated + base.duplicates
+            self.reviews_persisted = persisted
+            await ProgressNotifier.notify_task_progress(
+                job_id=job_id,
+                task_name=self.source_type.value,
+                progress_percentage=min(100.0, persisted / target * 100) if target else 0.0,
+                step=persisted,
+                total_steps=target,
+                additional_data={"reviews_persisted": persisted},
+            )
+
+        async def on_batch_committed(index: int, counts: Dict[str, int]) -> None:
+            if settings.SCRAPE_CHECKPOINT_ENABLED and tracker.batch_committed(index, counts):
+                await checkpoint_store.save(job_id, self.source_type, tracker.checkpoint, tracker.take_seen())
 
+        async with AsyncSessionLocal() as session:
+            ingest_service = ReviewIngestService(ReviewRepository(session), session_factory=AsyncSessionLocal)
+            totals = await ingest_service.ingest_review_stream(
+                organization_id=organization_id,
+                source=self.source_type,
+                brand_name=brand_name,
+                batches=batches(),
+                job_id=job_id,
+                on_persisted=on_persisted,
+                on_batch_committed=on_batch_committed,
+                update_existing=self.reparse,
+            )
+        for field in ("received", "inserted", "updated", "duplicates", "near_duplicates"):
+            totals[field] = totals.get(field, 0) + getattr(base, field)
+
+        for country, external_id, review_date in resumed_seen:
+            if country not in watermarks:
+                watermarks[country] = await watermark_store.load(organization_id, self.source_type, brand_name, country)
+            watermarks[country].add(external_id, datetime.fromisoformat(review_date) if review_date else None)
+        for country, watermark in watermarks.items():
+            await watermark_store.save(organization_id, self.source_type, brand_name, country, watermark)
+        return totals
+
+    async def _process_results(self, job_id: str, totals: Dict[str, int], config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process and format the results.
+        """
         return {
-            "reviews_scraped": len(reviews),
+            "reviews_scraped": totals["received"],
+            "reviews_inserted": totals["inserted"],
+            "reviews_updated": totals.get("updated", 0),
+            "reviews_duplicates": totals["duplicates"],
+            "reviews_near_duplicates": totals.get("near_duplicates", 0),
+            "pages_scraped": self.pages_scraped,
+            "resumed_from_page": self.resumed_from_page,
+            "stopped_at_known_page": self.stopped_at_known_page,
+            "pages_from_cache": self.pages_from_cache,
+            "reparse": self.reparse,
+            "rate_limit_waits": self.rate_limit_waits,
+            "rate_limit_wait_seconds": round(self.rate_limit_wait_seconds, 3),
             "source": self.source_type.value,
             "brand_name": config.get("brand_name", "Unknown"),
             "countries": config.get("countries", []),
             "completed_at": datetime.now(timezone.utc).isoformat()
         }
     
+    def _cancelled_result(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Partial result of a cancelled scrape: what was persisted before it stopped.
+        """
+        return {
+            "cancelled": True,
+            "reviews_persisted": self.reviews_persisted,
+            "pages_scraped": self.pages_scraped,
+            "pages_from_cache": self.pages_from_cache,
+            "source": self.source_type.value,
+            "brand_name": config.get("brand_name", "Unknown"),
+            "countries": config.get("countries", []),
+            "cancelled_at": datetime.now(timezone.utc).isoformat()
+        }
+
+    def _failed_result(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Partial result of a failed scrape: what was persisted before the error.
+        """
+        return {
+            "failed": True,
+            "reviews_persisted": self.reviews_persisted,
+            "pages_scraped": self.pages_scraped,
+            "pages_from_cache": self.pages_from_cache,
+            "source": self.source_type.value,
+            "brand_name": config.get("brand_name", "Unknown"),
+            "countries": config.get("countries", []),
+            "failed_at": datetime.now(timezone.utc).isoformat()
+        }
+
     async def validate_config(self, config: Dict[str, Any]) -> bool:
         """
         Validate the configuration for the scraping task.
@@ -140,9 +384,11 @@ class BaseScraper(BaseTask):
 
     
     # --- PLACEHOLDERS
-    def generate_dummy_reviews(self, brand_name: str, countries: list, num_reviews: int) -> List[ReviewData]:
-        """Generate dummy review data for testing"""
-        dummy_reviews = []
+    async def generate_dummy_review_pages(
+        self, brand_name: str, countries: list, num_reviews: int, page_size: Optional[int] = None
+    ) -> AsyncIterator[List[ReviewData]]:
+        """Generate dummy review data for testing, one page at a time"""
+        page_size = page_size or settings.INGEST_PAGE_SIZE
         
         sample_reviews = [
             "Great product! Really satisfied with the quality.",
@@ -157,40 +403,24 @@ class BaseScraper(BaseTask):
             "Good but not exceptional, average product overall."
         ]
         
-        for i in range(min(num_reviews, 50)):  # Limit to 50 for demo
-            country = countries[i % len(countries)] if countries else "US"
-            review = ReviewData(
-                external_id=f"{self.source_type.value}_{uuid.uuid4().hex[:8]}",
-                brand_name=brand_name,
-                country=country,
-                rating=4 + (i % 2),  # Alternate between 4 and 5 stars
-                review_text=sample_reviews[i % len(sample_reviews)],
-                review_date=datetime.now(timezone.utc),
-                source=self.source_type,
-                raw={"scraped_at": datetime.now(timezone.utc).isoformat(), "page": i // 10 + 1}
-            )
-            dummy_reviews.append(review)
-        
-        return dummy_reviews
-    
-    async def _simulate_scraping_progress(self, job_id: str, total_duration: int = 20, progress_steps: int = 10) -> None:
-        """
-        Simulate scraping progress with regular updates.
-        """
-        step_duration = total_duration / progress_steps
-        
-        for step in range(progress_steps + 1):
-            progress_percentage = (step / progress_steps) * 100
-            
-            await ProgressNotifier.notify_task_progress(
-                job_id=job_id,
-                task_name=self.source_type.value,
-                progress_percentage=progress_percentage,
-                step=step,
-                total_steps=progress_steps,
-                additional_data={"source": self.source_type.value}
-            )
-            
-            if step < progress_steps:
-                await asyncio.sleep(step_duration)
-            
\ No newline at end of file
+        # the cursor is the index of the next page to generate
+        first_page = int(self.resume_cursor or 0)
+        for page_start in range(first_page * page_size, num_reviews, page_size):
+            page = []
+            for i in range(page_start, min(page_start + page_size, num_reviews)):
+                country = countries[i % len(countries)] if countries else "US"
+                page.append(ReviewData(
+                    external_id=f"{self.source_type.value}_{uuid.uuid4().hex[:8]}",
+                    brand_name=brand_name,
+                    country=country,
+                    rating=4 + (i % 2),  # Alternate between 4 and 5 stars
+                    review_text=sample_reviews[i % len(sample_reviews)],
+                    review_date=datetime.now(timezone.utc),
+                    source=self.source_type,
+                    raw={"scraped_at": datetime.now(timezone.utc).isoformat(), "page": page_start // page_size + 1}
+                ))
+            # Stand-in for the network round trip of a real page fetch
+            async with self.rate_limited():
+                await asyncio.sleep(0.1)
+            self.page_cursor = str(page_start // page_size + 1)
+            yield page
@@ -2,7 +2,7 @@
 
 
 import asyncio
-from typing import Dict, Any, List
+from typing import Dict, Any, List, AsyncIterator
 
 from app.workers.tasks.scraping.base_scraper import BaseScraper
 from app.domain.types import SourceType
@@ -16,24 +16,23 @@ class TrustpilotScraper(BaseScraper):
     def __init__(self):
         super().__init__("trustpilot_scraper", SourceType.TRUSTPILOT)
     
-    async def _execute_scraping(self, job_id: str, organization_id: int, config: Dict[str, Any]) -> List[ReviewData]:
+    async def _iter_review_batches(self, job_id: str, organization_id: int, config: Dict[str, Any]) -> AsyncIterator[List[ReviewData]]:
         """
-        Execute Trustpilot-specific scraping logic.
+        Execute Trustpilot-specific scraping logic, yielding one page of reviews at a time.
         """
         self.logger.info(f"Starting Trustpilot scraping for job {job_id}")
         
-        # Simulate scraping progress
-        await self._simulate_scraping_progress(job_id)
-        
-    
+        # Generate dummy reviews (replace with actual scraping logic)
         brand_name = config.get("brand_name", "Sample Brand")
         countries = config.get("countries", ["US"])
         num_reviews = config.get("number_of_reviews", 50)
         
-        reviews = self.generate_dummy_reviews(brand_name, countries, num_reviews)
+        scraped = 0
+        async for page in self.generate_dummy_review_pages(brand_name, countries, num_reviews):
+            scraped += len(page)
+            yield page
         
-        self.logger.info(f"Scraped {len(reviews)} Trustpilot reviews for job {job_id}")
-        return reviews
+        self.logger.info(f"Scraped {scraped} Trustpilot reviews for job {job_id}")
     
     async def validate_config(self, config: Dict[str, Any]) -> bool:
         """
@@ -0,0 +1,216 @@
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from arq.constants import in_progress_key_prefix
+
+from app.core.config import settings
+from app.workers.metrics import (
+    TASK_COUNTERS,
+    TASK_COUNTERS_KEY,
+    TASK_RUNTIME_KEY_PREFIX,
+    get_queue_wait_stats,
+    parse_counter_field,
+    percentile,
+    rate_bucket_key,
+    read_in_progress,
+)
+from app.workers.queue import QUEUES
+
+logger = logging.getLogger(__name__)
+
+try:
+    import prometheus_client
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+except ImportError:  # optional: the `monitoring` extra; only the Prometheus exposition needs it
+    prometheus_client = None
+
+# upper bound on the queue head inspected when looking for the oldest job no worker has taken yet
+OLDEST_SCAN_LIMIT = 500
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def _empty_counts() -> Dict[str, int]:
+    return {**{counter: 0 for counter in TASK_COUNTERS}, "in_progress": 0}
+
+
+async def _read_counters(redis) -> Dict[Tuple[str, str], Dict[str, int]]:
+    counts: Dict[Tuple[str, str], Dict[str, int]] = {}
+    for field, value in (await redis.hgetall(TASK_COUNTERS_KEY)).items():
+        parsed = parse_counter_field(_text(field))
+        if parsed is None:
+            continue
+        queue_name, task_name, counter = parsed
+        if counter not in TASK_COUNTERS:
+            continue
+        counts.setdefault((queue_name, task_name), _empty_counts())[counter] = int(value)
+    return counts
+
+
+async def _read_rates(redis, now: float) -> Dict[Tuple[str, str], Dict[str, float]]:
+    """Per-minute completion/failure rates over the last TASK_RATE_WINDOW_MINUTES full minutes."""
+    window = max(1, settings.TASK_RATE_WINDOW_MINUTES)
+    async with redis.pipeline(transaction=False) as pipe:
+        for minutes_ago in range(1, window + 1):
+            pipe.hgetall(rate_bucket_key(now - minutes_ago * 60))
+        buckets = await pipe.execute()
+
+    rates: Dict[Tuple[str, str], Dict[str, float]] = {}
+    for bucket in buckets:
+        for field, value in (bucket or {}).items():
+            parsed = parse_counter_field(_text(field))
+            if parsed is None:
+                continue
+            queue_name, task_name, outcome = parsed
+            entry = rates.setdefault((queue_name, task_name), {"completed": 0.0, "failed": 0.0})
+            entry[outcome] = entry.get(outcome, 0.0) + int(value) / window
+    return rates
+
+
+async def _oldest_queued_age(redis, queue_name: str, in_progress: int, now_ms: int) -> Optional[float]:
+    """
+    ARQ keeps a job in its queue's sorted set while it runs, so the head of the set may be jobs
+    already taken by a worker. Inspects at most the first `in_progress + 1` runnable entries and
+    skips those with an in-progress key.
+    """
+    limit = min(max(in_progress, 0) + 1, OLDEST_SCAN_LIMIT)
+    head = await redis.zrangebyscore(queue_name, "-inf", now_ms, start=0, num=limit, withscores=True)
+    if not head:
+        return None
+    async with redis.pipeline(transaction=False) as pipe:
+        for job_id, _ in head:
+            pipe.exists(in_progress_key_prefix + _text(job_id))
+        running = await pipe.execute()
+    for (_, score), is_running in zip(head, running):
+        if not is_running:
+            return round(max(0, now_ms - int(score)) / 1000, 3)
+    return None
+
+
+async def collect_worker_telemetry(redis, queues: Iterable[str] = QUEUES, now: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Snapshot of every ARQ queue and task for autoscaling decisions. Queue depth and the oldest
+    queued job come from ARQ's own sorted sets (ZCOUNT plus a bounded look at the head), running jobs
+    from the heartbeated entries and everything else from the counters kept by the track_task wrapper,
+    so the cost does not grow with the backlog.
+    """
+    now = now if now is not None else time.time()
+    now_ms = int(now * 1000)
+    counts = await _read_counters(redis)
+    for key, running in (await read_in_progress(redis, now)).items():
+        counts.setdefault(key, _empty_counts())["in_progress"] = running
+    rates = await _read_rates(redis, now)
+
+    queues_report: Dict[str, Dict[str, Any]] = {}
+    for queue_name in dict.fromkeys([*queues, *(queue for queue, _ in counts)]):
+        in_progress = sum(c["in_progress"] for (queue, _), c in counts.items() if queue == queue_name)
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zcount(queue_name, "-inf", now_ms)
+            pipe.zcount(queue_name, f"({now_ms}", "+inf")
+            runnable, deferred = await pipe.execute()
+        queue_rates = [r for (queue, _), r in rates.items() if queue == queue_name]
+        queues_report[queue_name] = {
+            "depth": max(0, int(runnable) - in_progress),
+            "deferred": int(deferred),
+            "oldest_queued_age_seconds": await _oldest_queued_age(redis, queue_name, in_progress, now_ms),
+            "in_progress": in_progress,
+            "completed_per_minute": round(sum(r["completed"] for r in queue_rates), 3),
+            "failed_per_minute": round(sum(r["failed"] for r in queue_rates), 3),
+            "queue_wait": await get_queue_wait_stats(redis, queue_name),
+        }
+
+    task_names = sorted({task for _, task in counts} | {task for _, task in rates})
+    async with redis.pipeline(transaction=False) as pipe:
+        for task_name in task_names:
+            pipe.lrange(TASK_RUNTIME_KEY_PREFIX + task_name, 0, -1)
+        runtimes = await pipe.execute() if task_names else []
+
+    tasks_report: Dict[str, Dict[str, Any]] = {}
+    for task_name, raw_runtimes in zip(task_names, runtimes):
+        totals = _empty_counts()
+        task_queues = []
+        for (queue_name, task), c in counts.items():
+            if task == task_name:
+                task_queues.append(queue_name)
+                for counter, value in c.items():
+                    totals[counter] += value
+        task_rates = [r for (_, task), r in rates.items() if task == task_name]
+        samples = sorted(int(value) for value in raw_runtimes or [])
+        tasks_report[task_name] = {
+            "queues": sorted(task_queues),
+            **totals,
+            "completed_per_minute": round(sum(r["completed"] for r in task_rates), 3),
+            "failed_per_minute": round(sum(r["failed"] for r in task_rates), 3),
+            "runtime_samples": len(samples),
+            "runtime_p50_ms": percentile(samples, 0.5),
+            "runtime_p95_ms": percentile(samples, 0.95),
+        }
+
+    return {
+        "generated_at": datetime.fromtimestamp(now, tz=timezone.utc).isoformat(),
+        "rate_window_minutes": settings.TASK_RATE_WINDOW_MINUTES,
+        "queues": queues_report,
+        "tasks": tasks_report,
+    }
+
+
+class _TelemetryCollector:
+    """Exposes one telemetry snapshot through a throwaway prometheus_client registry."""
+
+    def __init__(self, telemetry: Dict[str, Any]):
+        self.telemetry = telemetry
+
+    def collect(self):
+        queue_gauges = {
+            "depth": GaugeMetricFamily("arq_queue_depth", "Runnable jobs not yet taken by a worker", labels=["queue"]),
+            "deferred": GaugeMetricFamily("arq_queue_deferred_jobs", "Jobs scheduled for later", labels=["queue"]),
+            "oldest_queued_age_seconds": GaugeMetricFamily(
+                "arq_queue_oldest_job_age_seconds", "Age of the oldest runnable job not yet taken", labels=["queue"]
+            ),
+            "in_progress": GaugeMetricFamily("arq_queue_in_progress_jobs", "Jobs currently running", labels=["queue"]),
+        }
+        queue_wait = GaugeMetricFamily(
+            "arq_queue_wait_milliseconds", "Recent queue wait percentiles", labels=["queue", "quantile"]
+        )
+        for queue_name, stats in self.telemetry["queues"].items():
+            for field, gauge in queue_gauges.items():
+                if stats[field] is not None:
+                    gauge.add_metric([queue_name], stats[field])
+            for quantile, field in (("0.5", "p50_ms"), ("0.95", "p95_ms")):
+                if stats["queue_wait"][field] is not None:
+                    queue_wait.add_metric([queue_name, quantile], stats["queue_wait"][field])
+        yield from queue_gauges.values()
+        yield queue_wait
+
+        started = CounterMetricFamily("arq_task_started", "Task runs started", labels=["task"])
+        completed = CounterMetricFamily("arq_task_completed", "Task runs completed", labels=["task"])
+        failed = CounterMetricFamily("arq_task_failed", "Task runs failed or cancelled", labels=["task"])
+        in_progress = GaugeMetricFamily("arq_task_in_progress_jobs", "Task runs in progress", labels=["task"])
+        runtime = GaugeMetricFamily(
+            "arq_task_runtime_milliseconds", "Recent task run time percentiles", labels=["task", "quantile"]
+        )
+        for task_name, stats in self.telemetry["tasks"].items():
+            started.add_metric([task_name], stats["started"])
+            completed.add_metric([task_name], stats["completed"])
+            failed.add_metric([task_name], stats["failed"])
+            in_progress.add_metric([task_name], stats["in_progress"])
+            for quantile, field in (("0.5", "runtime_p50_ms"), ("0.95", "runtime_p95_ms")):
+                if stats[field] is not None:
+                    runtime.add_metric([task_name, quantile], stats[field])
+        yield from (started, completed, failed, in_progress, runtime)
+
+
+def render_prometheus(telemetry: Dict[str, Any]) -> Tuple[bytes, str]:
+    """
+    Prometheus text exposition of a telemetry snapshot, with its content type. Rates are left to
+    PromQL (`rate(arq_task_completed_total[5m])`). Raises RuntimeError without prometheus-client.
+    """
+    if prometheus_client is None:
+        raise RuntimeError("prometheus-client is not installed (install the `monitoring` extra)")
+    registry = prometheus_client.CollectorRegistry(auto_describe=False)
+    registry.register(_TelemetryCollector(telemetry))
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
@@ -0,0 +1,102 @@
+"""
+Benchmark the review ingest paths against a real database.
+
+Compares ReviewRepository.bulk_insert_reviews (multi-row INSERT ... VALUES) with
+ReviewRepository.copy_insert_reviews (COPY into staging + INSERT ... SELECT merge).
+
+Usage:
+    python -m scripts.bench_review_ingest            # 10k, 100k and 1M rows
+    python -m scripts.bench_review_ingest 10000      # custom sizes
+"""
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+
+from sqlalchemy import delete
+
+from app.db.session import engine, AsyncSessionLocal
+from app.db.base import Base
+import app.models  # noqa: ensure models are registered
+from app.models import Organization, User, Review
+from app.repositories.job_repo import JobRepository
+from app.repositories.review_repo import ReviewRepository
+from app.core.security import hash_password
+from app.domain.types import JobType, SourceType
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def make_reviews(n: int, organization_id: int, job_id: str) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "organization_id": organization_id,
+            "job_id": job_id,
+            "source": SourceType.TRUSTPILOT,
+            "external_id": f"bench_{uuid.uuid4().hex}",
+            "brand_name": "Bench Brand",
+            "country": "ES" if i % 2 else "US",
+            "rating": 1 + i % 5,
+            "review_text": f"Synthetic benchmark review number {i}",
+            "review_date": now - timedelta(minutes=i),
+            "raw": {"i": i},
+        }
+        for i in range(n)
+    ]
+
+
+async def setup_fixture() -> tuple[int, str]:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as session:
+        org = Organization(name=f"Bench Org {uuid.uuid4().hex[:6]}")
+        session.add(org)
+        await session.flush()
+        user = User(
+            name="Bench User",
+            email=f"bench-{uuid.uuid4().hex[:8]}@example.com",
+            hashed_password=hash_password("BenchPassword1!"),
+            organization_id=org.id,
+            is_active=True,
+            is_verified=True,
+        )
+        session.add(user)
+        await session.commit()
+        job_id = str(uuid.uuid4())
+        await JobRepository(session).create_job(
+            job_id=job_id, user_id=user.id, organization_id=org.id,
+            job_type=JobType.REVIEW_SCRAPING, target_id=org.id,
+        )
+        return org.id, job_id
+
+
+async def run_path(name: str, rows: list[dict], job_id: str) -> float:
+    async with AsyncSessionLocal() as session:
+        repo = ReviewRepository(session)
+        started = time.perf_counter()
+        if name == "insert_values":
+            await repo.bulk_insert_reviews(rows)
+        else:
+            await repo.copy_insert_reviews(rows)
+        elapsed = time.perf_counter() - started
+
+        await session.execute(delete(Review).where(Review.job_id == job_id))
+        await session.commit()
+    return elapsed
+
+
+async def main(sizes: list[int]) -> None:
+    organization_id, job_id = await setup_fixture()
+    print(f"{'rows':>10} {'path':>14} {'seconds':>10} {'rows/s':>12}")
+    for n in sizes:
+        for path in ("insert_values", "copy_merge"):
+            rows = make_reviews(n, organization_id, job_id)
+            elapsed = await run_path(path, rows, job_id)
+            print(f"{n:>10} {path:>14} {elapsed:>10.2f} {n / elapsed:>12,.0f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES))
@@ -0,0 +1,128 @@
+"""
+Recall/latency benchmark for HNSW similarity search on a synthetic table.
+
+Builds `bench_review_vectors` (organization_id, embedding) with random vectors generated
+server-side, indexes it the same way as `reviews` (a global HNSW index plus a partial HNSW index
+for one large organization), then compares, for several hnsw.ef_search values:
+
+    global   - global index, organization filter applied while walking the graph (post-filter)
+    partial  - the organization's own partial index (pre-filter)
+
+Recall@k is measured against an exact sequential scan of the same organization.
+
+Usage:
+    python -m scripts.bench_review_search                       # 1M rows, 1536 dims
+    python -m scripts.bench_review_search --rows 100000 --dim 384
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+
+from app.db.session import engine
+from app.models.review import HNSW_M, HNSW_EF_CONSTRUCTION
+
+TABLE = "bench_review_vectors"
+EF_SEARCH_VALUES = [10, 20, 40, 80, 160, 320]
+
+
+async def build_table(rows: int, dim: int, orgs: int) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        await conn.execute(text(
+            f"CREATE TABLE {TABLE} (id bigserial PRIMARY KEY, organization_id int NOT NULL, embedding vector({dim}) NOT NULL)"
+        ))
+        # Organization 0 owns half of the rows, the rest is spread over the other tenants
+        started = time.perf_counter()
+        await conn.execute(text(
+            f"INSERT INTO {TABLE} (organization_id, embedding) "
+            f"SELECT CASE WHEN g % 2 = 0 THEN 0 ELSE 1 + g % {max(orgs - 1, 1)} END, "
+            f"(SELECT array_agg(random() - 0.5 + g * 0) FROM generate_series(1, {dim}))::vector "
+            f"FROM generate_series(1, {rows}) g"
+        ))
+        print(f"loaded {rows:,} rows in {time.perf_counter() - started:.1f}s")
+
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text(f"CREATE INDEX ON {TABLE} (organization_id)"))
+        for name, where in (("global", ""), ("org_0", "WHERE organization_id = 0")):
+            started = time.perf_counter()
+            await conn.execute(text(
+                f"CREATE INDEX {TABLE}_hnsw_{name} ON {TABLE} USING hnsw (embedding vector_cosine_ops) "
+                f"WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION}) {where}"
+            ))
+            print(f"built {name} HNSW index in {time.perf_counter() - started:.1f}s")
+        await conn.execute(text(f"ANALYZE {TABLE}"))
+
+
+async def sample_queries(count: int) -> list[str]:
+    async with engine.connect() as conn:
+        result = await conn.execute(text(
+            f"SELECT embedding::text FROM {TABLE} WHERE organization_id = 0 ORDER BY random() LIMIT {count}"
+        ))
+        return [row[0] for row in result]
+
+
+async def knn(conn, query: str, k: int, exact: bool = False) -> list[int]:
+    """Runs one search inside the caller's transaction and returns the ids in distance order."""
+    if exact:
+        await conn.execute(text("SET LOCAL enable_indexscan = off"))
+    result = await conn.execute(
+        text(f"SELECT id FROM {TABLE} WHERE organization_id = 0 ORDER BY embedding <=> CAST(:q AS vector) LIMIT {k}"),
+        {"q": query},
+    )
+    return [row[0] for row in result]
+
+
+async def run_mode(queries: list[str], truth: list[set], k: int, mode: str, ef_search: int) -> tuple[float, float, float]:
+    latencies, recalls = [], []
+    for query, expected in zip(queries, truth):
+        async with engine.connect() as conn:
+            async with conn.begin() as transaction:
+                await conn.execute(text(f"SET LOCAL hnsw.ef_search = {ef_search}"))
+                if mode == "global":
+                    # transactional DDL: the partial index is invisible to this query and restored on rollback
+                    await conn.execute(text(f"DROP INDEX {TABLE}_hnsw_org_0"))
+                started = time.perf_counter()
+                ids = await knn(conn, query, k)
+                latencies.append((time.perf_counter() - started) * 1000)
+                await transaction.rollback()
+        recalls.append(len(expected.intersection(ids)) / k)
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return statistics.mean(recalls), statistics.median(latencies), p95
+
+
+async def main(args: argparse.Namespace) -> None:
+    if not args.skip_build:
+        await build_table(args.rows, args.dim, args.orgs)
+
+    queries = await sample_queries(args.queries)
+    truth = []
+    for query in queries:
+        async with engine.begin() as conn:
+            truth.append(set(await knn(conn, query, args.k, exact=True)))
+
+    print(f"{'index':>8} {'ef_search':>10} {'recall@' + str(args.k):>10} {'p50 ms':>8} {'p95 ms':>8}")
+    for mode in ("global", "partial"):
+        for ef_search in EF_SEARCH_VALUES:
+            if ef_search < args.k:
+                continue
+            recall, p50, p95 = await run_mode(queries, truth, args.k, mode, ef_search)
+            print(f"{mode:>8} {ef_search:>10} {recall:>10.3f} {p50:>8.2f} {p95:>8.2f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--orgs", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--skip-build", action="store_true", help="reuse an existing benchmark table")
+    asyncio.run(main(parser.parse_args()))
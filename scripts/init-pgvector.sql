@@ -1,6 +1,9 @@
 -- Enable pgvector extension
 CREATE EXTENSION IF NOT EXISTS vector;
 
+-- Trigram indexes for user search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Verify the extension was created successfully
 DO $$
 BEGIN
@@ -123,11 +123,176 @@ async def test_redis():
         mock_redis.aclose.return_value = None
         yield mock_redis
 
+@pytest_asyncio.fixture
+async def live_redis(test_redis):
+    """The test Redis itself, for what FakeRedis cannot show (Lua scripts, SET NX, expiries); skipped without a server."""
+    if not isinstance(test_redis, redis.Redis):
+        pytest.skip("needs a reachable Redis server")
+    return test_redis
+
+
+class FakePipeline:
+    """Queues commands and runs them on its FakeRedis at execute(), like a MULTI/EXEC pipeline."""
+
+    def __init__(self, fake_redis: "FakeRedis"):
+        self.redis = fake_redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        method = getattr(self.redis, name)
+
+        def queue(*args, **kwargs):
+            self.commands.append((method, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        commands, self.commands = self.commands, []
+        return [await method(*args, **kwargs) for method, args, kwargs in commands]
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for a redis.asyncio client (decode_responses=True), covering the plain commands
+    of the stores, metrics and coalescer. Expiries are recorded in `ttls` but never enforced.
+    """
+
+    def __init__(self):
+        self.values, self.hashes, self.lists, self.sets, self.zsets, self.ttls = {}, {}, {}, {}, {}, {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def _containers(self):
+        return (self.values, self.hashes, self.lists, self.sets, self.zsets)
+
+    async def exists(self, *keys):
+        return sum(1 for key in keys if any(key in container for container in self._containers()))
+
+    async def delete(self, *keys):
+        deleted = await self.exists(*keys)
+        for key in keys:
+            for container in self._containers():
+                container.pop(key, None)
+        return deleted
+
+    async def expire(self, key, seconds):
+        self.ttls[key] = seconds
+        return bool(await self.exists(key))
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        self.ttls[key] = px / 1000 if px is not None else ex
+        return True
+
+    async def hset(self, key, field=None, value=None, mapping=None):
+        bucket = self.hashes.setdefault(key, {})
+        bucket.update({**({field: value} if field is not None else {}), **(mapping or {})})
+
+    async def hgetall(self, key):
+        return {field: str(value) for field, value in self.hashes.get(key, {}).items()}
+
+    async def hincrby(self, key, field, amount=1):
+        bucket = self.hashes.setdefault(key, {})
+        bucket[field] = int(bucket.get(field, 0)) + amount
+        return bucket[field]
+
+    async def lpush(self, key, *values):
+        for value in values:
+            self.lists.setdefault(key, []).insert(0, str(value))
+
+    async def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(str(value) for value in values)
+
+    async def ltrim(self, key, start, stop):
+        self.lists[key] = self.lists.get(key, [])[start:(stop + 1) or None]
+
+    async def lrange(self, key, start, stop):
+        return self.lists.get(key, [])[start:(stop + 1) or None]
+
+    async def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(str(member) for member in members)
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    async def sismember(self, key, member):
+        return str(member) in self.sets.get(key, set())
+
+    async def zadd(self, key, mapping, xx=False):
+        zset = self.zsets.setdefault(key, {})
+        for member, score in mapping.items():
+            if not xx or member in zset:
+                zset[member] = score
+
+    async def zrem(self, key, *members):
+        for member in members:
+            self.zsets.get(key, {}).pop(member, None)
+
+    async def zcount(self, key, low, high):
+        return len([score for score in self.zsets.get(key, {}).values() if self._in_range(score, low, high)])
+
+    async def zrangebyscore(self, key, low, high, start=0, num=None, withscores=False):
+        items = sorted(
+            ((member, score) for member, score in self.zsets.get(key, {}).items() if self._in_range(score, low, high)),
+            key=lambda item: item[1],
+        )[start:start + num if num is not None else None]
+        return [(member, float(score)) if withscores else member for member, score in items]
+
+    async def zremrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        for member in [member for member, score in zset.items() if self._in_range(score, low, high)]:
+            del zset[member]
+
+    @staticmethod
+    def _in_range(score, low, high):
+        def bound(value):
+            text = str(value)
+            return float(text.lstrip("(")), text.startswith("(")
+        (lo, lo_open), (hi, hi_open) = bound(low), bound(high)
+        return (score > lo if lo_open else score >= lo) and (score < hi if hi_open else score <= hi)
+
+
+class FakeSession:
+    """Session for code whose repositories are faked: it is only ever entered and exited."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    """In-memory Redis stand-in, see FakeRedis."""
+    return FakeRedis()
+
+@pytest.fixture
+def fake_session_factory():
+    """Session factory (AsyncSessionLocal stand-in) making FakeSessions."""
+    return FakeSession
+
 @pytest_asyncio.fixture
 async def client(db_session, test_redis) -> AsyncGenerator[AsyncClient, None]:
     """Create test HTTP client."""
     # Ensure app routes use the per-test DB session (NullPool) and test Redis
     app.dependency_overrides[deps.get_db] = lambda: db_session
+    app.dependency_overrides[deps.get_read_db] = lambda: db_session
     # Optional: keep for backward-compat if anything still calls get_session
     app.dependency_overrides[get_session] = lambda: db_session
     app.dependency_overrides[get_redis_client] = lambda: test_redis
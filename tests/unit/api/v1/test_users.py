@@ -7,6 +7,7 @@ from app.models.user import User
 from app.models.organization import Organization
 from app.domain.types import Role
 from tests.utils.factories import UserFactory, OrganizationFactory
+from tests.utils.helpers import assert_query_budget
 
 
 class TestUserEndpoints:
@@ -26,6 +27,17 @@ class TestUserEndpoints:
         assert result["name"] == test_user.name
         assert result["organization_name"] == test_user.organization.name
 
+    async def test_get_current_user_profile_query_budget(
+        self,
+        authenticated_client: AsyncClient,
+        test_user: User
+    ):
+        """The profile endpoint loads the user and its organization without N+1 queries."""
+        with assert_query_budget(6):
+            response = await authenticated_client.get("/api/v1/users/me")
+        assert response.status_code == 200
+        assert "db;dur=" in response.headers["server-timing"]
+
     async def test_update_current_user_profile(
         self, 
         authenticated_client: AsyncClient,
@@ -352,3 +364,20 @@ class TestUserEndpoints:
             f"/api/v1/users/organization/{other_org.id}"
         )
         assert response.status_code == 403
+
+    async def test_list_users_ranked_search(
+        self,
+        admin_authenticated_client: AsyncClient,
+        test_user: User,
+    ):
+        """Ranked mode returns a cursor page and rejects queries below the minimum length."""
+        response = await admin_authenticated_client.get(
+            "/api/v1/users/", params={"query": test_user.email, "ranked": "true", "limit": 10}
+        )
+        assert response.status_code == 200
+        result = response.json()
+        assert result["items"][0]["id"] == test_user.id
+        assert "next_cursor" in result
+
+        response = await admin_authenticated_client.get("/api/v1/users/", params={"query": "ab", "ranked": "true"})
+        assert response.status_code == 400
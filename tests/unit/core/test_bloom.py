@@ -0,0 +1,48 @@
+"""Test the Bloom filter used for scrape watermarks."""
+import pytest
+
+from app.core.bloom import BloomFilter
+
+
+class TestBloomFilter:
+    def test_added_items_are_always_found(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        ids = [f"trustpilot_{i}" for i in range(1000)]
+        for external_id in ids:
+            bloom.add(external_id)
+
+        assert all(external_id in bloom for external_id in ids)
+        assert bloom.count == 1000
+        assert not bloom.saturated
+
+    def test_false_positive_rate_near_target(self):
+        bloom = BloomFilter(capacity=2000, error_rate=0.01)
+        for i in range(2000):
+            bloom.add(f"known_{i}")
+
+        false_positives = sum(f"unknown_{i}" in bloom for i in range(10_000))
+        assert false_positives / 10_000 < 0.02
+
+    def test_round_trip_bytes(self):
+        bloom = BloomFilter(capacity=100, error_rate=0.001)
+        bloom.add("abc")
+
+        restored = BloomFilter.from_bytes(bloom.to_bytes(), 100, 0.001, bits=bloom.size, hashes=bloom.hashes, count=1)
+        assert "abc" in restored
+        assert "abd" not in restored
+
+        with pytest.raises(ValueError):
+            BloomFilter.from_bytes(b"\x00", 100, 0.001, bits=bloom.size, hashes=bloom.hashes)
+
+    def test_union(self):
+        a, b = BloomFilter(capacity=500), BloomFilter(capacity=500)
+        for i in range(100):
+            a.add(f"a_{i}")
+            b.add(f"b_{i}")
+
+        a.union(b)
+        assert all(f"a_{i}" in a and f"b_{i}" in a for i in range(100))
+        assert 190 <= a.count <= 210
+
+        with pytest.raises(ValueError):
+            a.union(BloomFilter(capacity=10))
@@ -0,0 +1,42 @@
+"""Test keyset pagination cursors."""
+import pytest
+from datetime import datetime, timezone
+
+from app.core.pagination import encode_cursor, decode_cursor
+
+
+class TestPaginationCursor:
+    """Test opaque cursor encoding."""
+
+    def test_round_trip_preserves_values(self):
+        """Datetimes and raw values survive an encode/decode round trip."""
+        created_at = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        cursor = encode_cursor(created_at, "7f0c5d9e-0000-4000-8000-000000000000")
+
+        assert decode_cursor(cursor, expected_len=2) == [created_at, "7f0c5d9e-0000-4000-8000-000000000000"]
+
+    def test_cursor_is_url_safe(self):
+        """Cursors can be passed as query params without escaping."""
+        cursor = encode_cursor(datetime.now(timezone.utc), 12345)
+        assert all(c.isalnum() or c in "-_" for c in cursor)
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "", "e30"])
+    def test_malformed_cursor_raises_value_error(self, cursor: str):
+        """Garbage input is rejected with ValueError."""
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, expected_len=2)
+
+    def test_wrong_arity_raises_value_error(self):
+        """A cursor for a different keyset is rejected."""
+        with pytest.raises(ValueError):
+            decode_cursor(encode_cursor(1, 2, 3), expected_len=2)
+
+    @pytest.mark.parametrize("values", [("x", 1), (datetime.now(timezone.utc), 1), (True, "id")])
+    def test_wrong_value_types_raise_value_error(self, values):
+        """Crafted cursors with values of the wrong type never reach the keyset comparison."""
+        with pytest.raises(ValueError):
+            decode_cursor(encode_cursor(*values), expected_len=2, types=(datetime, str))
+
+    def test_type_alternatives(self):
+        """A tuple of types accepts any of them."""
+        assert decode_cursor(encode_cursor(1, 7), expected_len=2, types=((int, float), int)) == [1, 7]
@@ -0,0 +1,81 @@
+"""Test per-request and per-task query instrumentation."""
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from app.core.middleware import QueryTimingMiddleware
+from app.db.instrumentation import install_query_instrumentation, instrument_task, track_queries
+
+install_query_instrumentation()
+engine = create_engine("sqlite://")
+
+
+def _run_queries(count: int) -> None:
+    with engine.connect() as conn:
+        for _ in range(count):
+            conn.execute(text("SELECT 1"))
+
+
+class TestTrackQueries:
+    """Test statement counting scopes."""
+
+    def test_counts_statements_in_scope_only(self):
+        _run_queries(2)
+        with track_queries() as stats:
+            _run_queries(3)
+        _run_queries(1)
+
+        assert stats.count == 3
+        assert stats.duration > 0
+
+    def test_nested_scopes_roll_up(self):
+        with track_queries() as outer:
+            _run_queries(1)
+            with track_queries() as inner:
+                _run_queries(2)
+
+        assert inner.count == 2
+        assert outer.count == 3
+
+    def test_failed_statements_are_counted(self):
+        with track_queries() as stats:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT * FROM missing_table"))
+            except Exception:
+                pass
+            _run_queries(1)
+
+        assert stats.count == 2
+
+    async def test_instrument_task_keeps_name_and_counts(self):
+        async def sample_task(ctx, rows):
+            _run_queries(rows)
+            return rows
+
+        wrapped = instrument_task(sample_task)
+        with track_queries() as stats:
+            assert await wrapped({"job_id": "abc"}, 4) == 4
+
+        assert wrapped.__name__ == "sample_task"
+        assert stats.count == 4
+
+
+class TestQueryTimingMiddleware:
+    """Test the Server-Timing header."""
+
+    async def test_server_timing_header_reports_queries(self):
+        app = FastAPI()
+        app.add_middleware(QueryTimingMiddleware)
+
+        @app.get("/ping")
+        async def ping():
+            _run_queries(2)
+            return {"ok": True}
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/ping")
+
+        assert response.status_code == 200
+        assert response.headers["server-timing"].startswith("db;dur=")
+        assert 'desc="2 queries"' in response.headers["server-timing"]
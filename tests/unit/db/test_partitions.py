@@ -0,0 +1,145 @@
+"""Test review partitioning helpers."""
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.db import partitions
+from app.db.partitions import (
+    add_months,
+    hash_partition_name,
+    month_partition_name,
+    month_start,
+    organization_embedding_index_ddl,
+    pending_review_months,
+    review_partition_ddl,
+)
+
+
+class FakeResult:
+    def __init__(self, value=None, rows=()):
+        self.value, self.rows, self.rowcount = value, list(rows), 2
+
+    def scalar_one(self):
+        return self.value
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class FakeConnection:
+    """Records DDL; `stranded` says whether the DEFAULT partition holds rows of the new month."""
+
+    def __init__(self, stranded, indexed_organizations=()):
+        self.stranded = stranded
+        self.indexed_organizations = indexed_organizations
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if sql.startswith("SELECT to_regclass"):
+            return FakeResult(False)
+        if sql.startswith("SELECT EXISTS"):
+            return FakeResult(self.stranded)
+        if "FROM pg_indexes" in sql:
+            return FakeResult(rows=[(org,) for org in self.indexed_organizations])
+        if not sql.startswith("SELECT pg_advisory"):
+            self.statements.append(sql)
+        return FakeResult()
+
+
+class TestPartitionNaming:
+    """Test partition names and month arithmetic."""
+
+    def test_names_are_zero_padded(self):
+        assert hash_partition_name(3) == "reviews_p03"
+        assert month_partition_name(3, date(2025, 2, 1)) == "reviews_p03_202502"
+
+    def test_month_arithmetic_wraps_years(self):
+        assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+        assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+
+    def test_month_start_uses_utc(self):
+        """An aware timestamp is bucketed by its UTC month."""
+        late_local = datetime.fromisoformat("2025-03-01T00:30:00+02:00")
+        assert month_start(late_local) == date(2025, 2, 1)
+        assert month_start(datetime(2025, 3, 15, tzinfo=timezone.utc)) == date(2025, 3, 1)
+
+
+class TestPartitionDDL:
+    """Test generated partition DDL."""
+
+    def test_hash_partitions_only(self, monkeypatch):
+        monkeypatch.setattr(settings, "REVIEWS_HASH_PARTITIONS", 4)
+        monkeypatch.setattr(settings, "REVIEWS_MONTHLY_PARTITIONS", False)
+
+        ddl = review_partition_ddl()
+
+        assert len(ddl) == 4
+        assert ddl[1] == "CREATE TABLE IF NOT EXISTS reviews_p01 PARTITION OF reviews FOR VALUES WITH (MODULUS 4, REMAINDER 1)"
+        assert pending_review_months([datetime.now(timezone.utc)]) == set()
+
+    def test_monthly_subpartitions(self, monkeypatch):
+        monkeypatch.setattr(settings, "REVIEWS_HASH_PARTITIONS", 2)
+        monkeypatch.setattr(settings, "REVIEWS_MONTHLY_PARTITIONS", True)
+        monkeypatch.setattr(partitions, "_known_months", {date(2025, 1, 1)})
+
+        ddl = review_partition_ddl()
+
+        assert ddl[0].endswith("PARTITION BY RANGE (review_date)")
+        assert ddl[1] == "CREATE TABLE IF NOT EXISTS reviews_p00_default PARTITION OF reviews_p00 DEFAULT"
+        assert pending_review_months(
+            [datetime(2025, 1, 9, tzinfo=timezone.utc), datetime(2025, 2, 9, tzinfo=timezone.utc), None]
+        ) == {date(2025, 2, 1)}
+
+
+class TestMonthPartitionCreation:
+    """Test creating month partitions next to a DEFAULT partition."""
+
+    @pytest.fixture(autouse=True)
+    def monthly(self, monkeypatch):
+        monkeypatch.setattr(settings, "REVIEWS_HASH_PARTITIONS", 1)
+        monkeypatch.setattr(settings, "REVIEWS_MONTHLY_PARTITIONS", True)
+        monkeypatch.setattr(partitions, "_known_months", set())
+
+    async def test_plain_create_when_default_has_no_rows_of_the_month(self):
+        conn = FakeConnection(stranded=False)
+
+        created = await partitions.ensure_review_month_partitions(conn, [date(2025, 2, 1)])
+
+        assert created == ["reviews_p00_202502"]
+        assert conn.statements == [
+            "CREATE TABLE reviews_p00_202502 PARTITION OF reviews_p00 "
+            "FOR VALUES FROM ('2025-02-01 00:00:00+00') TO ('2025-03-01 00:00:00+00')"
+        ]
+
+    async def test_rows_in_default_are_moved_into_the_new_month(self):
+        conn = FakeConnection(stranded=True)
+
+        await partitions.ensure_review_month_partitions(conn, [date(2025, 2, 1)])
+
+        assert [statement.split(" (")[0] for statement in conn.statements] == [
+            "ALTER TABLE reviews_p00 DETACH PARTITION reviews_p00_default",
+            "CREATE TABLE reviews_p00_202502 PARTITION OF reviews_p00 FOR VALUES FROM",
+            "WITH moved AS",
+            "ALTER TABLE reviews_p00 ATTACH PARTITION reviews_p00_default DEFAULT",
+        ]
+
+    async def test_new_month_gets_existing_organization_indexes(self):
+        conn = FakeConnection(stranded=False, indexed_organizations=[7])
+
+        await partitions.ensure_review_month_partitions(conn, [date(2025, 2, 1)])
+
+        assert conn.statements[-1] == organization_embedding_index_ddl("reviews_p00_202502", 7)
+        assert "reviews_p00_202502_embedding_hnsw_org_7 ON reviews_p00_202502" in conn.statements[-1]
+        assert "CONCURRENTLY" not in conn.statements[-1]
+
+    async def test_months_are_cached_only_once_recorded(self):
+        conn = FakeConnection(stranded=False)
+
+        await partitions.ensure_review_month_partitions(conn, [date(2025, 2, 1)])
+        # the DDL transaction may still roll back
+        assert partitions.pending_review_months([date(2025, 2, 9)]) == {date(2025, 2, 1)}
+
+        partitions.record_review_months([date(2025, 2, 9)])
+        assert partitions.pending_review_months([date(2025, 2, 9)]) == set()
@@ -0,0 +1,83 @@
+"""Test archetype repository."""
+import uuid
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import User
+from app.repositories.archetype_repo import ArchetypeRepository
+from app.repositories.job_repo import JobRepository
+from app.domain.types import JobType
+
+
+def _archetype(name: str) -> dict:
+    return {
+        "name": name,
+        "description": f"{name} description",
+        "pain_points": ["price"],
+        "fears_and_concerns": ["quality"],
+        "objections": ["too expensive"],
+        "goals_and_objectives": ["save time"],
+        "expected_benefits": ["convenience"],
+        "values": ["trust"],
+        "influence_factors": ["reviews"],
+        "social_behavior": "Reads reviews before buying",
+        "internal_narrative": "I want something that just works",
+    }
+
+
+class TestArchetypeRepositoryBulkCreate:
+    """Test batched archetype persistence."""
+
+    @pytest.fixture
+    def archetype_repo(self, db_session: AsyncSession) -> ArchetypeRepository:
+        return ArchetypeRepository(db_session)
+
+    @pytest.fixture
+    async def job_id(self, db_session: AsyncSession, test_user: User) -> str:
+        job_id = str(uuid.uuid4())
+        await JobRepository(db_session).create_job(
+            job_id=job_id,
+            user_id=test_user.id,
+            organization_id=test_user.organization_id,
+            job_type=JobType.ARCHETYPE_GENERATION,
+            target_id=test_user.organization_id,
+        )
+        return job_id
+
+    async def test_bulk_create_returns_ids_and_replaces_active_set(
+        self, archetype_repo: ArchetypeRepository, test_user: User, job_id: str
+    ):
+        """A new batch deactivates the previous active archetypes of the same target."""
+        organization_id = test_user.organization_id
+        first = await archetype_repo.bulk_create_archetypes(organization_id, job_id, [_archetype("A"), _archetype("B")])
+        second = await archetype_repo.bulk_create_archetypes(organization_id, job_id, [_archetype("C")])
+
+        assert len(first) == 2 and len(second) == 1
+
+        active = await archetype_repo.get_archetypes_by_organization(organization_id)
+        inactive = await archetype_repo.get_archetypes_by_organization(organization_id, is_active=False)
+        assert [a.id for a in active] == second
+        assert sorted(a.id for a in inactive) == sorted(first)
+
+    async def test_empty_batch_keeps_active_set(self, archetype_repo: ArchetypeRepository, test_user: User, job_id: str):
+        """A generation that produced nothing does not deactivate the current archetypes."""
+        organization_id = test_user.organization_id
+        current = await archetype_repo.bulk_create_archetypes(organization_id, job_id, [_archetype("A")])
+
+        assert await archetype_repo.bulk_create_archetypes(organization_id, job_id, []) == []
+
+        active = await archetype_repo.get_archetypes_by_organization(organization_id)
+        assert [a.id for a in active] == current
+
+    async def test_list_archetype_summaries_projects_list_fields(
+        self, archetype_repo: ArchetypeRepository, test_user: User, job_id: str
+    ):
+        """Listings only carry the summary columns, newest first."""
+        organization_id = test_user.organization_id
+        await archetype_repo.bulk_create_archetypes(organization_id, job_id, [_archetype("A"), _archetype("B")])
+
+        summaries = await archetype_repo.list_archetype_summaries(organization_id)
+
+        assert len(summaries) == 2
+        assert "pain_points" not in summaries[0]
+        assert {s["name"] for s in summaries} == {"A", "B"}
@@ -0,0 +1,77 @@
+"""Test job repository."""
+import uuid
+import pytest
+from datetime import datetime, timezone, timedelta
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Job, User
+from app.repositories.job_repo import JobRepository
+from app.domain.types import JobType, JobStatus
+
+
+class TestJobRepositoryPagination:
+    """Test job listing pagination."""
+
+    @pytest.fixture
+    def job_repo(self, db_session: AsyncSession) -> JobRepository:
+        return JobRepository(db_session)
+
+    async def _create_jobs(self, job_repo: JobRepository, user: User, count: int) -> list[str]:
+        base = datetime.now(timezone.utc)
+        job_ids = []
+        for i in range(count):
+            job_id = str(uuid.uuid4())
+            await job_repo.create_job(
+                job_id=job_id,
+                user_id=user.id,
+                organization_id=user.organization_id,
+                job_type=JobType.REVIEW_SCRAPING if i % 2 else JobType.ARCHETYPE_GENERATION,
+                target_id=user.organization_id,
+            )
+            # Force distinct, deterministic timestamps
+            await job_repo.session.execute(
+                update(Job).where(Job.id == job_id).values(created_at=base - timedelta(minutes=i))
+            )
+            job_ids.append(job_id)
+        await job_repo.session.commit()
+        return job_ids
+
+    async def test_keyset_pages_cover_all_jobs_in_order(self, job_repo: JobRepository, test_user: User):
+        """Walking next_cursor returns every job exactly once, newest first."""
+        job_ids = await self._create_jobs(job_repo, test_user, 7)
+
+        seen, cursor = [], None
+        while True:
+            jobs, cursor = await job_repo.get_jobs_page_by_user_id(test_user.id, limit=3, cursor=cursor)
+            seen.extend(job.id for job in jobs)
+            if cursor is None:
+                break
+
+        assert seen == job_ids
+
+    async def test_keyset_matches_offset_pages(self, job_repo: JobRepository, test_user: User):
+        """The first keyset page matches the legacy offset page."""
+        await self._create_jobs(job_repo, test_user, 5)
+
+        keyset_jobs, _ = await job_repo.get_jobs_page_by_user_id(test_user.id, limit=5)
+        offset_jobs = await job_repo.get_jobs_by_user_id(test_user.id, limit=5, offset=0)
+
+        assert [j.id for j in keyset_jobs] == [j.id for j in offset_jobs]
+
+    async def test_keyset_filters_by_job_type_and_status(self, job_repo: JobRepository, test_user: User):
+        """Filters are applied before pagination."""
+        await self._create_jobs(job_repo, test_user, 6)
+
+        jobs, cursor = await job_repo.get_jobs_page_by_user_id(
+            test_user.id, limit=10, job_type=JobType.ARCHETYPE_GENERATION, status=JobStatus.PENDING
+        )
+
+        assert len(jobs) == 3
+        assert cursor is None
+        assert all(job.job_type == JobType.ARCHETYPE_GENERATION for job in jobs)
+
+    async def test_invalid_cursor_raises(self, job_repo: JobRepository, test_user: User):
+        """Malformed cursors are rejected."""
+        with pytest.raises(ValueError):
+            await job_repo.get_jobs_page_by_user_id(test_user.id, cursor="garbage")
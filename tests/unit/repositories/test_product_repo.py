@@ -0,0 +1,92 @@
+"""Test product repository."""
+import uuid
+import pytest
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import DiscoveredProduct, User
+from app.repositories.job_repo import JobRepository
+from app.repositories.product_repo import ProductRepository, product_identifier_hash
+from app.domain.types import JobType
+
+
+def _product(job_id: str, asin: str | None, title: str = "Product", identifiers: list | None = None) -> dict:
+    return {
+        "job_id": job_id,
+        "title": title,
+        "asin": asin,
+        "identifiers": identifiers if identifiers is not None else ([asin] if asin else []),
+        "rating": 4.5,
+        "num_reviews": 10,
+    }
+
+
+class TestProductIdentifierHash:
+    """Test the key used for products without an ASIN."""
+
+    def test_identifier_order_and_case_do_not_matter(self):
+        assert product_identifier_hash({"identifiers": ["EAN1", "upc2"]}) == product_identifier_hash({"identifiers": ["UPC2", "ean1"]})
+
+    def test_falls_back_to_title_and_urls(self):
+        assert product_identifier_hash({"title": "A"}) != product_identifier_hash({"title": "B"})
+
+
+class TestProductRepositoryBulkUpsert:
+    """Test batched product upserts."""
+
+    @pytest.fixture
+    def product_repo(self, db_session: AsyncSession) -> ProductRepository:
+        return ProductRepository(db_session)
+
+    @pytest.fixture
+    async def job_id(self, db_session: AsyncSession, test_user: User) -> str:
+        job_id = str(uuid.uuid4())
+        await JobRepository(db_session).create_job(
+            job_id=job_id,
+            user_id=test_user.id,
+            organization_id=test_user.organization_id,
+            job_type=JobType.DATA_PROCESSING,
+            target_id=test_user.organization_id,
+        )
+        return job_id
+
+    async def _count(self, session: AsyncSession) -> int:
+        return (await session.execute(select(func.count()).select_from(DiscoveredProduct))).scalar_one()
+
+    async def test_reports_inserted_and_updated(self, product_repo: ProductRepository, test_user: User, job_id: str):
+        """A second batch updates known ASINs and inserts new ones."""
+        organization_id = test_user.organization_id
+        first = await product_repo.bulk_upsert_products(
+            organization_id, [_product(job_id, f"B{i:09d}") for i in range(5)], chunk_size=2
+        )
+        second = await product_repo.bulk_upsert_products(
+            organization_id, [_product(job_id, f"B{i:09d}", title="Renamed") for i in range(3, 8)]
+        )
+
+        assert first == {"received": 5, "inserted": 5, "updated": 0, "skipped": 0}
+        assert second == {"received": 5, "inserted": 3, "updated": 2, "skipped": 0}
+        assert await self._count(product_repo.session) == 8
+
+    async def test_products_without_asin_are_keyed_by_identifier_hash(
+        self, product_repo: ProductRepository, test_user: User, job_id: str
+    ):
+        """Products without an ASIN are deduplicated by identifiers, also within one batch."""
+        organization_id = test_user.organization_id
+        rows = [_product(job_id, None, identifiers=["EAN-1"]), _product(job_id, None, identifiers=["ean-1"], title="Again")]
+
+        counts = await product_repo.bulk_upsert_products(organization_id, rows)
+        again = await product_repo.bulk_upsert_products(organization_id, rows[:1])
+
+        assert counts == {"received": 2, "inserted": 1, "updated": 0, "skipped": 0}
+        assert again == {"received": 1, "inserted": 0, "updated": 1, "skipped": 0}
+        assert await self._count(product_repo.session) == 1
+
+    async def test_invalid_products_are_skipped(self, product_repo: ProductRepository, test_user: User, job_id: str):
+        """A product the database rejects is left out; the rest of its chunk is still stored."""
+        rows = [_product(job_id, f"B{i:09d}") for i in range(4)]
+        rows[2]["rating"] = "five stars"
+
+        counts = await product_repo.bulk_upsert_products(test_user.organization_id, rows + [None])
+
+        assert counts == {"received": 5, "inserted": 3, "updated": 0, "skipped": 2}
+        assert await self._count(product_repo.session) == 3
@@ -0,0 +1,215 @@
+"""Test review repository."""
+import uuid
+from datetime import date, datetime, timezone
+import pytest
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.simhash import simhash64, simhash_bands
+from app.db.partitions import REVIEWS_TABLE, scanned_relations
+from app.models import Review, ReviewFingerprintBand, User
+from app.repositories.job_repo import JobRepository
+from app.repositories.review_repo import ReviewRepository, allocate_stratum_quotas, recency_bucket
+from app.repositories.review_stats_repo import ReviewStatsRepository
+from app.domain.types import JobType, SourceType
+
+
+def _review_rows(organization_id: int, job_id: str, count: int, prefix: str = "ext") -> list[dict]:
+    return [
+        {
+            "organization_id": organization_id,
+            "job_id": job_id,
+            "source": SourceType.TRUSTPILOT,
+            "external_id": f"{prefix}_{i}",
+            "brand_name": "Test Brand",
+            "country": "US",
+            "rating": 1 + i % 5,
+            "review_text": f"Review {i}",
+            "raw": {"i": i},
+        }
+        for i in range(count)
+    ]
+
+
+class TestReviewRepositoryBulkIngest:
+    """Test bulk review ingest paths."""
+
+    @pytest.fixture
+    def review_repo(self, db_session: AsyncSession) -> ReviewRepository:
+        return ReviewRepository(db_session)
+
+    @pytest.fixture
+    async def job_id(self, db_session: AsyncSession, test_user: User) -> str:
+        job_id = str(uuid.uuid4())
+        await JobRepository(db_session).create_job(
+            job_id=job_id,
+            user_id=test_user.id,
+            organization_id=test_user.organization_id,
+            job_type=JobType.REVIEW_SCRAPING,
+            target_id=test_user.organization_id,
+        )
+        return job_id
+
+    async def _count(self, session: AsyncSession) -> int:
+        return (await session.execute(select(func.count()).select_from(Review))).scalar_one()
+
+    async def test_bulk_insert_splits_past_bind_parameter_limit(
+        self, review_repo: ReviewRepository, test_user: User, job_id: str
+    ):
+        """More rows than fit in one statement are still inserted."""
+        rows = _review_rows(test_user.organization_id, job_id, 4000)
+
+        inserted = await review_repo.bulk_insert_reviews(rows)
+
+        assert inserted == 4000
+        assert await self._count(review_repo.session) == 4000
+
+    async def test_copy_insert_reports_inserted_and_duplicates(
+        self, review_repo: ReviewRepository, test_user: User, job_id: str
+    ):
+        """The COPY path chunks, merges and skips existing rows."""
+        first = await review_repo.copy_insert_reviews(_review_rows(test_user.organization_id, job_id, 250), chunk_size=100)
+        assert first == {"inserted": 250, "updated": 0, "duplicates": 0}
+
+        overlapping = _review_rows(test_user.organization_id, job_id, 300)
+        second = await review_repo.copy_insert_reviews(overlapping, chunk_size=100)
+
+        assert second == {"inserted": 50, "updated": 0, "duplicates": 250}
+        assert await self._count(review_repo.session) == 300
+
+    async def test_copy_upsert_updates_changed_reviews(
+        self, review_repo: ReviewRepository, test_user: User, job_id: str
+    ):
+        """A reparse rewrites the parsed columns of stored reviews and counts only those that changed."""
+        organization_id = test_user.organization_id
+        await review_repo.copy_insert_reviews(_review_rows(organization_id, job_id, 4))
+        reparsed = _review_rows(organization_id, job_id, 5)
+        reparsed[0].update(rating=5, review_text="Review 0, parsed properly", raw={"i": 0, "fixed": True})
+
+        counts = await review_repo.copy_insert_reviews(reparsed, update_existing=True)
+
+        assert counts == {"inserted": 1, "updated": 1, "duplicates": 3}
+        review = (await review_repo.session.execute(
+            select(Review).where(Review.external_id == "ext_0")
+        )).scalar_one()
+        assert (review.rating, review.review_text, review.raw) == (5, "Review 0, parsed properly", {"i": 0, "fixed": True})
+
+        stats = await ReviewStatsRepository(review_repo.session).get_stats(organization_id, group_by=["brand"])
+        assert stats[0]["review_count"] == 5
+        assert [stats[0][f"rating_{r}"] for r in range(1, 6)] == [0, 1, 1, 1, 2]
+
+    async def test_copy_insert_is_all_or_nothing(
+        self, review_repo: ReviewRepository, test_user: User, job_id: str
+    ):
+        """A chunk failing mid-call leaves none of the call's earlier chunks behind."""
+        rows = _review_rows(test_user.organization_id, job_id, 250)
+        rows[220]["rating"] = "not a rating"
+
+        with pytest.raises(Exception):
+            await review_repo.copy_insert_reviews(rows, chunk_size=100)
+        await review_repo.session.rollback()
+
+        assert await self._count(review_repo.session) == 0
+
+    async def test_copy_insert_indexes_fingerprints_of_canonical_rows(
+        self, review_repo: ReviewRepository, test_user: User, job_id: str
+    ):
+        """Inserted rows with a simhash get one LSH band row per band; flagged near-duplicates do not."""
+        text = "The delivery was quick and the staff were friendly and helpful"
+        fingerprint = simhash64(text)
+        rows = _review_rows(test_user.organization_id, job_id, 2)
+        for row, flagged in zip(rows, (False, True)):
+            row.update(review_text=text, simhash=fingerprint, is_near_duplicate=flagged)
+
+        await review_repo.copy_insert_reviews(rows)
+
+        band_count = (await review_repo.session.execute(
+            select(func.count()).select_from(ReviewFingerprintBand)
+        )).scalar_one()
+        assert band_count == len(simhash_bands(fingerprint))
+
+        keys = list(enumerate(simhash_bands(fingerprint)))
+        matches = await review_repo.find_fingerprint_matches(test_user.organization_id, keys)
+        assert all(matches[key] == [fingerprint] for key in keys)
+
+    async def test_find_existing_external_ids(
+        self, review_repo: ReviewRepository, test_user: User, job_id: str
+    ):
+        """Only pairs stored for the organization and source are reported."""
+        await review_repo.copy_insert_reviews(_review_rows(test_user.organization_id, job_id, 2))
+
+        existing = await review_repo.find_existing_external_ids(test_user.organization_id, [
+            (SourceType.TRUSTPILOT, "ext_0"), (SourceType.TRUSTPILOT, "ext_9"), (SourceType.GOOGLE, "ext_1"),
+        ])
+
+        assert existing == {(SourceType.TRUSTPILOT, "ext_0")}
+
+    async def test_ingest_folds_rating_histogram_into_daily_stats(
+        self, review_repo: ReviewRepository, test_user: User, job_id: str
+    ):
+        """Both ingest paths maintain review_daily_stats; re-ingested duplicates are not counted twice."""
+        organization_id = test_user.organization_id
+        await review_repo.copy_insert_reviews(_review_rows(organization_id, job_id, 10), chunk_size=4)
+        await review_repo.copy_insert_reviews(_review_rows(organization_id, job_id, 10))
+        await review_repo.bulk_insert_reviews(_review_rows(organization_id, job_id, 5, prefix="bulk"))
+
+        stats = await ReviewStatsRepository(review_repo.session).get_stats(organization_id, group_by=["brand"])
+
+        assert len(stats) == 1
+        row = stats[0]
+        assert row["brand"] == "Test Brand"
+        assert row["review_count"] == 15
+        assert row["rating_sum"] == sum(1 + i % 5 for i in range(10)) + sum(1 + i % 5 for i in range(5))
+        assert [row[f"rating_{r}"] for r in range(1, 6)] == [3, 3, 3, 3, 3]
+
+    async def test_archetype_sample_covers_every_rating(
+        self, review_repo: ReviewRepository, test_user: User, job_id: str
+    ):
+        """The sample returns distinct texts only and keeps at least one review of each rating stratum."""
+        organization_id = test_user.organization_id
+        await review_repo.copy_insert_reviews(_review_rows(organization_id, job_id, 50))
+
+        texts = await review_repo.get_reviews_for_archetype_analysis(organization_id, limit=10)
+
+        assert len(texts) == 10
+        assert len(set(texts)) == 10
+        ratings = {1 + int(text.split()[1]) % 5 for text in texts}
+        assert ratings == {1, 2, 3, 4, 5}
+
+    async def test_competitor_sample_is_empty_for_unknown_competitor(self, review_repo: ReviewRepository, test_user: User):
+        assert await review_repo.get_reviews_for_competitor_analysis(test_user.organization_id, competitor_id=-1) == []
+
+    async def test_org_scoped_queries_prune_to_one_hash_partition(self, review_repo: ReviewRepository, test_user: User):
+        """A query filtered by organization_id only reads that organization's partition."""
+        conn = await review_repo.session.connection()
+
+        scoped = await scanned_relations(conn, f"SELECT count(*) FROM reviews WHERE organization_id = {test_user.organization_id}")
+        unscoped = await scanned_relations(conn, "SELECT count(*) FROM reviews WHERE rating = 5")
+
+        assert len(scoped - {REVIEWS_TABLE}) == 1
+        assert len(unscoped - {REVIEWS_TABLE}) > 1
+
+
+class TestStratifiedSampling:
+    """Pure helpers behind the archetype review sampler."""
+
+    def test_quotas_are_proportional_and_sum_to_limit(self):
+        quotas = allocate_stratum_quotas({"a": 600, "b": 300, "c": 100}, 10)
+        assert quotas == {"a": 6, "b": 3, "c": 1}
+
+    def test_small_strata_keep_one_sample(self):
+        quotas = allocate_stratum_quotas({"big": 10_000, "rare": 3, "empty": 0}, 10)
+        assert quotas == {"big": 9, "rare": 1}
+
+    def test_quotas_never_exceed_stratum_size(self):
+        assert allocate_stratum_quotas({"a": 2, "b": 3}, 10) == {"a": 2, "b": 3}
+
+    def test_more_strata_than_samples_prefers_largest(self):
+        assert allocate_stratum_quotas({"a": 5, "b": 50, "c": 20}, 2) == {"b": 1, "c": 1}
+
+    def test_recency_bucket(self):
+        today = date(2024, 6, 30)
+        assert recency_bucket(datetime(2024, 6, 1, tzinfo=timezone.utc), today) == "recent"
+        assert recency_bucket(datetime(2023, 12, 1, tzinfo=timezone.utc), today) == "year"
+        assert recency_bucket(datetime(2020, 1, 1, tzinfo=timezone.utc), today) == "older"
+        assert recency_bucket(None, today) == "older"
@@ -0,0 +1,65 @@
+"""Test source config repository."""
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Competitor, Organization, SourceConfig, SourceGroup, User
+from app.repositories.source_config_repo import SourceConfigRepositoru
+from app.domain.types import SourceType
+
+
+class TestSourceConfigRepositoryRefresh:
+    """Test the batches read by the scheduled source refresh."""
+
+    @pytest.fixture
+    def repo(self, db_session: AsyncSession) -> SourceConfigRepositoru:
+        return SourceConfigRepositoru(db_session)
+
+    @pytest.fixture
+    async def member(self, db_session: AsyncSession, test_org: Organization, test_user: User) -> User:
+        from tests.utils.factories import UserFactory
+        return await UserFactory.create(db_session, email="member@example.com", organization_id=test_org.id)
+
+    @pytest.fixture
+    async def configs(self, db_session: AsyncSession, test_org: Organization, member: User) -> dict:
+        now = datetime.now(timezone.utc)
+        competitor = Competitor(organization_id=test_org.id, name="Rival", created_at=now)
+        db_session.add(competitor)
+        await db_session.flush()
+
+        own = SourceGroup(user_id=member.id, name="Ours")
+        rival = SourceGroup(competitor_id=competitor.id, name="Rival")
+        db_session.add_all([own, rival])
+        await db_session.flush()
+
+        configs = {
+            "own": SourceConfig(source_group_id=own.id, source=SourceType.TRUSTPILOT, brand_name="Acme", countries=["US"]),
+            "rival": SourceConfig(source_group_id=rival.id, source=SourceType.GOOGLE, brand_name="Rival", countries=["US"]),
+            "fresh": SourceConfig(
+                source_group_id=own.id, source=SourceType.AMAZON, brand_name="Acme", countries=["US"], last_refreshed_at=now
+            ),
+        }
+        db_session.add_all(configs.values())
+        await db_session.commit()
+        return configs
+
+    async def test_due_configs_run_as_group_user_or_oldest_org_member(
+        self, repo: SourceConfigRepositoru, configs: dict, test_org: Organization, test_user: User, member: User
+    ):
+        """User groups refresh as their user; competitor groups as the organization's oldest active user."""
+        due = await repo.get_due_for_refresh(datetime.now(timezone.utc) - timedelta(hours=1))
+
+        by_id = {row["id"]: row for row in due}
+        assert set(by_id) == {configs["own"].id, configs["rival"].id}
+        assert (by_id[configs["own"].id]["organization_id"], by_id[configs["own"].id]["user_id"]) == (test_org.id, member.id)
+        assert (by_id[configs["rival"].id]["organization_id"], by_id[configs["rival"].id]["user_id"]) == (test_org.id, test_user.id)
+
+    async def test_batches_are_keyset_paged_and_marked(self, repo: SourceConfigRepositoru, configs: dict):
+        stale_before = datetime.now(timezone.utc) - timedelta(hours=1)
+        first = await repo.get_due_for_refresh(stale_before, limit=1)
+        second = await repo.get_due_for_refresh(stale_before, after_id=first[0]["id"], limit=1)
+
+        assert [row["id"] for row in first + second] == sorted([configs["own"].id, configs["rival"].id])
+
+        await repo.mark_refreshed([row["id"] for row in first + second], datetime.now(timezone.utc))
+        assert await repo.get_due_for_refresh(stale_before) == []
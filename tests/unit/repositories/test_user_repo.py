@@ -0,0 +1,46 @@
+"""Test user repository."""
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.organization import Organization
+from app.repositories.user_repo import UserRepository
+from tests.utils.factories import UserFactory
+
+
+class TestUserRepositorySearch:
+    """Test trigram-backed user search."""
+
+    @pytest.fixture
+    def user_repo(self, db_session: AsyncSession) -> UserRepository:
+        return UserRepository(db_session)
+
+    @pytest.fixture
+    async def users(self, db_session: AsyncSession, test_org: Organization) -> None:
+        for i, name in enumerate(["Margaret Hamilton", "Margarita Lopez", "Marge Simpson", "John Smith"]):
+            await UserFactory.create(db_session, email=f"user{i}@example.com", name=name, organization_id=test_org.id)
+
+    async def test_short_queries_are_rejected(self, user_repo: UserRepository, users):
+        with pytest.raises(ValueError):
+            await user_repo.search_users(query="ma")
+        with pytest.raises(ValueError):
+            await user_repo.search_users_ranked(query=" m ")
+
+    async def test_substring_search_escapes_like_wildcards(self, user_repo: UserRepository, users):
+        assert [u.name for u in await user_repo.search_users(query="Hamilton")] == ["Margaret Hamilton"]
+        assert await user_repo.search_users(query="%%%") == []
+
+    async def test_ranked_search_orders_by_similarity_and_paginates(self, user_repo: UserRepository, users):
+        """The closest name comes first and keyset pages neither skip nor repeat users."""
+        first, cursor = await user_repo.search_users_ranked(query="margaret", limit=1)
+        assert [u.name for u in first] == ["Margaret Hamilton"]
+        assert cursor is not None
+
+        rest = []
+        while cursor:
+            page, cursor = await user_repo.search_users_ranked(query="margaret", limit=1, cursor=cursor)
+            rest.extend(page)
+
+        names = [u.name for u in first + rest]
+        assert len(names) == len(set(names))
+        assert "Margarita Lopez" in names
+        assert "John Smith" not in names
@@ -0,0 +1,121 @@
+"""Test review embedding service and providers."""
+import asyncio
+import math
+import pytest
+
+from app.models.review import EMBEDDING_DIMENSIONS
+from app.services.embedding_service import (
+    HashingEmbeddingProvider,
+    ReviewEmbeddingService,
+    get_embedding_provider,
+)
+
+
+class FakeReviewRepository:
+    """In-memory stand-in for ReviewRepository's embedding queries."""
+
+    def __init__(self, count: int):
+        self.rows = {i: {"text": f"review number {i}", "embedding": None} for i in range(1, count + 1)}
+        self.updates = []
+
+    async def get_reviews_missing_embeddings(self, organization_id=None, after_id=0, limit=256):
+        pending = [
+            (review_id, row["text"])
+            for review_id, row in sorted(self.rows.items())
+            if row["embedding"] is None and review_id > after_id
+        ]
+        return pending[:limit]
+
+    async def update_embeddings(self, embeddings, organization_id=None):
+        self.updates.append(len(embeddings))
+        for review_id, vector in embeddings:
+            self.rows[review_id]["embedding"] = vector
+        return len(embeddings)
+
+
+def _cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+class TestHashingEmbeddingProvider:
+    """Test the offline hashing provider."""
+
+    async def test_vectors_are_deterministic_and_normalised(self):
+        """Same text yields the same unit-length vector of the column's dimensionality."""
+        provider = HashingEmbeddingProvider()
+
+        first, second = await provider.embed(["Great service", "Great service"])
+
+        assert len(first) == EMBEDDING_DIMENSIONS
+        assert first == second
+        assert math.isclose(math.sqrt(sum(v * v for v in first)), 1.0, rel_tol=1e-9)
+
+    async def test_shared_vocabulary_is_closer(self):
+        """Texts sharing words are closer in cosine space than unrelated texts."""
+        provider = HashingEmbeddingProvider()
+
+        base, similar, unrelated = await provider.embed(
+            ["fast delivery and great service", "great service, fast delivery", "the parking lot was muddy"]
+        )
+
+        assert _cosine(base, similar) > _cosine(base, unrelated)
+
+    async def test_empty_text_still_has_a_vector(self):
+        """Empty input does not produce a zero vector."""
+        (vector,) = await HashingEmbeddingProvider(dimensions=8).embed([""])
+
+        assert math.isclose(sum(v * v for v in vector), 1.0)
+
+    def test_unknown_provider_is_rejected(self):
+        """get_embedding_provider refuses unknown names."""
+        with pytest.raises(ValueError):
+            get_embedding_provider("does-not-exist")
+
+
+class TestReviewEmbeddingService:
+    """Test the batched embedding pipeline."""
+
+    async def test_embeds_all_pending_rows_in_batches(self):
+        """Every pending row is embedded and written back one UPDATE per provider batch."""
+        repo = FakeReviewRepository(250)
+        service = ReviewEmbeddingService(repo, HashingEmbeddingProvider(dimensions=16), batch_size=50, concurrency=2)
+
+        report = await service.embed_pending_reviews(organization_id=1)
+
+        assert report["rows_embedded"] == 250
+        assert report["batches"] == 5
+        assert repo.updates == [50, 50, 50, 50, 50]
+        assert all(row["embedding"] is not None for row in repo.rows.values())
+        assert report["rows_per_second"] > 0
+
+    async def test_resumes_where_previous_run_stopped(self):
+        """A second run only picks up rows the first (interrupted) run did not write."""
+        repo = FakeReviewRepository(100)
+        service = ReviewEmbeddingService(repo, HashingEmbeddingProvider(dimensions=16), batch_size=10, concurrency=3)
+
+        first = await service.embed_pending_reviews(max_rows=40)
+        second = await service.embed_pending_reviews()
+
+        assert first["rows_embedded"] == 40
+        assert second["rows_embedded"] == 60
+        assert sum(repo.updates) == 100
+
+    async def test_provider_concurrency_is_bounded(self):
+        """No more than `concurrency` provider calls are in flight at once."""
+        class SlowProvider(HashingEmbeddingProvider):
+            in_flight = 0
+            peak = 0
+
+            async def embed(self, texts):
+                SlowProvider.in_flight += 1
+                SlowProvider.peak = max(SlowProvider.peak, SlowProvider.in_flight)
+                await asyncio.sleep(0.01)
+                SlowProvider.in_flight -= 1
+                return [self.embed_one(text) for text in texts]
+
+        repo = FakeReviewRepository(200)
+        service = ReviewEmbeddingService(repo, SlowProvider(dimensions=8), batch_size=10, concurrency=3)
+
+        await service.embed_pending_reviews()
+
+        assert SlowProvider.peak <= 3
@@ -0,0 +1,128 @@
+"""Test cooperative job cancellation."""
+import asyncio
+
+import pytest
+
+from app.core.exceptions import ConflictError
+from app.domain.types import JobSourceStatus, JobStatus, JobType, SourceType
+from app.services import job_service as job_service_module
+from app.services.job_cancellation import JobCancellation, JobCancelledError
+from app.services.job_service import JobService
+
+
+class FakeJob:
+    def __init__(self, job_id, sources, job_type=JobType.REVIEW_SCRAPING):
+        self.id = job_id
+        self.job_type = job_type
+        self.status = JobStatus.RUNNING
+        self.sources = sources
+
+
+class FakeSource:
+    def __init__(self, source, status):
+        self.source = source
+        self.status = status
+
+
+class FakeJobRepository:
+    def __init__(self, job):
+        self.job = job
+
+    async def get_job_by_id(self, job_id):
+        return self.job
+
+    async def update_job_status(self, job_id, status, result=None, error=None):
+        self.job.status = status
+
+    async def update_job_source_status(self, job_id, source, status, result=None, error=None):
+        for job_source in self.job.sources:
+            if job_source.source == source:
+                job_source.status = status
+
+    async def are_all_sources_finished(self, job_id):
+        terminal = {JobSourceStatus.COMPLETED, JobSourceStatus.FAILED, JobSourceStatus.SKIPPED, JobSourceStatus.CANCELLED}
+        return all(job_source.status in terminal for job_source in self.job.sources)
+
+
+@pytest.fixture
+def cancellation(monkeypatch, fake_redis):
+    cancellation = JobCancellation(fake_redis)
+    monkeypatch.setattr(job_service_module, "job_cancellation", cancellation)
+    monkeypatch.setattr("app.services.job_cancellation.settings.JOB_CANCEL_POLL_SECONDS", 0.01)
+    return cancellation
+
+
+@pytest.mark.asyncio
+class TestWatch:
+    async def test_interrupts_body_once_flagged(self, cancellation):
+        async def cancel_soon():
+            await asyncio.sleep(0.02)
+            await cancellation.request("job-1")
+
+        asyncio.create_task(cancel_soon())
+        with pytest.raises(JobCancelledError):
+            async with cancellation.watch("job-1") as scope:
+                await asyncio.sleep(5)
+        assert scope.requested
+        # the task is usable again: cleanup after the cancellation can still await
+        await asyncio.sleep(0)
+
+    async def test_other_cancellations_propagate(self, cancellation):
+        async def body():
+            async with cancellation.watch("job-2"):
+                await asyncio.sleep(5)
+
+        task = asyncio.create_task(body())
+        await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    async def test_hard_cancel_after_flag_is_a_cancellation(self, cancellation, monkeypatch):
+        """ARQ aborting a task that just started (before the poller saw the flag) still ends as cancelled."""
+        monkeypatch.setattr("app.services.job_cancellation.settings.JOB_CANCEL_POLL_SECONDS", 5)
+
+        async def body():
+            async with cancellation.watch("job-4"):
+                await asyncio.sleep(5)
+
+        task = asyncio.create_task(body())
+        await asyncio.sleep(0.01)
+        await cancellation.request("job-4")
+        task.cancel()
+        with pytest.raises(JobCancelledError):
+            await task
+
+    async def test_body_finishing_first_is_untouched(self, cancellation):
+        async with cancellation.watch("job-3") as scope:
+            await asyncio.sleep(0)
+        assert not scope.requested
+
+
+@pytest.mark.asyncio
+class TestCancelJob:
+    async def test_pending_sources_skipped_running_left_to_worker(self, cancellation):
+        job = FakeJob("job-1", [
+            FakeSource(SourceType.TRUSTPILOT, JobSourceStatus.RUNNING),
+            FakeSource(SourceType.GOOGLE, JobSourceStatus.PENDING),
+        ])
+        service = JobService(FakeJobRepository(job))
+
+        summary = await service.cancel_job("job-1")
+
+        assert summary["skipped_sources"] == [SourceType.GOOGLE.value]
+        assert await cancellation.is_cancelled("job-1")
+        assert job.status == JobStatus.CANCELLED
+        assert [s.status for s in job.sources] == [JobSourceStatus.RUNNING, JobSourceStatus.SKIPPED]
+
+        # the running scrape stops and reports; the job stays CANCELLED rather than COMPLETED
+        await service.update_source_progress("job-1", SourceType.TRUSTPILOT, JobSourceStatus.CANCELLED)
+        assert job.status == JobStatus.CANCELLED
+
+    async def test_finished_job_cannot_be_cancelled(self, cancellation):
+        job = FakeJob("job-1", [FakeSource(SourceType.TRUSTPILOT, JobSourceStatus.COMPLETED)])
+        job.status = JobStatus.COMPLETED
+
+        with pytest.raises(ConflictError):
+            await JobService(FakeJobRepository(job)).cancel_job("job-1")
+        assert not await cancellation.is_cancelled("job-1")
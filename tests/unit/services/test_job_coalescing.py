@@ -0,0 +1,206 @@
+"""Test coalescing of identical scrape requests."""
+import asyncio
+
+import pytest
+
+from app.domain.types import JobSourceStatus, JobStatus, JobType, SourceType
+from app.services import job_service as job_service_module
+from app.services.job_coalescing import JobCoalescer, coalescing_key
+from app.services.job_service import JobService
+
+
+class FakeJob:
+    def __init__(self, job_id, sources):
+        self.id = job_id
+        self.job_type = JobType.REVIEW_SCRAPING
+        self.status = JobStatus.RUNNING
+        self.sources = sources
+
+
+class FakeSource:
+    def __init__(self, source):
+        self.source = source
+        self.status = JobSourceStatus.PENDING
+
+
+class FakeJobRepository:
+    def __init__(self):
+        self.jobs = {}
+
+    async def create_job(self, job_id, **kwargs):
+        self.jobs[job_id] = FakeJob(job_id, [])
+
+    async def add_sources_to_job(self, job_id, sources):
+        self.jobs[job_id].sources = [FakeSource(source) for source in sources]
+
+    async def update_job_source_status(self, job_id, source, status, result=None, error=None):
+        for job_source in self.jobs[job_id].sources:
+            if job_source.source == source:
+                job_source.status = status
+
+    async def update_job_status(self, job_id, status, result=None, error=None):
+        self.jobs[job_id].status = status
+
+    async def get_job_by_id(self, job_id):
+        return self.jobs.get(job_id)
+
+    async def are_all_sources_finished(self, job_id):
+        terminal = {JobSourceStatus.COMPLETED, JobSourceStatus.FAILED, JobSourceStatus.SKIPPED}
+        return all(job_source.status in terminal for job_source in self.jobs[job_id].sources)
+
+
+class FakeArqPool:
+    """Refuses a job id while it is queued or its result is kept, like ARQ."""
+
+    def __init__(self):
+        self.enqueued = []
+        self.queued = set()
+        self.results = set()
+
+    async def enqueue_job(self, function, _job_id=None, **kwargs):
+        if _job_id in self.queued or _job_id in self.results:
+            return None
+        self.queued.add(_job_id)
+        self.enqueued.append((function, _job_id))
+        return object()
+
+    def finish(self, job_id):
+        self.queued.discard(job_id)
+        self.results.add(job_id)
+
+    async def delete(self, key):
+        self.results.discard(key.removeprefix("arq:result:"))
+
+
+def _source(source="trustpilot", brand="BrandX", countries=("US", "GB"), **options):
+    return {"source_type": source, "brand_name": brand, "countries": list(countries), "options": options}
+
+
+class TestCoalescingKey:
+    def test_stable_under_order_and_case(self):
+        assert coalescing_key(1, _source(countries=("US", "GB"))) == coalescing_key(1, _source(brand=" brandx ", countries=("gb", "us")))
+
+    def test_differs_by_scope(self):
+        base = coalescing_key(1, _source())
+        assert base != coalescing_key(2, _source())
+        assert base != coalescing_key(1, _source(source="google"))
+        assert base != coalescing_key(1, _source(countries=("US",)))
+        assert base != coalescing_key(1, _source(language="en"))
+        assert base.startswith("scrape:trustpilot:")
+
+
+@pytest.mark.asyncio
+class TestJobCoalescing:
+    @pytest.fixture
+    def redis(self, monkeypatch, fake_redis):
+        monkeypatch.setattr(job_service_module, "job_coalescer", JobCoalescer(fake_redis))
+        return fake_redis
+
+    async def test_duplicate_request_attaches_to_running_job(self, redis):
+        repo, pool = FakeJobRepository(), FakeArqPool()
+        service = JobService(repo, pool)
+
+        first, attached_first = await service.create_or_attach_job(1, 10, JobType.REVIEW_SCRAPING, sources_data=[_source()])
+        second, attached_second = await service.create_or_attach_job(2, 10, JobType.REVIEW_SCRAPING, sources_data=[_source()])
+
+        assert (attached_first, attached_second) == ({}, {SourceType.TRUSTPILOT: first})
+        assert second == first
+        assert len(repo.jobs) == 1
+        assert pool.enqueued == [("scrape_trustpilot_reviews_task", coalescing_key(10, _source()))]
+
+    async def test_only_attached_users_are_recorded(self, redis):
+        """The users who attached may read the shared job; other members of the organization may not."""
+        service = JobService(FakeJobRepository(), FakeArqPool())
+        coalescer = job_service_module.job_coalescer
+
+        job_id, _ = await service.create_or_attach_job(1, 10, JobType.REVIEW_SCRAPING, sources_data=[_source()])
+        await service.create_or_attach_job(2, 10, JobType.REVIEW_SCRAPING, sources_data=[_source()])
+
+        assert await coalescer.is_attached(job_id, 2)
+        assert not await coalescer.is_attached(job_id, 3)
+        assert redis.ttls[f"coalesce:attached:{job_id}"] == job_service_module.settings.JOB_ATTACHMENT_TTL_SECONDS
+
+    async def test_completed_job_is_reused_within_freshness_window(self, redis):
+        repo = FakeJobRepository()
+        service = JobService(repo, FakeArqPool())
+        job_id, _ = await service.create_or_attach_job(1, 10, JobType.REVIEW_SCRAPING, sources_data=[_source()])
+
+        await service.update_source_progress(job_id, SourceType.TRUSTPILOT, JobSourceStatus.COMPLETED)
+
+        key = "coalesce:" + coalescing_key(10, _source())
+        assert redis.ttls[key] == job_service_module.settings.JOB_COALESCE_FRESHNESS_SECONDS
+        assert (await service.create_or_attach_job(2, 10, JobType.REVIEW_SCRAPING, sources_data=[_source()])) == (
+            job_id, {SourceType.TRUSTPILOT: job_id}
+        )
+
+    async def test_failed_job_is_not_reused(self, redis):
+        repo, pool = FakeJobRepository(), FakeArqPool()
+        service = JobService(repo, pool)
+        job_id, _ = await service.create_or_attach_job(1, 10, JobType.REVIEW_SCRAPING, sources_data=[_source()])
+
+        pool.finish(coalescing_key(10, _source()))
+        await service.update_source_progress(job_id, SourceType.TRUSTPILOT, JobSourceStatus.FAILED)
+
+        retry_id, attached = await service.create_or_attach_job(1, 10, JobType.REVIEW_SCRAPING, sources_data=[_source()])
+        assert not attached and retry_id != job_id
+        # the stale ARQ result of the failed run does not block the retry
+        assert len(pool.enqueued) == 2
+        assert repo.jobs[retry_id].sources[0].status == JobSourceStatus.PENDING
+
+    async def test_partial_overlap_skips_only_the_shared_source(self, redis):
+        repo, pool = FakeJobRepository(), FakeArqPool()
+        service = JobService(repo, pool)
+        first, _ = await service.create_or_attach_job(1, 10, JobType.REVIEW_SCRAPING, sources_data=[_source()])
+
+        second, attached = await service.create_or_attach_job(
+            2, 10, JobType.REVIEW_SCRAPING, sources_data=[_source(), _source(source="google")]
+        )
+
+        assert attached == {SourceType.TRUSTPILOT: first} and second != first
+        statuses = {s.source: s.status for s in repo.jobs[second].sources}
+        assert statuses == {SourceType.TRUSTPILOT: JobSourceStatus.SKIPPED, SourceType.GOOGLE: JobSourceStatus.PENDING}
+        assert [function for function, _ in pool.enqueued] == ["scrape_trustpilot_reviews_task", "scrape_google_reviews_task"]
+
+    async def test_sources_covered_by_several_jobs_create_no_job(self, redis):
+        """The caller follows the jobs already scraping each source rather than an empty job of its own."""
+        repo, pool = FakeJobRepository(), FakeArqPool()
+        service = JobService(repo, pool)
+        trustpilot, _ = await service.create_or_attach_job(1, 10, JobType.REVIEW_SCRAPING, sources_data=[_source()])
+        google, _ = await service.create_or_attach_job(1, 10, JobType.REVIEW_SCRAPING, sources_data=[_source(source="google")])
+
+        job_id, attached = await service.create_or_attach_job(
+            2, 10, JobType.REVIEW_SCRAPING, sources_data=[_source(), _source(source="google")]
+        )
+
+        assert job_id is None
+        assert attached == {SourceType.TRUSTPILOT: trustpilot, SourceType.GOOGLE: google}
+        assert set(repo.jobs) == {trustpilot, google}
+        assert len(pool.enqueued) == 2
+        assert await job_service_module.job_coalescer.is_attached(trustpilot, 2)
+        assert await job_service_module.job_coalescer.is_attached(google, 2)
+
+
+@pytest.mark.asyncio
+class TestClaimsOnRedis:
+    async def test_simultaneous_claims_have_one_winner(self, live_redis):
+        coalescer = JobCoalescer(live_redis)
+        key = coalescing_key(10, _source())
+
+        owners = await asyncio.gather(*(coalescer.claim(key, f"job-{i}") for i in range(5)))
+
+        assert len(set(owners)) == 1
+        assert 0 < await live_redis.ttl(f"coalesce:{key}") <= job_service_module.settings.JOB_COALESCE_RUNNING_TTL_SECONDS
+        assert await live_redis.smembers(f"coalesce:job:{owners[0]}") == {key}
+
+    async def test_release_keeps_successes_fresh_and_frees_failures(self, live_redis):
+        coalescer = JobCoalescer(live_redis)
+        done, failed = coalescing_key(10, _source()), coalescing_key(10, _source(source="google"))
+        await coalescer.claim(done, "job-done")
+        await coalescer.claim(failed, "job-failed")
+
+        await coalescer.release_job("job-done", succeeded=True)
+        await coalescer.release_job("job-failed", succeeded=False)
+
+        assert await coalescer.lookup([done, failed]) == {done: "job-done", failed: None}
+        assert 0 < await live_redis.ttl(f"coalesce:{done}") <= job_service_module.settings.JOB_COALESCE_FRESHNESS_SECONDS
+        assert not await live_redis.exists("coalesce:job:job-done")
@@ -0,0 +1,117 @@
+"""Test the buffered job event writer."""
+import asyncio
+import pytest
+
+from app.domain.events import JobEvent, SystemEvent
+from app.domain.types import WebSocketEventType
+from app.services import job_event_log as job_event_log_module
+from app.services.job_event_log import JobEventLog
+
+
+class FakeJobRepository:
+    """Records the batches and compactions the writer issues."""
+    batches = []
+    compactions = []
+
+    def __init__(self, session):
+        pass
+
+    async def append_job_events(self, events):
+        self.batches.append(list(events))
+        return len(events)
+
+    async def compact_job_events(self, job_id, keep_last=50):
+        self.compactions.append((job_id, keep_last))
+        return 3
+
+
+@pytest.fixture
+def fake_repo(monkeypatch):
+    FakeJobRepository.batches = []
+    FakeJobRepository.compactions = []
+    monkeypatch.setattr(job_event_log_module, "JobRepository", FakeJobRepository)
+    return FakeJobRepository
+
+
+def _event(job_id="job-1", event_type=WebSocketEventType.PROGRESS, **data):
+    return JobEvent(event_type=event_type, source=job_id, job_id=job_id, data=data)
+
+
+@pytest.mark.asyncio
+class TestJobEventLog:
+    async def test_flush_writes_batches_of_batch_size(self, fake_repo, fake_session_factory):
+        log = JobEventLog(session_factory=fake_session_factory, batch_size=4, flush_interval_ms=60_000)
+        for i in range(10):
+            log.record(_event(step=i))
+
+        assert fake_repo.batches == []
+        assert await log.flush() == 10
+        assert [len(batch) for batch in fake_repo.batches] == [4, 4, 2]
+        assert fake_repo.batches[0][0]["job_id"] == "job-1"
+        assert fake_repo.batches[0][0]["event"] == WebSocketEventType.PROGRESS.value
+        assert fake_repo.batches[0][0]["data"] == {"step": 0}
+        await log.close()
+
+    async def test_background_flush_on_batch_size(self, fake_repo, fake_session_factory):
+        log = JobEventLog(session_factory=fake_session_factory, batch_size=3, flush_interval_ms=60_000)
+        for i in range(3):
+            log.record(_event(step=i))
+
+        await asyncio.sleep(0.05)
+        assert [len(batch) for batch in fake_repo.batches] == [3]
+        await log.close()
+
+    async def test_background_flush_on_interval(self, fake_repo, fake_session_factory):
+        log = JobEventLog(session_factory=fake_session_factory, batch_size=100, flush_interval_ms=20)
+        log.record(_event())
+
+        await asyncio.sleep(0.1)
+        assert [len(batch) for batch in fake_repo.batches] == [1]
+        await log.close()
+
+    async def test_events_without_job_are_ignored(self, fake_repo, fake_session_factory):
+        log = JobEventLog(session_factory=fake_session_factory, batch_size=10, flush_interval_ms=60_000)
+        log.record(SystemEvent(event_type=WebSocketEventType.SYSTEM_NOTIFICATION, source="system"))
+
+        assert await log.flush() == 0
+        await log.close()
+
+    async def test_buffer_drops_oldest_when_full(self, fake_repo, fake_session_factory):
+        log = JobEventLog(session_factory=fake_session_factory, batch_size=100, flush_interval_ms=60_000, max_buffer=3)
+        for i in range(5):
+            log.record(_event(step=i))
+
+        await log.close()
+        assert log.dropped == 2
+        assert [row["data"]["step"] for row in fake_repo.batches[0]] == [2, 3, 4]
+
+    async def test_finished_job_is_compacted_after_its_events(self, fake_repo, fake_session_factory):
+        log = JobEventLog(session_factory=fake_session_factory, batch_size=100, flush_interval_ms=60_000, keep_last=5)
+        log.record(_event(step=1))
+        log.record(_event(event_type=WebSocketEventType.JOB_COMPLETED))
+        log.request_compaction("job-1")
+
+        await log.flush()
+        assert len(fake_repo.batches[0]) == 2
+        assert fake_repo.compactions == [("job-1", 5)]
+        await log.close()
+
+    async def test_completed_source_does_not_compact(self, fake_repo, fake_session_factory):
+        """A JOB_COMPLETED is sent per finished source; the job's other sources may still be running."""
+        log = JobEventLog(session_factory=fake_session_factory, batch_size=100, flush_interval_ms=60_000)
+        log.record(_event(event_type=WebSocketEventType.JOB_COMPLETED))
+
+        await log.flush()
+        assert fake_repo.compactions == []
+        await log.close()
+
+    async def test_write_errors_are_swallowed(self, monkeypatch, fake_repo, fake_session_factory):
+        async def failing_append(self, events):
+            raise RuntimeError("database unavailable")
+
+        monkeypatch.setattr(FakeJobRepository, "append_job_events", failing_append)
+        log = JobEventLog(session_factory=fake_session_factory, batch_size=10, flush_interval_ms=60_000)
+        log.record(_event())
+
+        assert await log.flush() == 0
+        await log.close()
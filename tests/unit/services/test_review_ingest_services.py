@@ -0,0 +1,269 @@
+"""Test review ingest service."""
+import asyncio
+import pytest
+
+from app.core.config import settings
+from app.core.simhash import simhash64, simhash_bands, hamming_distance
+from app.models.review import UNDATED_REVIEW_DATE
+from app.services.review_ingest_services import ReviewIngestService
+from app.domain.types import SourceType
+
+
+class FakeTransactionSession:
+    """Counts the transactions the service ends."""
+
+    def __init__(self):
+        self.commits = 0
+
+    async def commit(self):
+        self.commits += 1
+
+
+class FakeReviewRepository:
+    """In-memory stand-in for ReviewRepository's COPY path."""
+
+    def __init__(self):
+        self.session = FakeTransactionSession()
+        self.seen = set()
+        self.chunks = []
+        self.rows = []
+        self.bands = {}
+        self.locks = []
+
+    async def copy_insert_reviews(self, reviews_data, chunk_size=None, update_existing=False):
+        self.chunks.append(len(reviews_data))
+        new = [r for r in reviews_data if r["external_id"] not in self.seen]
+        updated = 0
+        if update_existing:
+            stored = {row["external_id"]: row for row in self.rows}
+            for row in reviews_data:
+                old = stored.get(row["external_id"])
+                if old is not None and old["review_text"] != row["review_text"]:
+                    old["review_text"] = row["review_text"]
+                    updated += 1
+        self.seen.update(r["external_id"] for r in new)
+        self.rows.extend(new)
+        for row in new:
+            if row["simhash"] is not None and not row["is_near_duplicate"]:
+                for key in enumerate(simhash_bands(row["simhash"])):
+                    self.bands.setdefault(key, []).append(row["simhash"])
+        await self.session.commit()
+        return {"inserted": len(new), "updated": updated, "duplicates": len(reviews_data) - len(new) - updated}
+
+    async def ensure_partitions(self, rows):
+        pass
+
+    async def lock_fingerprint_index(self, organization_id):
+        self.locks.append(organization_id)
+
+    async def find_existing_external_ids(self, organization_id, keys):
+        return {(source, external_id) for source, external_id in keys if external_id in self.seen}
+
+    async def find_fingerprint_matches(self, organization_id, band_keys):
+        return {key: list(self.bands[key]) for key in band_keys if key in self.bands}
+
+
+async def _pages(count: int, page_size: int, start: int = 0):
+    for page_start in range(start, start + count, page_size):
+        await asyncio.sleep(0)
+        yield [
+            {"external_id": f"ext_{i}", "rating": 5, "review_text": "ok", "review_date": "2025-01-01T00:00:00Z"}
+            for i in range(page_start, min(page_start + page_size, start + count))
+        ]
+
+
+class TestReviewIngestStream:
+    """Test streaming review ingest."""
+
+    async def test_stream_persists_every_batch(self):
+        """Each scraped page is transformed and written as its own chunk."""
+        repo = FakeReviewRepository()
+        service = ReviewIngestService(repo)
+
+        totals = await service.ingest_review_stream(
+            organization_id=1, source=SourceType.TRUSTPILOT, brand_name="Brand", batches=_pages(250, 100), job_id="job-1"
+        )
+
+        assert totals == {"received": 250, "inserted": 250, "updated": 0, "duplicates": 0, "near_duplicates": 0}
+        assert repo.chunks == [100, 100, 50]
+
+    async def test_progress_reflects_persisted_rows(self):
+        """on_persisted is called after every committed chunk with a running total."""
+        repo = FakeReviewRepository()
+        await ReviewIngestService(repo).ingest_review_stream(
+            organization_id=1, source=SourceType.TRUSTPILOT, brand_name="Brand", batches=_pages(100, 100)
+        )
+        progress = []
+
+        async def on_persisted(persisted: int) -> None:
+            progress.append(persisted)
+
+        totals = await ReviewIngestService(repo).ingest_review_stream(
+            organization_id=1,
+            source=SourceType.TRUSTPILOT,
+            brand_name="Brand",
+            batches=_pages(150, 50, start=50),
+            on_persisted=on_persisted,
+        )
+
+        assert totals == {"received": 150, "inserted": 100, "updated": 0, "duplicates": 50, "near_duplicates": 0}
+        assert progress == [50, 100, 150]
+
+    async def test_committed_batches_report_their_position(self):
+        """on_batch_committed identifies each non-empty batch by its position in the stream."""
+        async def pages_with_gap():
+            async for page in _pages(100, 50):
+                yield page
+                yield []
+
+        committed = {}
+
+        async def on_batch_committed(index, counts):
+            committed[index] = counts["inserted"]
+
+        await ReviewIngestService(FakeReviewRepository()).ingest_review_stream(
+            organization_id=1,
+            source=SourceType.TRUSTPILOT,
+            brand_name="Brand",
+            batches=pages_with_gap(),
+            on_batch_committed=on_batch_committed,
+        )
+
+        assert committed == {0: 50, 1: 50}
+
+    async def test_undated_reviews_get_a_stable_date_in_monthly_mode(self, monkeypatch):
+        """review_date joins the conflict key there, so a fallback must not change between scrapes."""
+        monkeypatch.setattr(settings, "REVIEWS_MONTHLY_PARTITIONS", True)
+        service = ReviewIngestService(FakeReviewRepository())
+        raw = [{"external_id": "a"}, {"external_id": "b", "review_date": "yesterday"}]
+
+        rows = service._clean_and_transform(raw, organization_id=1, source=SourceType.GOOGLE, brand_name="Brand")
+
+        assert [row["review_date"] for row in rows] == [UNDATED_REVIEW_DATE, UNDATED_REVIEW_DATE]
+
+    async def test_update_existing_counts_changed_reviews(self):
+        """A reparse updates stored reviews whose parsed values changed instead of skipping them."""
+        repo = FakeReviewRepository()
+        service = ReviewIngestService(repo)
+        await service.ingest_review_stream(
+            organization_id=1, source=SourceType.TRUSTPILOT, brand_name="Brand", batches=_pages(3, 3)
+        )
+
+        async def reparsed():
+            yield [
+                {"external_id": "ext_0", "review_text": "parsed properly this time"},
+                {"external_id": "ext_1", "review_text": "ok"},
+                {"external_id": "ext_3", "review_text": "new"},
+            ]
+
+        totals = await service.ingest_review_stream(
+            organization_id=1, source=SourceType.TRUSTPILOT, brand_name="Brand", batches=reparsed(), update_existing=True
+        )
+
+        assert totals == {"received": 3, "inserted": 1, "updated": 1, "duplicates": 1, "near_duplicates": 0}
+        assert repo.rows[0]["review_text"] == "parsed properly this time"
+
+    async def test_scraper_failure_is_raised(self):
+        """Errors from the batch source propagate unwrapped."""
+        async def failing_pages():
+            yield [{"external_id": "ext_1"}]
+            raise RuntimeError("upstream blew up")
+
+        with pytest.raises(RuntimeError, match="upstream blew up"):
+            await ReviewIngestService(FakeReviewRepository()).ingest_review_stream(
+                organization_id=1, source=SourceType.GOOGLE, brand_name="Brand", batches=failing_pages()
+            )
+
+
+async def _single_batch(rows):
+    yield rows
+
+
+REVIEW = "The delivery was quick and the staff were friendly and helpful, will order again"
+
+
+class TestNearDuplicateDetection:
+    """Test SimHash fingerprinting and LSH lookups during ingest."""
+
+    def test_simhash_is_close_for_reposts_and_far_for_other_texts(self):
+        """Small edits keep the fingerprint within a few bits; unrelated text does not."""
+        original = simhash64(REVIEW)
+        repost = simhash64(REVIEW + "!")
+        other = simhash64("Terrible packaging, the bottle arrived broken and support never answered")
+
+        assert repost == original
+        assert hamming_distance(original, other) > settings.NEAR_DUPLICATE_MAX_DISTANCE
+        assert simhash64("Great!") is None
+
+    async def test_reposts_across_batches_are_dropped(self, monkeypatch):
+        """A repost under a different external_id is not inserted and is counted as a near-duplicate."""
+        monkeypatch.setattr(settings, "NEAR_DUPLICATE_MODE", "drop")
+        repo = FakeReviewRepository()
+        service = ReviewIngestService(repo)
+
+        await service.ingest_review_stream(
+            organization_id=1, source=SourceType.GOOGLE, brand_name="Brand",
+            batches=_single_batch([{"external_id": "es-1", "review_text": REVIEW, "country": "ES"}]),
+        )
+        totals = await service.ingest_review_stream(
+            organization_id=1, source=SourceType.GOOGLE, brand_name="Brand",
+            batches=_single_batch([
+                {"external_id": "us-1", "review_text": REVIEW.upper(), "country": "US"},
+                {"external_id": "us-2", "review_text": "Terrible packaging, the bottle arrived broken and support never answered"},
+            ]),
+        )
+
+        assert totals == {"received": 2, "inserted": 1, "updated": 0, "duplicates": 1, "near_duplicates": 1}
+        assert [row["external_id"] for row in repo.rows] == ["es-1", "us-2"]
+        assert repo.locks == [1, 1]
+
+    async def test_chunk_of_only_reposts_still_ends_its_transaction(self, monkeypatch):
+        """Nothing is inserted, but the transaction holding the fingerprint lock is committed."""
+        monkeypatch.setattr(settings, "NEAR_DUPLICATE_MODE", "drop")
+        repo = FakeReviewRepository()
+        service = ReviewIngestService(repo)
+        await service.ingest_review_stream(
+            organization_id=1, source=SourceType.GOOGLE, brand_name="Brand",
+            batches=_single_batch([{"external_id": "es-1", "review_text": REVIEW, "country": "ES"}]),
+        )
+
+        totals = await service.ingest_review_stream(
+            organization_id=1, source=SourceType.GOOGLE, brand_name="Brand",
+            batches=_single_batch([{"external_id": "us-1", "review_text": REVIEW.upper(), "country": "US"}]),
+        )
+
+        assert totals == {"received": 1, "inserted": 0, "updated": 0, "duplicates": 1, "near_duplicates": 1}
+        assert repo.chunks == [1]
+        assert repo.session.commits == 2
+
+    async def test_rescrapes_are_plain_duplicates(self, monkeypatch):
+        """A stored review scraped again matches its own fingerprint but is not a near-duplicate."""
+        monkeypatch.setattr(settings, "NEAR_DUPLICATE_MODE", "drop")
+        service = ReviewIngestService(FakeReviewRepository())
+        rows = [{"external_id": "es-1", "review_text": REVIEW}]
+
+        await service.ingest_review_stream(
+            organization_id=1, source=SourceType.GOOGLE, brand_name="Brand", batches=_single_batch(rows),
+        )
+        totals = await service.ingest_review_stream(
+            organization_id=1, source=SourceType.GOOGLE, brand_name="Brand", batches=_single_batch(rows),
+        )
+
+        assert totals == {"received": 1, "inserted": 0, "updated": 0, "duplicates": 1, "near_duplicates": 0}
+
+    async def test_mark_mode_keeps_duplicates_within_a_chunk(self, monkeypatch):
+        """In mark mode the second copy inside one chunk is stored but flagged."""
+        monkeypatch.setattr(settings, "NEAR_DUPLICATE_MODE", "mark")
+        repo = FakeReviewRepository()
+
+        totals = await ReviewIngestService(repo).ingest_review_stream(
+            organization_id=1, source=SourceType.TRUSTPILOT, brand_name="Brand",
+            batches=_single_batch([
+                {"external_id": "a", "review_text": REVIEW},
+                {"external_id": "b", "review_text": REVIEW},
+            ]),
+        )
+
+        assert totals["inserted"] == 2
+        assert totals["near_duplicates"] == 1
+        assert [row["is_near_duplicate"] for row in repo.rows] == [False, True]
@@ -0,0 +1,70 @@
+"""Test semantic review search service."""
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.domain.types import SourceType
+from app.schemas.reviews import ReviewSearchRequest
+from app.services.embedding_service import HashingEmbeddingProvider
+from app.services.review_search_service import ReviewSearchService
+
+
+class FakeReviewRepository:
+    """Records the search call and returns canned rows."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def search_similar_reviews(self, **kwargs):
+        self.calls.append(kwargs)
+        return [
+            {
+                "id": 1,
+                "source": SourceType.GOOGLE,
+                "external_id": "g-1",
+                "brand_name": "Brand",
+                "country": "ES",
+                "rating": 5,
+                "review_text": "Great service",
+                "review_date": None,
+                "distance": 0.25,
+            }
+        ]
+
+
+class TestReviewSearchService:
+    """Test query embedding and parameter forwarding."""
+
+    async def test_search_forwards_organization_and_filters(self):
+        """The organization and every filter reach the repository; distance becomes similarity."""
+        repo = FakeReviewRepository()
+        service = ReviewSearchService(repo, HashingEmbeddingProvider(dimensions=8))
+
+        response = await service.search(
+            42, ReviewSearchRequest(query="service", sources=[SourceType.GOOGLE], min_rating=4, country="ES")
+        )
+
+        call = repo.calls[0]
+        assert call["organization_id"] == 42
+        assert call["sources"] == [SourceType.GOOGLE]
+        assert call["min_rating"] == 4
+        assert call["country"] == "ES"
+        assert len(call["embedding"]) == 8
+        assert response.items[0].similarity == pytest.approx(0.75)
+
+    async def test_ef_search_defaults_and_never_below_k(self):
+        """ef_search falls back to settings and is raised to k when smaller."""
+        repo = FakeReviewRepository()
+        service = ReviewSearchService(repo, HashingEmbeddingProvider(dimensions=8))
+
+        default = await service.search(1, ReviewSearchRequest(query="q"))
+        raised = await service.search(1, ReviewSearchRequest(query="q", k=50, ef_search=10))
+
+        assert default.ef_search == max(settings.VECTOR_SEARCH_EF_SEARCH, 10)
+        assert raised.ef_search == 50
+        assert repo.calls[1]["ef_search"] == 50
+
+    def test_request_rejects_inverted_ranges(self):
+        """Rating and date ranges must be ordered."""
+        with pytest.raises(ValidationError):
+            ReviewSearchRequest(query="q", min_rating=5, max_rating=1)
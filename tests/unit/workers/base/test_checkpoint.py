@@ -0,0 +1,176 @@
+"""Test scrape checkpoints and resuming a retried scrape."""
+from datetime import datetime, timezone
+
+import pytest
+
+from app.domain.types import SourceType
+from app.schemas.jobs import ReviewData
+from app.workers.base.checkpoint import CheckpointStore, CheckpointTracker, ScrapeCheckpoint
+from app.workers.base.watermark import WatermarkStore
+from app.workers.tasks.scraping import base_scraper as base_scraper_module
+from app.workers.tasks.scraping.base_scraper import BaseScraper
+
+
+def _review(i):
+    return ReviewData(
+        external_id=f"ext_{i}",
+        brand_name="Acme",
+        country="US",
+        rating=5,
+        review_text="fine",
+        review_date=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        source=SourceType.TRUSTPILOT,
+    )
+
+
+class _CursorScraper(BaseScraper):
+    """Pages of 10 reviews; the cursor is the index of the next page."""
+
+    def __init__(self, page_count):
+        super().__init__("cursor_scraper", SourceType.TRUSTPILOT)
+        self.page_count = page_count
+        self.fetched = []
+
+    async def _iter_review_batches(self, job_id, organization_id, config):
+        for index in range(int(self.resume_cursor or 0), self.page_count):
+            self.fetched.append(index)
+            self.page_cursor = str(index + 1)
+            yield [_review(index * 10 + i) for i in range(10)]
+
+
+class WorkerCrash(Exception):
+    pass
+
+
+class FakeIngestService:
+    """Commits every batch; `crash_after` simulates the worker dying after that many commits."""
+    crash_after = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def ingest_review_stream(self, batches, on_batch_committed=None, **kwargs):
+        received = 0
+        index = 0
+        async for batch in batches:
+            if index == FakeIngestService.crash_after:
+                raise WorkerCrash()
+            received += len(batch)
+            await on_batch_committed(index, {"inserted": len(batch), "duplicates": 0})
+            index += 1
+        return {"received": received, "inserted": received, "duplicates": 0}
+
+
+class TestCheckpointTracker:
+    def test_advances_only_over_contiguous_commits(self):
+        tracker = CheckpointTracker()
+        for page in range(3):
+            tracker.page_yielded(str(page + 1), f"ext_{page}", 10)
+
+        assert not tracker.batch_committed(1, {"inserted": 10, "duplicates": 0})
+        assert tracker.checkpoint.pages == 0
+        assert tracker.batch_committed(0, {"inserted": 8, "duplicates": 2})
+        assert (tracker.checkpoint.pages, tracker.checkpoint.cursor) == (2, "2")
+        assert (tracker.checkpoint.inserted, tracker.checkpoint.duplicates) == (18, 2)
+        assert tracker.checkpoint.last_external_id == "ext_1"
+
+    def test_resumed_tracker_adds_to_its_start(self):
+        start = ScrapeCheckpoint(pages=4, cursor="4", received=40, inserted=40)
+        tracker = CheckpointTracker(start)
+        tracker.page_yielded("5", "ext_40", 10)
+        tracker.batch_committed(0, {"inserted": 10, "duplicates": 0})
+
+        assert (tracker.checkpoint.pages, tracker.checkpoint.received) == (5, 50)
+        assert start.pages == 4
+
+    def test_hands_over_the_reviews_of_committed_pages_once(self):
+        tracker = CheckpointTracker()
+        tracker.page_yielded("1", "ext_0", 1, [("US", "ext_0", None)])
+        tracker.page_yielded("2", "ext_1", 1, [("US", "ext_1", None)])
+
+        tracker.batch_committed(1, {"inserted": 1})
+        assert tracker.take_seen() == []
+        tracker.batch_committed(0, {"inserted": 1})
+        assert tracker.take_seen() == [("US", "ext_0", None), ("US", "ext_1", None)]
+        assert tracker.take_seen() == []
+
+
+@pytest.mark.asyncio
+class TestResume:
+    @pytest.fixture
+    def store(self, monkeypatch, fake_redis, fake_session_factory):
+        store = CheckpointStore(fake_redis)
+        monkeypatch.setattr(base_scraper_module, "checkpoint_store", store)
+        monkeypatch.setattr(base_scraper_module, "ReviewIngestService", FakeIngestService)
+        monkeypatch.setattr(base_scraper_module, "AsyncSessionLocal", fake_session_factory)
+        monkeypatch.setattr(base_scraper_module.settings, "WATERMARK_ENABLED", False)
+        monkeypatch.setattr(base_scraper_module.settings, "SCRAPE_CHECKPOINT_ENABLED", True)
+        monkeypatch.setattr(FakeIngestService, "crash_after", None)
+        return store
+
+    async def test_retry_resumes_after_last_committed_page(self, store, monkeypatch):
+        config = {"brand_name": "Acme", "countries": ["US"]}
+        monkeypatch.setattr(FakeIngestService, "crash_after", 3)
+        first = _CursorScraper(page_count=5)
+        with pytest.raises(WorkerCrash):
+            await first._ingest_review_stream("job-1", 1, config)
+
+        checkpoint = await store.load("job-1", SourceType.TRUSTPILOT)
+        assert (checkpoint.pages, checkpoint.cursor, checkpoint.last_external_id) == (3, "3", "ext_29")
+
+        monkeypatch.setattr(FakeIngestService, "crash_after", None)
+        retry = _CursorScraper(page_count=5)
+        totals = await retry._ingest_review_stream("job-1", 1, config)
+
+        assert retry.fetched == [3, 4]
+        assert retry.resumed_from_page == 3 and retry.pages_scraped == 5
+        assert totals["received"] == 50 and totals["inserted"] == 50
+
+    async def test_retry_saves_the_watermark_of_pages_committed_before_it(self, store, monkeypatch):
+        watermarks = WatermarkStore(store.redis)
+        monkeypatch.setattr(base_scraper_module, "watermark_store", watermarks)
+        monkeypatch.setattr(base_scraper_module.settings, "WATERMARK_ENABLED", True)
+        config = {"brand_name": "Acme", "countries": ["US"]}
+        monkeypatch.setattr(FakeIngestService, "crash_after", 3)
+        with pytest.raises(WorkerCrash):
+            await _CursorScraper(page_count=5)._ingest_review_stream("job-1", 1, config)
+
+        # nothing is marked known until the scrape completes, so the next one cannot stop above a gap
+        assert (await watermarks.load(1, SourceType.TRUSTPILOT, "Acme", "US")).newest_review_date is None
+
+        monkeypatch.setattr(FakeIngestService, "crash_after", None)
+        await _CursorScraper(page_count=5)._ingest_review_stream("job-1", 1, config)
+
+        watermark = await watermarks.load(1, SourceType.TRUSTPILOT, "Acme", "US")
+        assert all(watermark.is_known(f"ext_{i}") for i in range(50))
+
+    async def test_checkpoints_are_per_job(self, store):
+        await store.save("job-1", SourceType.TRUSTPILOT, ScrapeCheckpoint(pages=2, cursor="2"))
+
+        other = _CursorScraper(page_count=3)
+        await other._ingest_review_stream("job-2", 1, {"brand_name": "Acme", "countries": ["US"]})
+        assert other.fetched == [0, 1, 2]
+        assert other.resumed_from_page == 0
+
+    async def test_corrupt_checkpoint_scrapes_from_first_page(self, store):
+        store.redis.values[store.key("job-1", SourceType.TRUSTPILOT)] = "{not json"
+        assert await store.load("job-1", SourceType.TRUSTPILOT) is None
+
+
+@pytest.mark.asyncio
+class TestCheckpointStoreOnRedis:
+    async def test_round_trip_with_the_reviews_of_committed_pages(self, live_redis):
+        store = CheckpointStore(live_redis)
+        dated = ("US", "ext_0", "2026-01-01T00:00:00+00:00")
+        await store.save("job-1", SourceType.TRUSTPILOT, ScrapeCheckpoint(pages=1, cursor="1", received=1), [dated])
+        await store.save("job-1", SourceType.TRUSTPILOT, ScrapeCheckpoint(pages=2, cursor="2", received=2), [("GB", "ext_1", None)])
+
+        assert await store.load("job-1", SourceType.TRUSTPILOT) == ScrapeCheckpoint(pages=2, cursor="2", received=2)
+        assert await store.load_seen("job-1", SourceType.TRUSTPILOT) == [dated, ("GB", "ext_1", None)]
+        ttl = base_scraper_module.settings.SCRAPE_CHECKPOINT_TTL_SECONDS
+        for key in (store.key("job-1", SourceType.TRUSTPILOT), store.seen_key("job-1", SourceType.TRUSTPILOT)):
+            assert 0 < await live_redis.ttl(key) <= ttl
+
+        await store.clear("job-1", SourceType.TRUSTPILOT)
+        assert await store.load("job-1", SourceType.TRUSTPILOT) is None
+        assert await store.load_seen("job-1", SourceType.TRUSTPILOT) == []
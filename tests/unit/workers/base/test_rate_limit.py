@@ -0,0 +1,102 @@
+"""Test the Redis token-bucket rate limiter used by scrapers."""
+import pytest
+import redis.asyncio as redis
+
+from app.domain.types import SourceType
+from app.workers.base import rate_limit as rate_limit_module
+from app.workers.base.rate_limit import RateLimiter
+
+BUCKET = "ratelimit:bucket:trustpilot"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr(rate_limit_module.asyncio, "sleep", fake_sleep)
+    return slept
+
+
+@pytest.mark.asyncio
+class TestRateLimiter:
+    async def test_unknown_source_uses_default_budget(self):
+        limiter = RateLimiter(per_second={"google": 5.0}, burst={"google": 10})
+
+        assert limiter.budget(SourceType.GOOGLE) == (5.0, 10)
+        assert limiter.budget("druni") == (
+            rate_limit_module.settings.RATE_LIMIT_DEFAULT_PER_SECOND,
+            rate_limit_module.settings.RATE_LIMIT_DEFAULT_BURST,
+        )
+
+    async def test_fails_open_when_redis_is_unavailable(self, sleeps):
+        unreachable = redis.Redis(host="127.0.0.1", port=1, socket_connect_timeout=0.1)
+        limiter = RateLimiter(unreachable, per_second={}, burst={})
+
+        assert await limiter.acquire(SourceType.AMAZON) == 0.0
+        assert sleeps == []
+        await unreachable.aclose()
+
+
+@pytest.mark.asyncio
+class TestTokenBucketScript:
+    """TOKEN_BUCKET_LUA run by Redis; sleeps are recorded instead of taken."""
+
+    async def test_burst_then_callers_queue_behind_negative_tokens(self, live_redis, sleeps):
+        limiter = RateLimiter(live_redis, per_second={"trustpilot": 4.0}, burst={"trustpilot": 2})
+
+        waits = [await limiter.acquire(SourceType.TRUSTPILOT) for _ in range(4)]
+
+        assert waits[:2] == [0.0, 0.0]
+        # each caller reserves the next slot: 1/rate apart, minus what refilled between the calls
+        assert 0.2 < waits[2] <= 0.25 and 0.45 < waits[3] <= 0.5
+        assert sleeps == waits[2:]
+        assert float(await live_redis.hget(BUCKET, "tokens")) < -1.5
+        stats = limiter.stats["trustpilot"]
+        assert (stats.acquired, stats.waited, stats.wait_seconds_max) == (4, 2, waits[3])
+
+    async def test_bucket_refills_with_elapsed_time(self, live_redis, sleeps):
+        limiter = RateLimiter(live_redis, per_second={"trustpilot": 2.0}, burst={"trustpilot": 1})
+        await limiter.acquire(SourceType.TRUSTPILOT)
+        assert await limiter.acquire(SourceType.TRUSTPILOT) > 0
+
+        # pretend the last acquisition was 2s ago: 4 tokens refilled, enough for the one owed and a full bucket
+        await live_redis.hincrby(BUCKET, "ts", -2000)
+        assert await limiter.acquire(SourceType.TRUSTPILOT) == 0.0
+        assert await limiter.acquire(SourceType.TRUSTPILOT) > 0
+
+    async def test_idle_bucket_expires_once_full_again(self, live_redis, sleeps):
+        limiter = RateLimiter(live_redis, per_second={"trustpilot": 4.0}, burst={"trustpilot": 2})
+        for _ in range(3):
+            await limiter.acquire(SourceType.TRUSTPILOT)
+
+        # three tokens owed at 4/s refill in 750ms, plus a second of slack
+        assert 1000 < await live_redis.pttl(BUCKET) <= 1750
+
+    async def test_context_manager_yields_wait(self, live_redis, sleeps):
+        limiter = RateLimiter(live_redis, per_second={"google": 10.0}, burst={"google": 1})
+        await limiter.acquire(SourceType.GOOGLE)
+
+        async with limiter.limit(SourceType.GOOGLE) as waited:
+            assert 0.05 < waited <= 0.1
+
+    async def test_per_host_buckets(self, live_redis, sleeps):
+        limiter = RateLimiter(live_redis, per_second={}, burst={}, per_host=True)
+
+        await limiter.acquire(SourceType.TRUSTPILOT, "https://uk.trustpilot.com/review/brand?page=2")
+        await limiter.acquire(SourceType.TRUSTPILOT)
+
+        assert await live_redis.exists(f"{BUCKET}:uk.trustpilot.com", BUCKET) == 2
+
+    async def test_shared_stats_from_redis(self, live_redis, sleeps):
+        writer = RateLimiter(live_redis, per_second={"google": 10.0}, burst={"google": 1})
+        for _ in range(3):
+            await writer.acquire(SourceType.GOOGLE)
+
+        # another worker's limiter sees the counters the script kept
+        stats = await RateLimiter(live_redis, per_second={}, burst={}).get_shared_stats(SourceType.GOOGLE)
+        assert (stats.acquired, stats.waited) == (3, 2)
+        assert stats.wait_seconds_total == pytest.approx(writer.stats["google"].wait_seconds_total)
+        assert stats.wait_seconds_avg == pytest.approx(stats.wait_seconds_total / 3)
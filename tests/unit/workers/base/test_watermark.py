@@ -0,0 +1,128 @@
+"""Test scrape watermarks and early pagination stop."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.domain.types import SourceType
+from app.schemas.jobs import ReviewData
+from app.workers.base.watermark import Watermark, WatermarkStore
+from app.workers.tasks.scraping import base_scraper as base_scraper_module
+from app.workers.tasks.scraping.base_scraper import BaseScraper
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _review(i, country="US", days_ago=0):
+    return ReviewData(
+        external_id=f"ext_{i}",
+        brand_name="Acme",
+        country=country,
+        rating=5,
+        review_text="fine",
+        review_date=NOW - timedelta(days=days_ago),
+        source=SourceType.TRUSTPILOT,
+    )
+
+
+class TestWatermark:
+    def test_known_ids_and_newer_reviews(self):
+        watermark = Watermark()
+        watermark.add("ext_1", NOW - timedelta(days=1))
+
+        assert watermark.is_known("ext_1")
+        assert not watermark.is_known("ext_2")
+        # newer than the high-water mark is new even if the filter (falsely) matched
+        assert not watermark.is_known("ext_1", NOW)
+        assert watermark.newest_review_date == NOW - timedelta(days=1)
+
+
+@pytest.mark.asyncio
+class TestWatermarkStore:
+    async def test_round_trip_and_merge(self, live_redis):
+        store = WatermarkStore(live_redis)
+        first = Watermark()
+        first.add("ext_1", NOW)
+        await store.save(1, SourceType.TRUSTPILOT, "Acme", "us", first)
+
+        second = Watermark()
+        second.add("ext_2", NOW - timedelta(days=3))
+        await store.save(1, SourceType.TRUSTPILOT, " acme ", "US", second)
+
+        loaded = await store.load(1, SourceType.TRUSTPILOT, "ACME", "US")
+        assert "ext_1" in loaded.known_ids and "ext_2" in loaded.known_ids
+        assert loaded.newest_review_date == NOW
+        other_org = await store.load(2, SourceType.TRUSTPILOT, "Acme", "US")
+        assert "ext_1" not in other_org.known_ids
+        ttl = base_scraper_module.settings.WATERMARK_TTL_DAYS * 86400
+        assert ttl - 60 < await live_redis.ttl(store.key(1, SourceType.TRUSTPILOT, "Acme", "US")) <= ttl
+
+    async def test_corrupt_watermark_falls_back_to_empty(self, fake_redis):
+        store = WatermarkStore(fake_redis)
+        fake_redis.hashes[store.key(1, "trustpilot", "Acme", "US")] = {"bloom": "not base64!"}
+
+        loaded = await store.load(1, "trustpilot", "Acme", "US")
+        assert loaded.newest_review_date is None
+        assert loaded.known_ids.count == 0
+
+
+class _PagedScraper(BaseScraper):
+    def __init__(self, pages):
+        super().__init__("paged_scraper", SourceType.TRUSTPILOT)
+        self.pages = pages
+        self.fetched = 0
+
+    async def _iter_review_batches(self, job_id, organization_id, config):
+        for page in self.pages:
+            self.fetched += 1
+            yield page
+
+
+class FakeIngestService:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def ingest_review_stream(self, batches, **kwargs):
+        received = 0
+        async for batch in batches:
+            received += len(batch)
+        return {"received": received, "inserted": received, "duplicates": 0}
+
+
+@pytest.mark.asyncio
+class TestIncrementalScrape:
+    @pytest.fixture
+    def store(self, monkeypatch, fake_redis, fake_session_factory):
+        store = WatermarkStore(fake_redis)
+        monkeypatch.setattr(base_scraper_module, "watermark_store", store)
+        monkeypatch.setattr(base_scraper_module, "ReviewIngestService", FakeIngestService)
+        monkeypatch.setattr(base_scraper_module, "AsyncSessionLocal", fake_session_factory)
+        monkeypatch.setattr(base_scraper_module.settings, "WATERMARK_ENABLED", True)
+        return store
+
+    async def test_rescrape_stops_at_first_known_page(self, store):
+        pages = [[_review(i, days_ago=p * 10 + i) for i in range(p * 10, p * 10 + 10)] for p in range(5)]
+        config = {"brand_name": "Acme", "countries": ["US"]}
+
+        first = _PagedScraper(pages)
+        totals = await first._ingest_review_stream("job-1", 1, config)
+        assert totals["received"] == 50 and first.fetched == 5
+
+        # two new reviews arrived on top of the first page
+        fresh = [_review(100 + i) for i in range(2)]
+        second = _PagedScraper([fresh + pages[0][:8], pages[0][8:] + pages[1][:8], pages[1][8:] + pages[2][:8], pages[3]])
+        totals = await second._ingest_review_stream("job-2", 1, config)
+
+        assert second.stopped_at_known_page
+        assert second.fetched == 2
+        assert totals["received"] == 10
+
+    async def test_full_rescrape_option_ignores_watermark(self, store):
+        pages = [[_review(i) for i in range(10)]]
+        config = {"brand_name": "Acme", "countries": ["US"], "options": {"full_rescrape": True}}
+
+        await _PagedScraper(pages)._ingest_review_stream("job-1", 1, config)
+        again = _PagedScraper(pages)
+        totals = await again._ingest_review_stream("job-2", 1, config)
+
+        assert totals["received"] == 10
+        assert not again.stopped_at_known_page
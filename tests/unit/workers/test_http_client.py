@@ -0,0 +1,90 @@
+"""Test the shared scraper HTTP client against a local stand-in server."""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.domain.types import SourceType
+from app.workers.http_client import (
+    HOST_LIMITER_CTX_KEY,
+    HTTP_CLIENT_CTX_KEY,
+    close_http_client,
+    create_http_client,
+    open_http_client,
+)
+from app.workers.tasks.scraping.base_scraper import BaseScraper
+
+
+class _PageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        self.server.connections.add(self.client_address)
+        body = b'{"reviews": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _PageHandler)
+    server.connections = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _url(server, page):
+    return f"http://127.0.0.1:{server.server_address[1]}/reviews?page={page}"
+
+
+class _PageScraper(BaseScraper):
+    def __init__(self):
+        super().__init__("page_scraper", SourceType.TRUSTPILOT)
+
+    async def _iter_review_batches(self, job_id, organization_id, config):
+        yield []
+
+
+@pytest.mark.asyncio
+class TestSharedHttpClient:
+    async def test_shared_client_reuses_connections(self, upstream):
+        async with create_http_client() as client:
+            for page in range(20):
+                response = await client.get(_url(upstream, page))
+                assert response.status_code == 200
+
+        assert len(upstream.connections) == 1
+
+    async def test_client_per_request_opens_a_connection_each_time(self, upstream):
+        for page in range(5):
+            async with create_http_client() as client:
+                await client.get(_url(upstream, page))
+
+        assert len(upstream.connections) == 5
+
+    async def test_scrapers_share_the_worker_client(self, upstream, monkeypatch):
+        monkeypatch.setattr("app.workers.base.rate_limit.settings.RATE_LIMIT_ENABLED", False)
+        ctx = {}
+        await open_http_client(ctx)
+        try:
+            for _ in range(3):
+                scraper = _PageScraper()
+                scraper.http_client = ctx[HTTP_CLIENT_CTX_KEY]
+                scraper.host_limiter = ctx[HOST_LIMITER_CTX_KEY]
+                for page in range(5):
+                    response = await scraper.fetch(_url(upstream, page))
+                    assert response.json() == {"reviews": []}
+        finally:
+            await close_http_client(ctx)
+
+        assert len(upstream.connections) == 1
+        assert HTTP_CLIENT_CTX_KEY not in ctx
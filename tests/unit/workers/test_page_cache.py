@@ -0,0 +1,126 @@
+"""Test the on-disk page cache, conditional requests and reparse mode."""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.domain.types import SourceType
+from app.workers.page_cache import PageCache, PageNotCachedError
+from app.workers.tasks.scraping.base_scraper import BaseScraper
+
+
+def _response(url, body, **headers):
+    return httpx.Response(200, content=body, headers=headers, request=httpx.Request("GET", url))
+
+
+class _EtagHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests += 1
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.server.not_modified += 1
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b'{"page": 1}'
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _EtagHandler)
+    server.requests = server.not_modified = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class _Scraper(BaseScraper):
+    def __init__(self, cache):
+        super().__init__("cached_scraper", SourceType.TRUSTPILOT)
+        self.page_cache = cache
+
+    async def _iter_review_batches(self, job_id, organization_id, config):
+        yield []
+
+
+@pytest.mark.asyncio
+class TestPageCache:
+    async def test_round_trip_and_content_addressing(self, tmp_path):
+        cache = PageCache(str(tmp_path), max_bytes=10_000_000)
+        body = b"<html>" + b"review " * 1000 + b"</html>"
+        await cache.put("https://example.com/a", _response("https://example.com/a", body, etag='"x"'))
+        await cache.put("https://example.com/b", _response("https://example.com/b", body))
+
+        page, cached = await cache.get("https://example.com/a")
+        assert cached == body
+        assert page.etag == '"x"'
+        assert page.conditional_headers() == {"If-None-Match": '"x"'}
+        # same body, one blob, stored compressed
+        blobs = list((tmp_path / "blobs").rglob(f"*{cache.suffix}"))
+        assert len(blobs) == 1
+        assert blobs[0].stat().st_size < len(body) / 10
+        assert await cache.get("https://example.com/missing") is None
+
+    async def test_versions_per_url_are_capped(self, tmp_path):
+        cache = PageCache(str(tmp_path), max_bytes=10_000_000, versions_per_url=2)
+        for i in range(4):
+            await cache.put("https://example.com/a", _response("https://example.com/a", f"v{i}".encode()))
+
+        history = await cache.history("https://example.com/a")
+        assert len(history) == 2
+        assert (await cache.get("https://example.com/a"))[1] == b"v3"
+
+    async def test_lru_eviction(self, tmp_path):
+        cache = PageCache(str(tmp_path), max_bytes=3000)
+        for i in range(3):
+            await cache.put(f"https://example.com/{i}", _response("u", os.urandom(900)))
+            time.sleep(0.01)
+        await cache.get("https://example.com/0")  # recently used: survives
+
+        await cache.put("https://example.com/3", _response("u", os.urandom(900)))
+
+        assert await cache.get("https://example.com/0") is not None
+        assert await cache.get("https://example.com/1") is None
+        assert await cache.get("https://example.com/3") is not None
+
+    async def test_fetch_revalidates_with_etag(self, tmp_path, upstream, monkeypatch):
+        monkeypatch.setattr("app.workers.base.rate_limit.settings.RATE_LIMIT_ENABLED", False)
+        url = f"http://127.0.0.1:{upstream.server_address[1]}/reviews"
+        scraper = _Scraper(PageCache(str(tmp_path)))
+
+        first = await scraper.fetch(url)
+        second = await scraper.fetch(url)
+        await scraper.http_client.aclose()
+
+        assert first.json() == second.json() == {"page": 1}
+        assert (upstream.requests, upstream.not_modified) == (2, 1)
+        assert scraper.pages_from_cache == 1
+
+    async def test_reparse_never_touches_the_network(self, tmp_path):
+        cache = PageCache(str(tmp_path))
+        await cache.put("https://example.com/p1", _response("https://example.com/p1", b'{"page": 1}'))
+        scraper = _Scraper(cache)
+        scraper.reparse = True
+
+        response = await scraper.fetch("https://example.com/p1")
+        assert response.json() == {"page": 1}
+        assert scraper.http_client is None
+
+        with pytest.raises(PageNotCachedError):
+            await scraper.fetch("https://example.com/p2")
@@ -0,0 +1,42 @@
+"""Test job routing to named queues and queue-wait tracking."""
+import pytest
+
+from app.domain.types import JobPriority, JobType
+from app.workers.metrics import QUEUE_CTX_KEY, get_queue_wait_stats, queue_wait_ms, track_task
+from app.workers.queue import BULK_QUEUE, INTERACTIVE_QUEUE, SCRAPING_QUEUE, queue_for_job
+
+
+class TestQueueRouting:
+    def test_routes_by_job_type(self):
+        assert queue_for_job(JobType.ARCHETYPE_GENERATION) == INTERACTIVE_QUEUE
+        assert queue_for_job(JobType.REVIEW_SCRAPING) == SCRAPING_QUEUE
+        assert queue_for_job(JobType.REVIEW_REPARSE) == SCRAPING_QUEUE
+        assert queue_for_job(JobType.EMBEDDING_GENERATION) == BULK_QUEUE
+
+    def test_priority_overrides_job_type(self):
+        assert queue_for_job(JobType.REVIEW_SCRAPING, JobPriority.HIGH) == INTERACTIVE_QUEUE
+        assert queue_for_job(JobType.ARCHETYPE_GENERATION, JobPriority.LOW) == BULK_QUEUE
+        assert queue_for_job(JobType.REVIEW_SCRAPING, JobPriority.NORMAL) == SCRAPING_QUEUE
+
+
+class TestQueueWait:
+    def test_wait_from_score(self):
+        assert queue_wait_ms({"score": 1_000}, now_ms=1_250) == 250
+        assert queue_wait_ms({"score": 2_000}, now_ms=1_250) == 0
+        assert queue_wait_ms({}) is None
+
+    @pytest.mark.asyncio
+    async def test_track_task_records_wait_per_queue(self, monkeypatch, fake_redis):
+        monkeypatch.setattr("app.workers.metrics.settings.QUEUE_WAIT_SAMPLES", 3)
+
+        @track_task
+        async def sample_task(ctx, value):
+            return value * 2
+
+        for wait in (100, 200, 300, 400):
+            monkeypatch.setattr("app.workers.metrics.queue_wait_ms", lambda ctx, wait=wait: wait)
+            assert await sample_task({"redis": fake_redis, QUEUE_CTX_KEY: INTERACTIVE_QUEUE, "score": 0}, 21) == 42
+
+        assert sample_task.__name__ == "sample_task"
+        stats = await get_queue_wait_stats(fake_redis, INTERACTIVE_QUEUE)
+        assert stats == {"samples": 3, "p50_ms": 300, "p95_ms": 400, "max_ms": 400}
@@ -0,0 +1,26 @@
+"""Test the ARQ worker settings variants."""
+from arq.worker import get_kwargs
+
+from app.core.config import settings
+from app.workers.queue import BULK_QUEUE, DEFAULT_QUEUE, INTERACTIVE_QUEUE, SCRAPING_QUEUE
+from app.workers.scheduler import BulkWorkerSettings, InteractiveWorkerSettings, ScrapingWorkerSettings, WorkerSettings
+
+
+class TestWorkerSettings:
+    def test_each_variant_drains_its_own_queue(self):
+        # ARQ only reads a settings class's own __dict__, so every field must be set on each variant
+        variants = {
+            WorkerSettings: (DEFAULT_QUEUE, settings.ARQ_DEFAULT_MAX_JOBS),
+            InteractiveWorkerSettings: (INTERACTIVE_QUEUE, settings.ARQ_INTERACTIVE_MAX_JOBS),
+            ScrapingWorkerSettings: (SCRAPING_QUEUE, settings.ARQ_SCRAPING_MAX_JOBS),
+            BulkWorkerSettings: (BULK_QUEUE, settings.ARQ_BULK_MAX_JOBS),
+        }
+        for variant, (queue_name, max_jobs) in variants.items():
+            kwargs = get_kwargs(variant)
+            assert (kwargs["queue_name"], kwargs["max_jobs"]) == (queue_name, max_jobs)
+            assert kwargs["functions"] and kwargs["on_startup"] and kwargs["on_shutdown"]
+            assert kwargs["allow_abort_jobs"]
+
+    def test_cron_jobs_run_on_default_worker_only(self):
+        assert "cron_jobs" in get_kwargs(WorkerSettings)
+        assert "cron_jobs" not in get_kwargs(InteractiveWorkerSettings)
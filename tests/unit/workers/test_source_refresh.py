@@ -0,0 +1,108 @@
+"""Test the scheduled source refresh cron task."""
+import pytest
+
+from app.domain.types import SourceType
+from app.workers.tasks.maintenance import source_refresh
+from app.workers.tasks.maintenance.source_refresh import refresh_offset_seconds, schedule_source_refreshes_task
+
+
+def _row(config_id, organization_id=1, user_id=10, brand="Brand"):
+    return {
+        "id": config_id,
+        "source": SourceType.TRUSTPILOT,
+        "brand_name": f"{brand}{config_id}",
+        "countries": ["US"],
+        "number_of_reviews": 100,
+        "options": {},
+        "organization_id": organization_id,
+        "user_id": user_id,
+    }
+
+
+class FakeSourceConfigRepository:
+    rows = []
+    refreshed = []
+    batch_calls = []
+
+    def __init__(self, session):
+        pass
+
+    async def get_due_for_refresh(self, stale_before, after_id=0, limit=500):
+        self.batch_calls.append(after_id)
+        return [row for row in self.rows if row["id"] > after_id][:limit]
+
+    async def mark_refreshed(self, config_ids, refreshed_at):
+        self.refreshed.extend(config_ids)
+
+
+class FakeJobService:
+    created = []
+
+    def __init__(self, job_repo, arq_pool=None):
+        pass
+
+    async def create_or_attach_job(self, **kwargs):
+        self.created.append(kwargs)
+        return "job", False
+
+
+class FakeCoalescer:
+    def __init__(self, fresh_keys=()):
+        self.fresh_keys = set(fresh_keys)
+
+    async def lookup(self, keys):
+        return {key: ("other-job" if key in self.fresh_keys else None) for key in keys}
+
+
+@pytest.fixture
+def scheduler(monkeypatch, fake_session_factory):
+    FakeSourceConfigRepository.rows = []
+    FakeSourceConfigRepository.refreshed = []
+    FakeSourceConfigRepository.batch_calls = []
+    FakeJobService.created = []
+    monkeypatch.setattr(source_refresh, "AsyncSessionLocal", fake_session_factory)
+    monkeypatch.setattr(source_refresh, "SourceConfigRepositoru", FakeSourceConfigRepository)
+    monkeypatch.setattr(source_refresh, "JobService", FakeJobService)
+    monkeypatch.setattr(source_refresh, "job_coalescer", FakeCoalescer())
+    monkeypatch.setattr(source_refresh.settings, "SOURCE_REFRESH_ENABLED", True)
+    monkeypatch.setattr(source_refresh.settings, "SOURCE_REFRESH_BATCH_SIZE", 2)
+    monkeypatch.setattr(source_refresh.settings, "SOURCE_REFRESH_MAX_PER_ORG", 2)
+    monkeypatch.setattr(source_refresh.settings, "SOURCE_REFRESH_WINDOW_MINUTES", 60)
+    return monkeypatch
+
+
+def test_offsets_are_stable_and_spread_over_the_window():
+    offsets = [refresh_offset_seconds(config_id, 3600) for config_id in range(1000)]
+    assert offsets == [refresh_offset_seconds(config_id, 3600) for config_id in range(1000)]
+    assert all(0 <= offset < 3600 for offset in offsets)
+    # roughly uniform: every quarter of the window gets a fair share
+    quarters = [sum(1 for offset in offsets if q * 900 <= offset < (q + 1) * 900) for q in range(4)]
+    assert min(quarters) > 200
+    assert refresh_offset_seconds(1, 0) == 0
+
+
+@pytest.mark.asyncio
+async def test_walks_batches_with_per_org_cap(scheduler):
+    FakeSourceConfigRepository.rows = [_row(1), _row(2), _row(3), _row(4, organization_id=2), _row(5, user_id=None)]
+
+    stats = await schedule_source_refreshes_task({"redis": object()})
+
+    assert FakeSourceConfigRepository.batch_calls == [0, 2, 4, 5]
+    assert stats == {"scanned": 5, "enqueued": 3, "skipped_fresh": 0, "skipped_capped": 1, "skipped_no_user": 1}
+    assert [job["organization_id"] for job in FakeJobService.created] == [1, 1, 2]
+    assert all(0 <= job["config"]["defer_seconds"] < 3600 for job in FakeJobService.created)
+    # capped and userless configs stay due for the next run
+    assert sorted(FakeSourceConfigRepository.refreshed) == [1, 2, 4]
+
+
+@pytest.mark.asyncio
+async def test_skips_sources_already_fresh(scheduler):
+    FakeSourceConfigRepository.rows = [_row(1), _row(2)]
+    fresh_key = source_refresh.coalescing_key(1, source_refresh._source_data(_row(1)))
+    scheduler.setattr(source_refresh, "job_coalescer", FakeCoalescer({fresh_key}))
+
+    stats = await schedule_source_refreshes_task({"redis": object()})
+
+    assert (stats["enqueued"], stats["skipped_fresh"]) == (1, 1)
+    assert FakeJobService.created[0]["sources_data"][0]["brand_name"] == "Brand2"
+    assert sorted(FakeSourceConfigRepository.refreshed) == [1, 2]
@@ -0,0 +1,133 @@
+"""Test task counters recorded by track_task and the worker telemetry snapshot."""
+import asyncio
+
+import pytest
+
+from arq.constants import in_progress_key_prefix
+
+from app.workers import telemetry
+from app.workers.metrics import QUEUE_CTX_KEY, TASK_RUNNING_KEY, running_member, track_task
+from app.workers.queue import BULK_QUEUE, SCRAPING_QUEUE
+from app.workers.telemetry import collect_worker_telemetry, render_prometheus
+
+NOW = 1_700_000_000.0
+
+
+@pytest.fixture
+def redis(monkeypatch, fake_redis):
+    monkeypatch.setattr("app.workers.metrics.time.time", lambda: NOW - 60)
+    monkeypatch.setattr("app.workers.metrics.settings.TASK_RATE_WINDOW_MINUTES", 2)
+    return fake_redis
+
+
+@pytest.mark.asyncio
+async def test_track_task_counts_outcomes_and_runtime(redis):
+    @track_task
+    async def flaky_task(ctx, fail):
+        if fail:
+            raise ValueError("boom")
+        return "ok"
+
+    ctx = {"redis": redis, QUEUE_CTX_KEY: SCRAPING_QUEUE}
+    assert await flaky_task(ctx, False) == "ok"
+    with pytest.raises(ValueError):
+        await flaky_task(ctx, True)
+
+    snapshot = await collect_worker_telemetry(redis, queues=[SCRAPING_QUEUE], now=NOW)
+    task = snapshot["tasks"]["flaky_task"]
+    assert task["queues"] == [SCRAPING_QUEUE]
+    assert (task["started"], task["completed"], task["failed"], task["in_progress"]) == (2, 1, 1, 0)
+    assert redis.zsets[TASK_RUNNING_KEY] == {}
+    # both runs landed in the previous full minute of a two-minute window
+    assert task["completed_per_minute"] == 0.5
+    assert task["failed_per_minute"] == 0.5
+    assert task["runtime_samples"] == 2
+    assert snapshot["queues"][SCRAPING_QUEUE]["completed_per_minute"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_queue_depth_skips_running_jobs(redis):
+    now_ms = int(NOW * 1000)
+    redis.zsets[BULK_QUEUE] = {
+        "running": now_ms - 90_000,
+        "waiting": now_ms - 30_000,
+        "newer": now_ms - 1_000,
+        "deferred": now_ms + 60_000,
+    }
+    redis.values[in_progress_key_prefix + "running"] = "1"
+    await redis.zadd(TASK_RUNNING_KEY, {running_member(BULK_QUEUE, "reparse_task", "running"): now_ms - 5_000})
+
+    queue = (await collect_worker_telemetry(redis, queues=[BULK_QUEUE], now=NOW))["queues"][BULK_QUEUE]
+    assert queue["depth"] == 2
+    assert queue["deferred"] == 1
+    assert queue["in_progress"] == 1
+    assert queue["oldest_queued_age_seconds"] == 30.0
+
+
+@pytest.mark.asyncio
+async def test_running_task_is_heartbeated(redis, monkeypatch):
+    monkeypatch.setattr("app.workers.metrics.settings.TASK_HEARTBEAT_SECONDS", 0)
+    member = running_member(SCRAPING_QUEUE, "slow_task", "job-1")
+
+    @track_task
+    async def slow_task(ctx):
+        started_at = redis.zsets[TASK_RUNNING_KEY][member]
+        monkeypatch.setattr("app.workers.metrics.time.time", lambda: NOW)
+        for _ in range(3):
+            await asyncio.sleep(0)
+        return started_at, redis.zsets[TASK_RUNNING_KEY][member]
+
+    started_at, heartbeat_at = await slow_task({"redis": redis, QUEUE_CTX_KEY: SCRAPING_QUEUE, "job_id": "job-1"})
+
+    assert (started_at, heartbeat_at) == (int((NOW - 60) * 1000), int(NOW * 1000))
+    assert member not in redis.zsets[TASK_RUNNING_KEY]
+
+
+@pytest.mark.asyncio
+async def test_killed_workers_age_out_of_in_progress(redis, monkeypatch):
+    """Entries no longer heartbeated (the worker died mid-task) stop counting and are dropped."""
+    monkeypatch.setattr("app.workers.metrics.settings.TASK_HEARTBEAT_SECONDS", 30)
+    monkeypatch.setattr("app.workers.metrics.settings.TASK_HEARTBEAT_MISSES", 3)
+    now_ms = int(NOW * 1000)
+    await redis.zadd(TASK_RUNNING_KEY, {
+        running_member(BULK_QUEUE, "reparse_task", "alive"): now_ms - 60_000,
+        running_member(BULK_QUEUE, "reparse_task", "killed"): now_ms - 120_000,
+    })
+    redis.zsets[BULK_QUEUE] = {"alive": now_ms - 70_000, "killed": now_ms - 200_000}
+
+    snapshot = await collect_worker_telemetry(redis, queues=[BULK_QUEUE], now=NOW)
+
+    assert snapshot["tasks"]["reparse_task"]["in_progress"] == 1
+    assert snapshot["queues"][BULK_QUEUE]["in_progress"] == 1
+    assert snapshot["queues"][BULK_QUEUE]["depth"] == 1
+    assert list(redis.zsets[TASK_RUNNING_KEY]) == [running_member(BULK_QUEUE, "reparse_task", "alive")]
+
+
+@pytest.mark.asyncio
+async def test_empty_queue_has_no_oldest_age(redis):
+    queue = (await collect_worker_telemetry(redis, queues=[BULK_QUEUE], now=NOW))["queues"][BULK_QUEUE]
+    assert queue["depth"] == 0
+    assert queue["oldest_queued_age_seconds"] is None
+
+
+def test_prometheus_exposition():
+    if telemetry.prometheus_client is None:
+        with pytest.raises(RuntimeError):
+            render_prometheus({"queues": {}, "tasks": {}})
+        return
+    snapshot = {
+        "queues": {BULK_QUEUE: {
+            "depth": 3, "deferred": 0, "oldest_queued_age_seconds": 12.5, "in_progress": 1,
+            "queue_wait": {"p50_ms": 10, "p95_ms": 20},
+        }},
+        "tasks": {"reparse_task": {
+            "started": 5, "completed": 3, "failed": 1, "in_progress": 1,
+            "runtime_p50_ms": 100, "runtime_p95_ms": 250,
+        }},
+    }
+    body, content_type = render_prometheus(snapshot)
+    text = body.decode()
+    assert content_type.startswith("text/plain")
+    assert f'arq_queue_depth{{queue="{BULK_QUEUE}"}} 3.0' in text
+    assert 'arq_task_completed_total{task="reparse_task"} 3.0' in text
+    assert 'arq_task_runtime_milliseconds{task="reparse_task",quantile="0.95"} 250.0' in text
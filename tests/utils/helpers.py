@@ -1,8 +1,10 @@
 """Test helper functions."""
-from typing import Dict, Any, Optional
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
 from httpx import Response, AsyncClient
 
 from app.core.security import create_token
+from app.db.instrumentation import QueryStats, track_queries
 from app.domain.types import Role, TokenType
 from app.models.user import User
 
@@ -46,3 +48,14 @@ async def login_user(client: AsyncClient, email: str, password: str) -> Dict[str
     })
     assert response.status_code == 200
     return response.json()
+
+
+@contextmanager
+def assert_query_budget(max_queries: int) -> Iterator[QueryStats]:
+    """
+    Fail if the block (e.g. one API call through the test client) runs more than `max_queries`
+    SQL statements. Guards endpoints against N+1 regressions.
+    """
+    with track_queries() as stats:
+        yield stats
+    assert stats.count <= max_queries, f"Expected at most {max_queries} queries, got {stats.count}"